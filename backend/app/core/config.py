@@ -2,7 +2,8 @@
 应用配置管理
 """
 import os
-from typing import List, Optional
+import re
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -16,6 +17,56 @@ class Settings:
     # 数据库配置
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./data/research_dashboard.db")
 
+    # SQLite性能配置（PRAGMA profile）
+    # legacy: SQLite默认行为（回滚日志 + FULL同步），写操作会阻塞所有读操作
+    # balanced: WAL模式，读写互不阻塞；WAL下synchronous=NORMAL仍能保证数据库一致性
+    # performance: 在balanced基础上启用内存映射和更大的页缓存
+    SQLITE_PRAGMA_PROFILE: str = os.getenv("SQLITE_PRAGMA_PROFILE", "performance")
+    SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+        "legacy": {},
+        "balanced": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,  # 毫秒
+        },
+        "performance": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,  # 毫秒
+            "mmap_size": 268435456,  # 256MB
+            "cache_size": -65536,  # 负数单位为KB，即64MB
+        },
+    }
+    # 可通过环境变量单独覆盖的PRAGMA（如 SQLITE_MMAP_SIZE=0）
+    SQLITE_PRAGMA_NAMES: List[str] = [
+        "journal_mode", "synchronous", "temp_store", "busy_timeout", "mmap_size", "cache_size"
+    ]
+
+    # 只读连接池大小（GET请求使用，读操作在WAL模式下可并行）
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+    DB_READ_MAX_OVERFLOW: int = int(os.getenv("DB_READ_MAX_OVERFLOW", "8"))
+
+    # 写入合并队列：窗口期内的小型写操作合并为一个事务提交
+    WRITE_QUEUE_WINDOW_MS: int = int(os.getenv("WRITE_QUEUE_WINDOW_MS", "5"))
+    WRITE_QUEUE_MAX_BATCH: int = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+
+    # 期刊批量导入：每个事务处理的行数
+    JOURNAL_IMPORT_CHUNK_SIZE: int = int(os.getenv("JOURNAL_IMPORT_CHUNK_SIZE", "500"))
+
+    # 合作者Excel导入：每个事务处理的行数
+    COLLABORATOR_IMPORT_CHUNK_SIZE: int = int(os.getenv("COLLABORATOR_IMPORT_CHUNK_SIZE", "1000"))
+
+    # 后台任务：同时执行的任务数（线程池大小）和已结束任务的保留天数
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_RETENTION_DAYS: int = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+    # 请求级SQL统计：同一语句在一个请求中执行超过阈值次数时视为疑似N+1并输出警告
+    SQL_STATS_ENABLED: bool = os.getenv("SQL_STATS_ENABLED", "true").lower() == "true"
+    SQL_REPEAT_WARN_THRESHOLD: int = int(os.getenv("SQL_REPEAT_WARN_THRESHOLD", "10"))
+    SQL_STATS_HISTORY_SIZE: int = int(os.getenv("SQL_STATS_HISTORY_SIZE", "200"))
+
     # CORS配置
     CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "http://localhost:3001").split(",")
 
@@ -36,6 +87,15 @@ class Settings:
     DATA_DIR: Path = BASE_DIR / "data"
     LOGS_DIR: Path = BASE_DIR / "logs"
 
+    # 慢查询日志：超过阈值的SQL连同EXPLAIN QUERY PLAN写入轮转日志，诊断接口 GET /api/admin/slow-queries
+    SLOW_QUERY_ENABLED: bool = os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+    SLOW_QUERY_LOG_FILE: str = os.getenv("SLOW_QUERY_LOG_FILE", str(LOGS_DIR / "slow_queries.log"))
+    SLOW_QUERY_LOG_MAX_BYTES: int = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", "5242880"))  # 5MB
+    SLOW_QUERY_LOG_BACKUP_COUNT: int = int(os.getenv("SLOW_QUERY_LOG_BACKUP_COUNT", "5"))
+    # 绑定参数的记录方式：redact（只记录类型，默认）/ full（原值，可能包含用户数据）/ none（不记录）
+    SLOW_QUERY_LOG_PARAMETERS: str = os.getenv("SLOW_QUERY_LOG_PARAMETERS", "redact").lower()
+
     def __init__(self):
         """初始化配置，创建必要的目录"""
         # 创建必要的目录
@@ -54,6 +114,34 @@ class Settings:
             return f"sqlite:///{absolute_db_path}"
         return self.DATABASE_URL
 
+    def get_async_database_url(self) -> str:
+        """获取异步驱动的数据库URL（SQLite使用aiosqlite）"""
+        url = self.get_database_url()
+        if url.startswith("sqlite:///"):
+            return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+        return url
+
+    def get_sqlite_pragmas(self) -> Dict[str, Any]:
+        """获取当前profile的SQLite PRAGMA设置（已合并环境变量覆盖）"""
+        if self.SQLITE_PRAGMA_PROFILE not in self.SQLITE_PRAGMA_PROFILES:
+            raise ValueError(
+                f"未知的SQLITE_PRAGMA_PROFILE: {self.SQLITE_PRAGMA_PROFILE}，"
+                f"可选值: {', '.join(self.SQLITE_PRAGMA_PROFILES)}"
+            )
+
+        pragmas = dict(self.SQLITE_PRAGMA_PROFILES[self.SQLITE_PRAGMA_PROFILE])
+        for name in self.SQLITE_PRAGMA_NAMES:
+            override = os.getenv(f"SQLITE_{name.upper()}")
+            if override:
+                pragmas[name] = override
+
+        # PRAGMA值会直接拼接进SQL，只允许简单的标识符和数字
+        for name, value in pragmas.items():
+            if not re.fullmatch(r"-?\w+", str(value)):
+                raise ValueError(f"无效的PRAGMA值: {name}={value}")
+
+        return pragmas
+
     def get_log_config(self) -> dict:
         """获取日志配置"""
         config = {
@@ -0,0 +1,186 @@
+"""
+请求级SQL统计
+通过SQLAlchemy的 before/after_cursor_execute 事件记录每个请求的查询次数、数据库耗时，
+并按语句指纹统计重复执行次数，用于发现 N+1 查询
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from .config import settings
+from .slow_query_log import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的统计对象；不在请求上下文中执行的查询（启动、后台线程）不做统计
+current_query_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# IN (?, ?, ?) 的参数个数随数据变化，统一折叠为一个占位符
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def fingerprint_sql(statement: str) -> str:
+    """把SQL语句归一化为指纹：折叠空白、IN列表和字面量"""
+    fingerprint = _WHITESPACE_RE.sub(" ", statement).strip()
+    fingerprint = _LITERAL_RE.sub("?", fingerprint)
+    return _IN_LIST_RE.sub("(?)", fingerprint)
+
+
+class RequestQueryStats:
+    """单个请求内的SQL统计"""
+
+    def __init__(self, method: str, path: str, scope: Optional[dict] = None):
+        self.method = method
+        self.path = path
+        self.scope = scope  # 路由匹配后scope中才有route，需要时再读取
+        self.query_count = 0
+        self.db_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self._lock = threading.Lock()  # 同一请求的查询可能来自线程池
+
+    def record(self, statement: str, duration: float):
+        fingerprint = fingerprint_sql(statement)
+        with self._lock:
+            self.query_count += 1
+            self.db_time += duration
+            self.fingerprints[fingerprint] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Dict[str, Any]]:
+        """执行次数超过阈值的语句"""
+        return [
+            {"statement": fingerprint, "count": count}
+            for fingerprint, count in self.fingerprints.most_common()
+            if count > threshold
+        ]
+
+    @property
+    def route(self) -> Optional[str]:
+        """路径模板，用于归并 /api/research/1、/api/research/2 等请求"""
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None)
+
+    @property
+    def route_key(self) -> str:
+        return f"{self.method} {self.route or self.path}"
+
+
+class QueryProfiler:
+    """汇总各请求的SQL统计，供管理接口查询"""
+
+    def __init__(self, repeat_threshold: int = 10, history_size: int = 200):
+        self.repeat_threshold = repeat_threshold
+        self.recent: deque = deque(maxlen=history_size)
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def finish(self, stats: RequestQueryStats, duration: float):
+        """请求结束时调用：记录历史、更新路由汇总，发现重复语句时输出警告"""
+        repeated = stats.repeated_statements(self.repeat_threshold)
+        if repeated:
+            worst = repeated[0]
+            logger.warning(
+                f"疑似N+1查询: {stats.route_key} 中同一语句执行了 {worst['count']} 次"
+                f"（共 {stats.query_count} 次查询）: {worst['statement'][:200]}"
+            )
+
+        entry = {
+            "route": stats.route_key,
+            "path": stats.path,
+            "query_count": stats.query_count,
+            "db_time_ms": round(stats.db_time * 1000, 2),
+            "duration_ms": round(duration * 1000, 2),
+            "repeated_statements": repeated,
+            "timestamp": time.time(),
+        }
+
+        with self._lock:
+            self.recent.append(entry)
+            summary = self.routes.setdefault(stats.route_key, {
+                "requests": 0,
+                "total_queries": 0,
+                "max_queries": 0,
+                "total_db_time_ms": 0.0,
+                "max_db_time_ms": 0.0,
+                "n_plus_one_requests": 0,
+                "top_repeated_statement": None,
+            })
+            summary["requests"] += 1
+            summary["total_queries"] += stats.query_count
+            summary["max_queries"] = max(summary["max_queries"], stats.query_count)
+            summary["total_db_time_ms"] += entry["db_time_ms"]
+            summary["max_db_time_ms"] = max(summary["max_db_time_ms"], entry["db_time_ms"])
+            if repeated:
+                summary["n_plus_one_requests"] += 1
+                previous = summary["top_repeated_statement"]
+                if previous is None or repeated[0]["count"] > previous["count"]:
+                    summary["top_repeated_statement"] = repeated[0]
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """按平均查询次数倒序返回路由汇总和最近的请求"""
+        with self._lock:
+            routes = []
+            for route, summary in self.routes.items():
+                requests = summary["requests"]
+                routes.append({
+                    "route": route,
+                    **summary,
+                    "total_db_time_ms": round(summary["total_db_time_ms"], 2),
+                    "avg_queries": round(summary["total_queries"] / requests, 2),
+                    "avg_db_time_ms": round(summary["total_db_time_ms"] / requests, 2),
+                })
+            recent = list(self.recent)[-limit:]
+
+        routes.sort(key=lambda r: r["avg_queries"], reverse=True)
+        return {
+            "repeat_threshold": self.repeat_threshold,
+            "routes": routes,
+            "recent_requests": list(reversed(recent)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+            self.routes.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if settings.SLOW_QUERY_ENABLED and duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_log.record(conn, statement, parameters, executemany, duration, stats)
+
+
+def instrument_engine(engine):
+    """为引擎注册SQL统计和慢查询事件（异步引擎传入 async_engine.sync_engine）"""
+    if not (settings.SQL_STATS_ENABLED or settings.SLOW_QUERY_ENABLED):
+        return
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# 全局统计实例
+query_profiler = QueryProfiler(
+    repeat_threshold=settings.SQL_REPEAT_WARN_THRESHOLD,
+    history_size=settings.SQL_STATS_HISTORY_SIZE,
+)
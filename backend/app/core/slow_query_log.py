@@ -0,0 +1,155 @@
+"""
+慢查询日志
+执行时间超过阈值的SQL连同参数（默认只记录类型）、耗时、调用路由和 EXPLAIN QUERY PLAN 结果一起记录，
+写入按大小轮转的日志文件（每行一条JSON），并保留最近的记录供诊断接口查询
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# 只对这些语句执行EXPLAIN（PRAGMA、BEGIN、SAVEPOINT等没有查询计划）
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+MAX_PARAM_LENGTH = 200
+
+# 绑定参数的记录方式（Settings.SLOW_QUERY_LOG_PARAMETERS）
+PARAMETER_MODES = ("redact", "full", "none")
+
+
+def _format_parameters(parameters: Any, executemany: bool, mode: str = "redact") -> Any:
+    """
+    参数转换为可JSON序列化的形式；executemany只保留第一组
+
+    mode为redact时每个值只保留类型（如 <str>），full时保留原值（过长的字符串截断），none时不记录
+    """
+    if mode == "none":
+        return None
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        parameters = parameters[0]
+
+    def _format(value):
+        if value is None:
+            return None
+        if mode == "redact":
+            return f"<{type(value).__name__}>"
+        if isinstance(value, (bool, int, float)):
+            return value
+        text = str(value)
+        return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "..."
+
+    if isinstance(parameters, dict):
+        return {key: _format(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_format(value) for value in parameters]
+    return _format(parameters)
+
+
+class SlowQueryLog:
+    """慢查询记录器"""
+
+    def __init__(self, log_file: Optional[str], max_bytes: int, backup_count: int, history_size: int = 200,
+                 parameter_mode: str = "redact"):
+        if parameter_mode not in PARAMETER_MODES:
+            raise ValueError(
+                f"未知的SLOW_QUERY_LOG_PARAMETERS: {parameter_mode}，可选值: {', '.join(PARAMETER_MODES)}"
+            )
+        self.parameter_mode = parameter_mode
+        self.recent: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._file_logger = logging.getLogger("slow_query")
+        self._file_logger.propagate = False  # 不混入应用日志
+        if log_file and not self._file_logger.handlers:
+            handler = RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file_logger.addHandler(handler)
+            self._file_logger.setLevel(logging.INFO)
+
+    def record(self, conn, statement: str, parameters: Any, executemany: bool, duration: float, stats=None):
+        """记录一条慢查询（在 after_cursor_execute 事件中调用）"""
+        params = parameters[0] if executemany and parameters else parameters
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_ms": round(duration * 1000, 2),
+            "route": stats.route_key if stats is not None else None,
+            "sql": statement,
+            "parameters": _format_parameters(parameters, executemany, self.parameter_mode),
+            "query_plan": self._explain(conn, statement, params),
+        }
+
+        with self._lock:
+            self.recent.append(entry)
+        try:
+            self._file_logger.info(json.dumps(entry, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"写入慢查询日志失败: {e}")
+        logger.warning(f"慢查询 {entry['duration_ms']}ms ({entry['route'] or '非请求上下文'}): {statement[:200]}")
+
+    def _explain(self, conn, statement: str, parameters: Any) -> Optional[List[str]]:
+        """在同一连接上执行 EXPLAIN QUERY PLAN，返回计划的每一行"""
+        if not statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            return None
+        if conn.dialect.name != "sqlite":
+            return None
+        try:
+            # 使用原始DBAPI游标，避免再次触发cursor事件
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug(f"获取查询计划失败: {e}")
+            return None
+        # 行格式: (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+
+    def snapshot(self, limit: int = 50, min_duration_ms: float = 0) -> Dict[str, Any]:
+        """最近的慢查询（最新在前），以及按SQL汇总的次数和最大耗时"""
+        with self._lock:
+            entries = [e for e in self.recent if e["duration_ms"] >= min_duration_ms]
+
+        summary: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            item = summary.setdefault(entry["sql"], {
+                "sql": entry["sql"], "count": 0, "max_duration_ms": 0.0,
+                "routes": set(), "query_plan": entry["query_plan"],
+            })
+            item["count"] += 1
+            item["max_duration_ms"] = max(item["max_duration_ms"], entry["duration_ms"])
+            if entry["route"]:
+                item["routes"].add(entry["route"])
+
+        statements = sorted(summary.values(), key=lambda s: s["max_duration_ms"], reverse=True)
+        for item in statements:
+            item["routes"] = sorted(item["routes"])
+
+        return {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "log_file": settings.SLOW_QUERY_LOG_FILE,
+            "statements": statements,
+            "recent": list(reversed(entries))[:limit],
+        }
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+
+
+# 全局慢查询日志实例
+slow_query_log = SlowQueryLog(
+    log_file=settings.SLOW_QUERY_LOG_FILE if settings.SLOW_QUERY_ENABLED else None,
+    max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+    backup_count=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+    parameter_mode=settings.SLOW_QUERY_LOG_PARAMETERS,
+)
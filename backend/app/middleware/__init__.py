@@ -1,7 +1,9 @@
 from .security import RateLimitMiddleware, SecurityHeadersMiddleware, RequestValidationMiddleware
+from .query_stats import QueryStatsMiddleware
 
 __all__ = [
     "RateLimitMiddleware",
     "SecurityHeadersMiddleware",
-    "RequestValidationMiddleware"
+    "RequestValidationMiddleware",
+    "QueryStatsMiddleware"
 ]
@@ -0,0 +1,32 @@
+import time
+import logging
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..core.query_profiler import RequestQueryStats, current_query_stats, query_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """请求级SQL统计中间件：在响应头中返回查询次数和数据库耗时"""
+
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestQueryStats(request.method, request.url.path, request.scope)
+        token = current_query_stats.set(stats)
+        start_time = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_stats.reset(token)
+
+        db_time_ms = stats.db_time * 1000
+        response.headers["X-DB-Query-Count"] = str(stats.query_count)
+        response.headers["X-DB-Time-Ms"] = f"{db_time_ms:.2f}"
+        repeated = stats.repeated_statements(query_profiler.repeat_threshold)
+        if repeated:
+            response.headers["X-DB-Repeated-Statements"] = str(len(repeated))
+        response.headers["Server-Timing"] = f'db;dur={db_time_ms:.2f};desc="{stats.query_count} queries"'
+
+        query_profiler.finish(stats, time.perf_counter() - start_time)
+        return response
@@ -3,6 +3,14 @@ from .database import (
     engine,
     SessionLocal,
     get_db,
+    read_engine,
+    write_engine,
+    ReadSessionLocal,
+    get_read_db,
+    get_write_db,
+    async_engine,
+    AsyncSessionLocal,
+    get_async_db,
     create_tables,
     Collaborator,
     ResearchProject,
@@ -13,9 +21,11 @@ from .database import (
     Tag,
     Journal,
     JournalIssue,
+    JournalStats,
     JournalOnlineFirstTracking,
     Prompt,
     ResearchMethod,
+    BackgroundJob,
     project_collaborators,
     idea_responsible_persons,
     journal_tags,
@@ -40,16 +50,20 @@ from .schemas import (
     ResearchProjectCreate,
     ResearchProjectUpdate,
     ResearchProject as ResearchProjectSchema,
-
+    ResearchProjectSummary,
+    CollaboratorBrief,
 
     # Communication Log schemas
     CommunicationLogBase,
     CommunicationLogCreate,
     CommunicationLogUpdate,
     CommunicationLog as CommunicationLogSchema,
+    RecentCommunicationLog,
 
     # Utility schemas
     FileUploadResponse,
+    JobSubmitted,
+    BackgroundJob as BackgroundJobSchema,
 
     # System Config schemas
     SystemConfigBase,
@@ -90,13 +104,17 @@ from .schemas import (
 
 __all__ = [
     "Base", "engine", "SessionLocal", "get_db", "create_tables",
-    "Collaborator", "ResearchProject", "CommunicationLog", "AuditLog", "SystemConfig", "Idea", "Tag", "Journal", "JournalIssue", "JournalOnlineFirstTracking", "Prompt", "ResearchMethod",
+    "read_engine", "write_engine", "ReadSessionLocal", "get_read_db", "get_write_db",
+    "async_engine", "AsyncSessionLocal", "get_async_db",
+    "Collaborator", "ResearchProject", "CommunicationLog", "AuditLog", "SystemConfig", "Idea", "Tag", "Journal", "JournalIssue", "JournalStats", "JournalOnlineFirstTracking", "Prompt", "ResearchMethod", "BackgroundJob",
     "project_collaborators", "idea_responsible_persons", "journal_tags", "prompt_tags",
     "ResearchMethodBase", "ResearchMethodCreate", "ResearchMethodUpdate", "ResearchMethodSchema",
     "CollaboratorBase", "CollaboratorCreate", "CollaboratorUpdate", "CollaboratorSchema",
     "ResearchProjectBase", "ResearchProjectCreate", "ResearchProjectUpdate", "ResearchProjectSchema",
+    "ResearchProjectSummary", "CollaboratorBrief",
     "CommunicationLogBase", "CommunicationLogCreate", "CommunicationLogUpdate", "CommunicationLogSchema",
-    "FileUploadResponse",
+    "RecentCommunicationLog",
+    "FileUploadResponse", "JobSubmitted", "BackgroundJobSchema",
     "SystemConfigBase", "SystemConfigCreate", "SystemConfigUpdate", "SystemConfigSchema",
     "AIProviderConfig", "AITestRequest", "AITestResponse",
     "IdeaBase", "IdeaCreate", "IdeaUpdate", "IdeaSchema",
@@ -1,24 +1,71 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Table, Index, UniqueConstraint, event, Date
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Table, Index, UniqueConstraint, event, Date, inspect
 from sqlalchemy.orm import backref
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from fastapi import Request
 from datetime import datetime
 from app.core.config import settings
+from app.core.query_profiler import instrument_engine
+from app.models.journal_stats import create_journal_stats_triggers, rebuild_journal_stats
+from app.models.search_index import create_search_indexes
+from app.models.research_method_usage import create_research_method_usage_triggers, reconcile_research_method_usage
 
 # Database configuration
 DATABASE_URL = settings.get_database_url()
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+CONNECT_ARGS = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+# 写引擎：所有增删改请求使用（SQLite本身只允许一个写事务，由busy_timeout排队）
+engine = create_engine(DATABASE_URL, connect_args=CONNECT_ARGS)
+write_engine = engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-# 启用SQLite外键约束（确保外键约束生效）
+# 只读引擎：GET请求使用，连接级 PRAGMA query_only 禁止写入，WAL模式下可与写事务并行
+read_engine = create_engine(
+    DATABASE_URL,
+    connect_args=CONNECT_ARGS,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# 不会修改数据的HTTP方法，自动使用只读会话
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# 异步引擎（aiosqlite，只读）：查询在驱动线程中执行，不阻塞事件循环
+ASYNC_DATABASE_URL = settings.get_async_database_url()
+async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=CONNECT_ARGS)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# SQLite PRAGMA配置（WAL、同步级别、内存映射等，见 Settings.SQLITE_PRAGMA_PROFILES）
+SQLITE_PRAGMAS = settings.get_sqlite_pragmas() if DATABASE_URL.startswith("sqlite") else {}
+
+# 启用SQLite外键约束（确保外键约束生效）并应用性能配置
 @event.listens_for(engine, "connect")
+@event.listens_for(read_engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_conn, connection_record):
-    """在每个数据库连接建立时启用外键约束"""
+    """在每个数据库连接建立时启用外键约束并应用PRAGMA profile"""
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
     cursor.close()
 
+# 只读连接（必须在set_sqlite_pragma之后执行，journal_mode切换需要写权限）
+@event.listens_for(read_engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_query_only(dbapi_conn, connection_record):
+    """禁止只读连接执行任何写操作"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+# 请求级SQL统计（查询次数、耗时、重复语句）
+for _engine in (engine, read_engine, async_engine.sync_engine):
+    instrument_engine(_engine)
+
 # Association table for many-to-many relationship between projects and collaborators
 project_collaborators = Table(
     'project_collaborators',
@@ -85,6 +132,8 @@ class ResearchProject(Base):
     reference_paper = Column(Text, nullable=True)  # 参考论文
     reference_journal = Column(Text, nullable=True)  # 参考期刊
     target_journal = Column(Text, nullable=True)  # 投稿期刊
+    reference_journal_id = Column(Integer, ForeignKey('journals.id', ondelete='SET NULL'), nullable=True)  # 参考期刊ID（由reference_journal解析）
+    target_journal_id = Column(Integer, ForeignKey('journals.id', ondelete='SET NULL'), nullable=True)  # 投稿期刊ID（由target_journal解析）
     status = Column(String(50), default="writing", nullable=False)  # writing, submitting, published
     progress = Column(Float, default=0.0)  # 进展百分比
     start_date = Column(DateTime, default=datetime.utcnow)
@@ -105,6 +154,12 @@ class ResearchProject(Base):
     communication_logs = relationship("CommunicationLog", back_populates="project", cascade="all, delete-orphan")
     research_method_rel = relationship("ResearchMethod", foreign_keys=[research_method_id])
 
+    # 索引优化（期刊外键用于引用统计和筛选）
+    __table_args__ = (
+        Index('idx_research_projects_reference_journal_id', 'reference_journal_id'),
+        Index('idx_research_projects_target_journal_id', 'target_journal_id'),
+    )
+
 
 
 class ResearchMethod(Base):
@@ -157,6 +212,14 @@ class CommunicationLog(Base):
     project = relationship("ResearchProject", back_populates="communication_logs")
     collaborator = relationship("Collaborator")
 
+    # 索引优化：项目交流记录按日期分页（project_id 等值 + 日期有序，SQLite索引末尾隐含rowid作为id兜底）；
+    # 跨项目的最近交流按日期倒序直接扫描日期索引
+    __table_args__ = (
+        Index('idx_communication_logs_project_date', 'project_id', 'communication_date'),
+        Index('idx_communication_logs_date', 'communication_date'),
+        Index('idx_communication_logs_collaborator_id', 'collaborator_id'),
+    )
+
 class SystemConfig(Base):
     """系统配置模型 - 存储系统设置和AI配置信息"""
     __tablename__ = "system_configs"
@@ -191,6 +254,8 @@ class Idea(Base):
     reference_paper = Column(Text, nullable=True, comment="参考论文")
     reference_journal = Column(Text, nullable=True, comment="参考期刊")
     target_journal = Column(Text, nullable=True, comment="投稿期刊")
+    reference_journal_id = Column(Integer, ForeignKey('journals.id', ondelete='SET NULL'), nullable=True, comment="参考期刊ID（由reference_journal解析）")
+    target_journal_id = Column(Integer, ForeignKey('journals.id', ondelete='SET NULL'), nullable=True, comment="投稿期刊ID（由target_journal解析）")
     responsible_person_id = Column(Integer, ForeignKey('collaborators.id'), nullable=True, comment="负责人ID（主负责人，可选）")
     maturity = Column(String(20), nullable=False, default='immature', comment="成熟度: mature/immature")
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
@@ -205,6 +270,8 @@ class Idea(Base):
         Index('idx_ideas_maturity', 'maturity'),
         Index('idx_ideas_responsible_person_id', 'responsible_person_id'),
         Index('idx_ideas_created_at', 'created_at'),
+        Index('idx_ideas_reference_journal_id', 'reference_journal_id'),
+        Index('idx_ideas_target_journal_id', 'target_journal_id'),
     )
 
 
@@ -254,6 +321,16 @@ class Journal(Base):
         from_attributes = True
 
 
+class JournalStats(Base):
+    """期刊引用统计物化表（由触发器维护，见 app/models/journal_stats.py）"""
+    __tablename__ = "journal_stats"
+
+    journal_id = Column(Integer, ForeignKey('journals.id', ondelete='CASCADE'), primary_key=True)
+    reference_count = Column(Integer, nullable=False, default=0, server_default="0", comment="作为参考期刊的次数")
+    target_count = Column(Integer, nullable=False, default=0, server_default="0", comment="作为投稿期刊的次数")
+    issues_count = Column(Integer, nullable=False, default=0, server_default="0", comment="浏览记录数量")
+
+
 class JournalIssue(Base):
     """期刊期卷号浏览记录模型（v5.1）"""
     __tablename__ = "journal_issues"
@@ -339,20 +416,91 @@ class Prompt(Base):
         from_attributes = True
 
 
+class BackgroundJob(Base):
+    """后台任务模型（导入、备份、一致性检查等耗时操作的状态、进度和结果）"""
+    __tablename__ = "background_jobs"
+
+    id = Column(String(32), primary_key=True, comment="任务ID（uuid4 hex）")
+    kind = Column(String(50), nullable=False, comment="任务类型")
+    status = Column(String(20), nullable=False, default="pending", comment="状态: pending/running/succeeded/failed/cancelled")
+    progress = Column(Float, nullable=False, default=0, comment="进度 0~1")
+    message = Column(Text, nullable=True, comment="当前进度说明")
+    result = Column(Text, nullable=True, comment="任务结果JSON")
+    error = Column(Text, nullable=True, comment="失败原因")
+    cancel_requested = Column(Boolean, nullable=False, default=False, comment="是否已请求取消")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, comment="提交时间")
+    started_at = Column(DateTime, nullable=True, comment="开始执行时间")
+    finished_at = Column(DateTime, nullable=True, comment="结束时间")
+
+    __table_args__ = (
+        Index('idx_background_jobs_status_created', 'status', 'created_at'),
+    )
+
+
+# 保存Idea/ResearchProject时，根据期刊名称文本同步期刊外键
+@event.listens_for(Session, "before_flush")
+def sync_journal_reference_ids(session, flush_context, instances):
+    """reference_journal/target_journal 变化时解析对应的 *_journal_id"""
+    from app.utils.journal_helper import resolve_pending_journal_references  # 避免循环导入
+    resolve_pending_journal_references(session)
+
 # Create database tables
 def create_tables():
+    stats_table_existed = inspect(engine).has_table(JournalStats.__tablename__)
     Base.metadata.create_all(bind=engine)
 
+    # create_all 不会给已存在的表补建索引：模型中新增的索引在这里补齐（幂等）
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    # 期刊统计触发器（幂等）；统计表首次创建时按现有数据全量构建
+    if DATABASE_URL.startswith("sqlite"):
+        with engine.begin() as conn:
+            create_journal_stats_triggers(conn)
+            if not stats_table_existed:
+                rebuild_journal_stats(conn)
+            # 全文检索索引（FTS5 + 同步触发器），首次创建时构建
+            create_search_indexes(conn)
+            # 研究方法使用次数触发器；首次创建时对账，修正手动维护时期留下的漂移
+            if create_research_method_usage_triggers(conn):
+                reconcile_research_method_usage(conn)
+
 # Initialize database (alias for create_tables for compatibility)
 def init_db():
     """初始化数据库，创建所有表"""
-    Base.metadata.create_all(bind=engine)
+    create_tables()
     print("✅ 数据库表创建完成")
 
-# Database dependency
-def get_db():
+# Database dependency（按HTTP方法自动选择：GET等安全方法使用只读连接池，其余使用写连接）
+def get_db(request: Request = None):
+    if request is not None and request.method in READ_ONLY_METHODS:
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 显式指定只读会话（例如只做查询的POST接口）
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# 显式指定写会话（例如需要在GET中写入的场景）
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async database dependency（只读，供读多写少的GET路由使用，避免阻塞事件循环）
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
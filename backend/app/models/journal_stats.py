@@ -0,0 +1,91 @@
+"""
+期刊统计物化表（journal_stats）的触发器与重建
+参考/投稿/浏览记录计数由SQLite触发器在 ideas、research_projects、journal_issues 写入的同一事务中维护，
+期刊列表直接JOIN读取，不再每次GROUP BY重新统计
+"""
+
+from typing import List
+
+from sqlalchemy import text
+
+# 按期刊外键计数的来源表：(表名, 外键列, 计数列)
+COUNTER_SOURCES = (
+    ("ideas", "reference_journal_id", "reference_count"),
+    ("research_projects", "reference_journal_id", "reference_count"),
+    ("ideas", "target_journal_id", "target_count"),
+    ("research_projects", "target_journal_id", "target_count"),
+    ("journal_issues", "journal_id", "issues_count"),
+)
+
+
+def _counter_triggers(table: str, column: str, counter: str) -> List[str]:
+    """生成某个外键列对应的 INSERT / DELETE / UPDATE 触发器"""
+    name = f"trg_journal_stats_{table}_{column}"
+    increment = f"UPDATE journal_stats SET {counter} = {counter} + 1 WHERE journal_id = NEW.{column};"
+    decrement = f"UPDATE journal_stats SET {counter} = MAX({counter} - 1, 0) WHERE journal_id = OLD.{column};"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table}
+            WHEN NEW.{column} IS NOT NULL
+            BEGIN {increment} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table}
+            WHEN OLD.{column} IS NOT NULL
+            BEGIN {decrement} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {column} ON {table}
+            WHEN OLD.{column} IS NOT NEW.{column}
+            BEGIN {decrement} {increment} END""",
+    ]
+
+
+JOURNAL_STATS_TRIGGERS: List[str] = [
+    # 每个期刊都有一行统计，计数触发器只需UPDATE；期刊删除时由外键级联删除
+    """CREATE TRIGGER IF NOT EXISTS trg_journal_stats_journals_insert AFTER INSERT ON journals
+        BEGIN INSERT OR IGNORE INTO journal_stats (journal_id) VALUES (NEW.id); END""",
+] + [trigger for source in COUNTER_SOURCES for trigger in _counter_triggers(*source)]
+
+
+def _count_expression(counter: str) -> str:
+    """某个计数列的全量统计表达式（相关子查询，走各外键索引）"""
+    return " + ".join(
+        f"(SELECT COUNT(*) FROM {table} WHERE {column} = journals.id)"
+        for table, column, source_counter in COUNTER_SOURCES
+        if source_counter == counter
+    )
+
+
+REBUILD_JOURNAL_STATS_SQL = f"""
+    INSERT OR REPLACE INTO journal_stats (journal_id, reference_count, target_count, issues_count)
+    SELECT journals.id,
+           {_count_expression("reference_count")},
+           {_count_expression("target_count")},
+           {_count_expression("issues_count")}
+    FROM journals
+"""
+
+# 与全量统计不一致的期刊数量（重建前用于报告漂移）
+COUNT_DRIFT_SQL = f"""
+    SELECT COUNT(*) FROM journals
+    LEFT JOIN journal_stats ON journal_stats.journal_id = journals.id
+    WHERE journal_stats.journal_id IS NULL
+       OR journal_stats.reference_count != {_count_expression("reference_count")}
+       OR journal_stats.target_count != {_count_expression("target_count")}
+       OR journal_stats.issues_count != {_count_expression("issues_count")}
+"""
+
+
+def create_journal_stats_triggers(connection):
+    """创建计数触发器（幂等）"""
+    for statement in JOURNAL_STATS_TRIGGERS:
+        connection.execute(text(statement))
+
+
+def rebuild_journal_stats(connection) -> int:
+    """
+    全量重建期刊统计（修复用），在调用方的事务中执行
+
+    Returns:
+        重建前与实际统计不一致的期刊数量
+    """
+    drifted = connection.execute(text(COUNT_DRIFT_SQL)).scalar() or 0
+    connection.execute(text("DELETE FROM journal_stats WHERE journal_id NOT IN (SELECT id FROM journals)"))
+    connection.execute(text(REBUILD_JOURNAL_STATS_SQL))
+    return drifted
@@ -0,0 +1,130 @@
+"""
+研究方法使用次数（research_methods.usage_count）的触发器与对账
+使用次数 = 引用该方法名称的Ideas数 + 研究项目数，由SQLite触发器在 ideas、research_projects 写入的同一事务中维护，
+任何写入路径（路由、批量语句、脚本）都不需要再手动调整；
+研究方法新建或改名时按实际引用重新统计，漂移可通过一次GROUP BY对账修复
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+# 引用研究方法名称的来源表
+USAGE_SOURCES = ("ideas", "research_projects")
+
+INCREMENT_SQL = "UPDATE research_methods SET usage_count = COALESCE(usage_count, 0) + 1 WHERE name = NEW.research_method;"
+DECREMENT_SQL = "UPDATE research_methods SET usage_count = MAX(COALESCE(usage_count, 0) - 1, 0) WHERE name = OLD.research_method;"
+
+# 某个方法名称的实际引用数（相关子查询，用于单个方法的重新统计）
+_ACTUAL_USAGE_SQL = " + ".join(
+    f"(SELECT COUNT(*) FROM {table} WHERE research_method = research_methods.name)" for table in USAGE_SOURCES
+)
+
+
+def _usage_triggers(table: str) -> List[str]:
+    """来源表的 INSERT / DELETE / UPDATE 触发器"""
+    name = f"trg_research_method_usage_{table}"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table}
+            WHEN NEW.research_method IS NOT NULL
+            BEGIN {INCREMENT_SQL} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table}
+            WHEN OLD.research_method IS NOT NULL
+            BEGIN {DECREMENT_SQL} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF research_method ON {table}
+            WHEN OLD.research_method IS NOT NEW.research_method
+            BEGIN
+                UPDATE research_methods SET usage_count = MAX(COALESCE(usage_count, 0) - 1, 0)
+                WHERE name = OLD.research_method AND OLD.research_method IS NOT NULL;
+                UPDATE research_methods SET usage_count = COALESCE(usage_count, 0) + 1
+                WHERE name = NEW.research_method AND NEW.research_method IS NOT NULL;
+            END""",
+    ]
+
+
+RESEARCH_METHOD_USAGE_TRIGGERS: List[str] = [
+    trigger for table in USAGE_SOURCES for trigger in _usage_triggers(table)
+] + [
+    # 方法可能在Idea/项目引用之后才创建（或改名为已被引用的名称）：按实际引用重新统计
+    f"""CREATE TRIGGER IF NOT EXISTS trg_research_method_usage_methods_insert AFTER INSERT ON research_methods
+        BEGIN UPDATE research_methods SET usage_count = {_ACTUAL_USAGE_SQL} WHERE id = NEW.id; END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_research_method_usage_methods_rename AFTER UPDATE OF name ON research_methods
+        WHEN OLD.name IS NOT NEW.name
+        BEGIN UPDATE research_methods SET usage_count = {_ACTUAL_USAGE_SQL} WHERE id = NEW.id; END""",
+]
+
+# 全部方法的实际引用数：两张来源表各扫描一次，一次GROUP BY
+ACTUAL_USAGE_CTE = f"""
+    WITH actual_usage AS (
+        SELECT research_method AS name, COUNT(*) AS usage_count
+        FROM ({" UNION ALL ".join(f"SELECT research_method FROM {table}" for table in USAGE_SOURCES)})
+        WHERE research_method IS NOT NULL
+        GROUP BY research_method
+    )
+"""
+
+# 存储值与实际引用数不一致的方法
+USAGE_DRIFT_SQL = f"""
+    {ACTUAL_USAGE_CTE}
+    SELECT research_methods.id, research_methods.name,
+           research_methods.usage_count AS stored,
+           COALESCE(actual_usage.usage_count, 0) AS actual
+    FROM research_methods
+    LEFT JOIN actual_usage ON actual_usage.name = research_methods.name
+    WHERE research_methods.usage_count IS NOT COALESCE(actual_usage.usage_count, 0)
+    ORDER BY research_methods.name
+"""
+
+RECONCILE_USAGE_SQL = f"""
+    {ACTUAL_USAGE_CTE}
+    UPDATE research_methods
+    SET usage_count = COALESCE((SELECT usage_count FROM actual_usage WHERE actual_usage.name = research_methods.name), 0)
+    WHERE usage_count IS NOT COALESCE((SELECT usage_count FROM actual_usage WHERE actual_usage.name = research_methods.name), 0)
+"""
+
+# 没有任何Idea或研究项目引用的方法（按实际引用判断，不依赖计数）
+DELETE_UNUSED_SQL = f"""
+    DELETE FROM research_methods
+    WHERE {" AND ".join(
+        f"NOT EXISTS (SELECT 1 FROM {table} WHERE research_method = research_methods.name)" for table in USAGE_SOURCES
+    )}
+    RETURNING name
+"""
+
+
+def create_research_method_usage_triggers(connection) -> bool:
+    """
+    创建使用次数触发器（幂等）
+
+    Returns:
+        本次是否新建了触发器（新建时调用方应先对账一次，修正之前手动维护留下的漂移）
+    """
+    existed = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_research_method_usage_ideas_insert'"
+    )).first() is not None
+    for statement in RESEARCH_METHOD_USAGE_TRIGGERS:
+        connection.execute(text(statement))
+    return not existed
+
+
+def find_research_method_usage_drift(connection) -> List[Dict[str, Any]]:
+    """存储的使用次数与实际引用数不一致的方法"""
+    return [dict(row._mapping) for row in connection.execute(text(USAGE_DRIFT_SQL))]
+
+
+def reconcile_research_method_usage(connection) -> List[Dict[str, Any]]:
+    """
+    按实际引用重新统计全部方法的使用次数（修复用），在调用方的事务中执行
+
+    Returns:
+        修复前不一致的方法（id、name、stored、actual）
+    """
+    drifted = find_research_method_usage_drift(connection)
+    if drifted:
+        connection.execute(text(RECONCILE_USAGE_SQL))
+    return drifted
+
+
+def delete_unused_research_methods(connection) -> List[str]:
+    """一条DELETE删除没有任何引用的方法，返回删除的方法名称"""
+    return sorted(connection.execute(text(DELETE_UNUSED_SQL)).scalars())
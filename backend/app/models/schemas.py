@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Union, Dict, Any
 from datetime import datetime
 from enum import Enum
+import json
 
 # Research Method schemas (v4.7)
 class ResearchMethodBase(BaseModel):
@@ -61,6 +62,9 @@ class Collaborator(CollaboratorBase):
     created_at: datetime
     updated_at: datetime
     project_count: int = 0  # 参与的项目数量（计算属性，不存储在数据库）
+    project_status_counts: Dict[str, int] = {}  # 按项目状态的参与数量
+    idea_count: int = 0  # 作为负责人的Ideas数量
+    log_count: int = 0  # 交流记录数量
 
     class Config:
         from_attributes = True
@@ -134,6 +138,8 @@ class ResearchProject(ResearchProjectBase):
     start_date: datetime
     is_todo: bool
     todo_marked_at: Optional[datetime] = None
+    reference_journal_id: Optional[int] = None  # 参考期刊ID（期刊库中不存在时为空）
+    target_journal_id: Optional[int] = None  # 投稿期刊ID
     created_at: datetime
     updated_at: datetime
     collaborators: List[Collaborator] = []
@@ -145,6 +151,35 @@ class ResearchProject(ResearchProjectBase):
         from_attributes = True
 
 
+class CollaboratorBrief(BaseModel):
+    """合作者摘要（列表中只返回ID和姓名）"""
+    id: int
+    name: str
+
+
+class ResearchProjectSummary(BaseModel):
+    """研究项目列表摘要：不含交流记录正文，只返回记录数量和最新记录日期"""
+    id: int
+    title: str
+    research_method: Optional[str] = None
+    reference_journal: Optional[str] = None
+    target_journal: Optional[str] = None
+    reference_journal_id: Optional[int] = None
+    target_journal_id: Optional[int] = None
+    status: str
+    progress: float = 0.0
+    my_role: str
+    is_todo: bool = False
+    todo_marked_at: Optional[datetime] = None
+    start_date: Optional[datetime] = None
+    expected_completion: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    collaborators: List[CollaboratorBrief] = []
+    log_count: int = 0
+    latest_log_date: Optional[datetime] = None
+
+
 # Communication Log schemas
 class CommunicationLogBase(BaseModel):
     project_id: int
@@ -229,6 +264,10 @@ class CommunicationLog(CommunicationLogBase):
     class Config:
         from_attributes = True
 
+class RecentCommunicationLog(CommunicationLog):
+    """跨项目最近交流记录（附带项目标题）"""
+    project_title: str
+
 # File upload schemas
 class FileUploadResponse(BaseModel):
     message: str
@@ -236,6 +275,40 @@ class FileUploadResponse(BaseModel):
     errors: List[str] = []
 
 
+# Background job schemas
+class JobSubmitted(BaseModel):
+    """提交后台任务后的响应（HTTP 202）"""
+    job_id: str
+    kind: str
+    status: str
+    status_url: str
+
+
+class BackgroundJob(BaseModel):
+    """后台任务状态、进度和结果"""
+    id: str
+    kind: str
+    status: str
+    progress: float = Field(..., description="进度 0~1")
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator('result', mode='before')
+    @classmethod
+    def parse_result(cls, v):
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+    class Config:
+        from_attributes = True
+
+
 # System Config schemas
 class SystemConfigBase(BaseModel):
     key: str = Field(..., max_length=100)
@@ -329,6 +402,8 @@ class IdeaUpdate(BaseModel):
 class Idea(IdeaBase):
     """完整的Ideas数据模型 - 包含关联的负责人对象"""
     id: int
+    reference_journal_id: Optional[int] = Field(None, description="参考期刊ID（期刊库中不存在时为空）")
+    target_journal_id: Optional[int] = Field(None, description="投稿期刊ID")
     created_at: datetime
     updated_at: datetime
 
@@ -439,6 +514,46 @@ class BatchDeleteRequest(BaseModel):
     ids: List[int] = Field(..., min_items=1, description="要删除的记录ID列表")
 
 
+class JournalMergeRequest(BaseModel):
+    """期刊合并请求模型"""
+    target_id: int = Field(..., description="保留的期刊ID")
+    source_ids: List[int] = Field(..., min_items=1, description="合并后删除的期刊ID列表")
+
+
+class ResearchProjectBatchItem(BaseModel):
+    """研究项目批量更新中的一项（只传需要修改的字段）"""
+    id: int = Field(..., description="项目ID")
+    status: Optional[ProjectStatus] = None
+    progress: Optional[float] = Field(None, ge=0, le=100)
+    is_todo: Optional[bool] = None
+    my_role: Optional[str] = None
+    research_method: Optional[str] = Field(None, min_length=1, max_length=2000)
+    start_date: Optional[datetime] = None
+    expected_completion: Optional[datetime] = None
+    target_journal: Optional[str] = None
+    reference_journal: Optional[str] = Field(None, max_length=200)
+
+    @field_validator('my_role')
+    @classmethod
+    def validate_my_role(cls, v):
+        if v is not None:
+            valid_roles = ['first_author', 'corresponding_author']
+            if v not in valid_roles:
+                raise ValueError(f'my_role must be one of {valid_roles}')
+        return v
+
+
+class ResearchProjectBatchRequest(BaseModel):
+    """研究项目批量更新请求模型"""
+    items: List[ResearchProjectBatchItem] = Field(..., min_items=1, max_items=1000, description="各项目的部分更新")
+    atomic: bool = Field(False, description="为true时任一项失败则不做任何修改")
+
+
+class IdeaBatchConvertRequest(BaseModel):
+    """Ideas批量转化为研究项目请求模型"""
+    ids: List[int] = Field(..., min_items=1, max_items=500, description="要转化的Idea ID列表")
+
+
 class BatchUpdateMaturityRequest(BaseModel):
     """批量更新成熟度请求模型"""
     ids: List[int] = Field(..., min_items=1, description="要更新的记录ID列表")
@@ -0,0 +1,165 @@
+"""
+全文检索索引（SQLite FTS5）
+每个可搜索的表对应一张外部内容（external content）FTS5虚拟表，使用trigram分词器，
+中文无需分词即可做子串匹配；索引由触发器在源表写入的同一事务中同步维护，查询按bm25相关度排序
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+from sqlalchemy.sql.elements import ColumnElement
+
+# trigram分词器只能索引至少3个字符的片段，更短的关键词退化为LIKE匹配
+MIN_MATCH_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """一次搜索对应的过滤条件；rank为bm25表达式（值越小越相关），无MATCH条件时为None"""
+    condition: ColumnElement
+    rank: Optional[ColumnElement]
+
+
+class SearchIndex:
+    """
+    一张FTS5外部内容表
+
+    Args:
+        source: 源表名，FTS表名为 {source}_fts，rowid对应源表id
+        columns: 被索引的列及其bm25权重
+    """
+
+    def __init__(self, source: str, columns: Sequence[Tuple[str, float]]):
+        self.source = source
+        self.name = f"{source}_fts"
+        self.columns = [name for name, _ in columns]
+        self.weights = [weight for _, weight in columns]
+        self.table = table(self.name, column("rowid"), *(column(name) for name in self.columns))
+
+    @property
+    def rowid(self):
+        return self.table.c.rowid
+
+    def create_statements(self) -> List[str]:
+        """虚拟表和同步触发器的DDL（幂等）"""
+        column_list = ", ".join(self.columns)
+        new_values = ", ".join(f"NEW.{name}" for name in self.columns)
+        old_values = ", ".join(f"OLD.{name}" for name in self.columns)
+        insert_new = f"INSERT INTO {self.name} (rowid, {column_list}) VALUES (NEW.id, {new_values});"
+        # 外部内容表删除时需要提供旧值，FTS5据此删除对应的词条
+        delete_old = (
+            f"INSERT INTO {self.name} ({self.name}, rowid, {column_list}) "
+            f"VALUES ('delete', OLD.id, {old_values});"
+        )
+        return [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5(
+                {column_list}, content='{self.source}', content_rowid='id', tokenize='trigram'
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{self.name}_insert AFTER INSERT ON {self.source}
+                BEGIN {insert_new} END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{self.name}_delete AFTER DELETE ON {self.source}
+                BEGIN {delete_old} END""",
+            # 只在被索引的列变化时重建词条（usage_count、updated_at等更新不触发）
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{self.name}_update AFTER UPDATE OF {column_list} ON {self.source}
+                BEGIN {delete_old} {insert_new} END""",
+        ]
+
+    def search(self, keyword: Optional[str], columns: Optional[Sequence[str]] = None) -> Optional[SearchFilter]:
+        """
+        构造搜索条件（调用方需 JOIN self.table ON self.rowid == 源表.id）
+
+        关键词按空白拆分，各词之间为AND关系；不少于3个字符的词走FTS MATCH，
+        更短的词（如两个字的中文词）在被搜索列上做LIKE匹配
+
+        Args:
+            keyword: 用户输入的搜索词
+            columns: 只在这些列中搜索，默认所有被索引的列
+
+        Returns:
+            SearchFilter；关键词为空时返回None
+        """
+        terms = (keyword or "").split()
+        if not terms:
+            return None
+        columns = list(columns or self.columns)
+
+        long_terms = [term for term in terms if len(term) >= MIN_MATCH_LENGTH]
+        short_terms = [term for term in terms if len(term) < MIN_MATCH_LENGTH]
+
+        conditions = []
+        rank = None
+        if long_terms:
+            conditions.append(literal_column(self.name).op("MATCH")(build_match_query(long_terms, columns)))
+            rank = func.bm25(literal_column(self.name), *self.weights)
+        for term in short_terms:
+            conditions.append(or_(*(self.table.c[name].contains(term, autoescape=True) for name in columns)))
+
+        return SearchFilter(condition=and_(*conditions), rank=rank)
+
+    def matching_ids(self, keyword: Optional[str], columns: Optional[Sequence[str]] = None):
+        """匹配关键词的源表id子查询（用于 源表.id IN (...) 过滤，不需要相关度时使用）；关键词为空时返回None"""
+        search_filter = self.search(keyword, columns)
+        if search_filter is None:
+            return None
+        return select(self.rowid).select_from(self.table).where(search_filter.condition)
+
+
+def build_match_query(terms: Sequence[str], columns: Sequence[str]) -> str:
+    """把关键词转换为FTS5查询语法：每个词作为短语（转义双引号），AND连接，并限定列"""
+    phrases = " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    return "{" + " ".join(columns) + "} : (" + phrases + ")"
+
+
+SEARCH_INDEXES = {
+    index.source: index
+    for index in (
+        SearchIndex("journals", [("name", 2.0), ("notes", 1.0)]),
+        SearchIndex("ideas", [
+            ("project_name", 3.0), ("project_description", 1.0), ("research_method", 1.5),
+            ("reference_paper", 1.0), ("reference_journal", 1.0), ("target_journal", 1.0),
+        ]),
+        SearchIndex("research_projects", [
+            ("title", 3.0), ("idea_description", 1.0), ("research_method", 1.5),
+            ("reference_paper", 1.0), ("reference_journal", 1.0), ("target_journal", 1.0),
+        ]),
+        SearchIndex("communication_logs", [("title", 2.0), ("content", 1.0), ("outcomes", 1.0)]),
+        SearchIndex("prompts", [("title", 3.0), ("content", 1.0), ("description", 1.5)]),
+        SearchIndex("collaborators", [("name", 3.0), ("background", 1.0)]),
+    )
+}
+
+
+def existing_search_indexes(connection) -> List[str]:
+    """已存在的FTS表名"""
+    names = [index.name for index in SEARCH_INDEXES.values()]
+    rows = connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ("
+             + ", ".join(f"'{name}'" for name in names) + ")")
+    )
+    return [row[0] for row in rows]
+
+
+def create_search_indexes(connection) -> List[str]:
+    """
+    创建FTS表和同步触发器（幂等），首次创建的FTS表按源表现有数据构建索引
+
+    Returns:
+        本次新建的FTS表名
+    """
+    existing = set(existing_search_indexes(connection))
+    created = []
+    for index in SEARCH_INDEXES.values():
+        for statement in index.create_statements():
+            connection.execute(text(statement))
+        if index.name not in existing:
+            connection.execute(text(f"INSERT INTO {index.name} ({index.name}) VALUES ('rebuild')"))
+            created.append(index.name)
+    return created
+
+
+def rebuild_search_indexes(connection) -> List[str]:
+    """按源表全量重建所有FTS索引（修复用），在调用方的事务中执行"""
+    for index in SEARCH_INDEXES.values():
+        connection.execute(text(f"INSERT INTO {index.name} ({index.name}) VALUES ('rebuild')"))
+    return [index.name for index in SEARCH_INDEXES.values()]
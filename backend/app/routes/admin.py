@@ -0,0 +1,92 @@
+"""
+运维诊断API路由
+提供SQL统计、慢查询日志、统计表修复等运维功能（单用户模式，无需管理员认证）
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+import logging
+
+from ..core.query_profiler import query_profiler
+from ..core.slow_query_log import slow_query_log
+from ..models.database import get_read_db, write_engine
+from ..models.journal_stats import rebuild_journal_stats
+from ..models.search_index import rebuild_search_indexes
+from ..services.job_queue import job_queue
+from ..services.validation import ValidationService
+from ..utils.response import job_accepted_response, success_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/query-stats")
+async def get_query_stats(limit: int = Query(50, ge=1, le=500, description="返回的最近请求数量")):
+    """获取各路由的SQL统计（按平均查询次数倒序）和最近请求的明细"""
+    return success_response(data=query_profiler.snapshot(limit=limit))
+
+
+@router.delete("/query-stats")
+async def reset_query_stats():
+    """清空SQL统计"""
+    query_profiler.reset()
+    return success_response(message="SQL统计已清空")
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="返回的最近慢查询数量"),
+    min_duration_ms: float = Query(0, ge=0, description="只返回耗时不低于该值的记录")
+):
+    """获取最近的慢查询（SQL、参数、耗时、调用路由和查询计划）及按SQL汇总的统计"""
+    return success_response(data=slow_query_log.snapshot(limit=limit, min_duration_ms=min_duration_ms))
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries():
+    """清空内存中的慢查询记录（日志文件保留）"""
+    slow_query_log.reset()
+    return success_response(message="慢查询记录已清空")
+
+
+@router.post("/journal-stats/rebuild")
+def rebuild_journal_stats_table():
+    """全量重建期刊统计物化表（journal_stats），返回重建前不一致的期刊数量"""
+    try:
+        with write_engine.begin() as conn:
+            drifted = rebuild_journal_stats(conn)
+        return success_response(data={"drifted_journals": drifted}, message="期刊统计已重建")
+    except Exception as e:
+        logger.error(f"重建期刊统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"重建期刊统计失败: {str(e)}")
+
+
+@router.post("/search-index/rebuild")
+def rebuild_search_index():
+    """按源表全量重建全文检索索引（FTS5），返回重建的索引表"""
+    try:
+        with write_engine.begin() as conn:
+            rebuilt = rebuild_search_indexes(conn)
+        return success_response(data={"indexes": rebuilt}, message="全文检索索引已重建")
+    except Exception as e:
+        logger.error(f"重建全文检索索引失败: {e}")
+        raise HTTPException(status_code=500, detail=f"重建全文检索索引失败: {str(e)}")
+
+
+@router.post("/consistency-check")
+def check_data_consistency(
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）"),
+    db: Session = Depends(get_read_db)
+):
+    """检查整体数据一致性（孤立的交流日志、没有合作者的项目、重复的合作者名称）"""
+    if as_job:
+        job_id = job_queue.enqueue(
+            "consistency_check", lambda context: success_response(data=ValidationService.check_data_consistency(context.db))
+        )
+        return job_accepted_response(job_id, "consistency_check")
+
+    try:
+        return success_response(data=ValidationService.check_data_consistency(db))
+    except Exception as e:
+        logger.error(f"数据一致性检查失败: {e}")
+        raise HTTPException(status_code=500, detail=f"数据一致性检查失败: {str(e)}")
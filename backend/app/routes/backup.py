@@ -1,7 +1,8 @@
 """
 数据库备份管理API路由
 """
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any
 from datetime import datetime
 import tempfile
@@ -11,6 +12,10 @@ from sqlalchemy.orm import Session
 
 from ..utils.backup_manager import BackupManager
 from ..models.database import get_db
+from ..services.collaboration_graph import collaboration_graph
+from ..services.job_queue import JobContext, job_queue
+from ..services.journal_catalog import journal_catalog
+from ..utils.response import job_accepted_response
 
 router = APIRouter()
 
@@ -64,64 +69,95 @@ async def list_backups() -> Dict[str, Any]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取备份列表失败: {str(e)}")
 
+def _create_backup(reason: str) -> Dict[str, Any]:
+    """创建备份并返回新备份信息（同步执行）"""
+    manager = BackupManager()
+    backup_path = manager.create_backup(reason)
+
+    if backup_path:
+        # 获取新备份信息
+        backups = manager.list_backups()
+        new_backup = next((b for b in backups if b["name"] == backup_path.name), None)
+
+        if new_backup:
+            return {
+                "success": True,
+                "message": "备份创建成功",
+                "data": {
+                    "id": new_backup["name"],
+                    "name": new_backup["name"],
+                    "size": new_backup["size"],
+                    "sizeFormatted": _format_size(new_backup["size"]),
+                    "created": new_backup["created"].isoformat(),
+                    "createdFormatted": new_backup["created"].strftime("%Y-%m-%d %H:%M:%S")
+                }
+            }
+
+    raise HTTPException(status_code=500, detail="备份创建失败")
+
+
+def _restore_backup(backup_id: str) -> Dict[str, Any]:
+    """恢复指定备份（同步执行）"""
+    manager = BackupManager()
+
+    # 验证备份是否存在
+    backups = manager.list_backups()
+    backup_exists = any(b["name"] == backup_id for b in backups)
+
+    if not backup_exists:
+        raise HTTPException(status_code=404, detail="备份不存在")
+
+    # 执行恢复
+    success = manager.restore_backup(backup_id)
+
+    if success:
+        # 恢复不经过应用的SQL写入，不会触发语句级失效通知：手动使进程内缓存失效
+        journal_catalog.invalidate()
+        collaboration_graph.invalidate()
+        return {
+            "success": True,
+            "message": f"数据库已成功恢复到备份: {backup_id}"
+        }
+    else:
+        raise HTTPException(status_code=500, detail="恢复失败")
+
+
+def _restore_backup_job(context: JobContext, backup_id: str) -> Dict[str, Any]:
+    """后台任务：恢复备份（数据库内容被替换为备份后重新登记本任务，才能查询到结果）"""
+    result = _restore_backup(backup_id)
+    job_queue.reattach(context)
+    return result
+
+
 @router.post("/create")
 async def create_backup(
-    reason: str = "手动备份"
+    reason: str = "手动备份",
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）")
 ) -> Dict[str, Any]:
     """创建新备份"""
+    if as_job:
+        job_id = await job_queue.submit("backup_create", lambda context: _create_backup(reason))
+        return job_accepted_response(job_id, "backup_create")
+
     try:
-        manager = BackupManager()
-        backup_path = manager.create_backup(reason)
-        
-        if backup_path:
-            # 获取新备份信息
-            backups = manager.list_backups()
-            new_backup = next((b for b in backups if b["name"] == backup_path.name), None)
-            
-            if new_backup:
-                return {
-                    "success": True,
-                    "message": "备份创建成功",
-                    "data": {
-                        "id": new_backup["name"],
-                        "name": new_backup["name"],
-                        "size": new_backup["size"],
-                        "sizeFormatted": _format_size(new_backup["size"]),
-                        "created": new_backup["created"].isoformat(),
-                        "createdFormatted": new_backup["created"].strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                }
-        
-        raise HTTPException(status_code=500, detail="备份创建失败")
+        return await run_in_threadpool(_create_backup, reason)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"创建备份失败: {str(e)}")
 
 @router.post("/restore/{backup_id}")
 async def restore_backup(
-    backup_id: str
+    backup_id: str,
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）")
 ) -> Dict[str, Any]:
     """恢复指定备份"""
+    if as_job:
+        job_id = await job_queue.submit("backup_restore", _restore_backup_job, backup_id)
+        return job_accepted_response(job_id, "backup_restore")
+
     try:
-        manager = BackupManager()
-        
-        # 验证备份是否存在
-        backups = manager.list_backups()
-        backup_exists = any(b["name"] == backup_id for b in backups)
-        
-        if not backup_exists:
-            raise HTTPException(status_code=404, detail="备份不存在")
-        
-        # 执行恢复
-        success = manager.restore_backup(backup_id)
-        
-        if success:
-            return {
-                "success": True,
-                "message": f"数据库已成功恢复到备份: {backup_id}"
-            }
-        else:
-            raise HTTPException(status_code=500, detail="恢复失败")
-            
+        return await run_in_threadpool(_restore_backup, backup_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,22 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import delete
-from typing import List
+from sqlalchemy import delete, select
+from typing import List, Optional
 from pydantic import BaseModel
-import pandas as pd
-import io
+import functools
+import os
 import re
+import shutil
+import tempfile
 from datetime import datetime
 from ..models import (
     get_db, Collaborator, CollaboratorSchema,
     CollaboratorCreate, CollaboratorUpdate, FileUploadResponse,
     project_collaborators, idea_responsible_persons
 )
+from ..models.schemas import BatchDeleteRequest
+from ..models.search_index import SEARCH_INDEXES
+from ..core.config import settings
 from ..services import AuditService
+from ..services.collaboration_graph import collaboration_graph
+from ..services.collaborator_import import import_collaborator_workbook
+from ..services.job_queue import JobContext, job_queue
+from ..services.collaborator_stats import (
+    IDEA_COUNT, LOG_COUNT, PROJECT_COUNT, apply_collaborator_stats, with_collaborator_stats
+)
 from ..utils import DataValidator
+from ..utils.response import job_accepted_response
+from ..utils.crud_base import CRUDBase, FilterField, Ordering
 
 router = APIRouter()
 
+# 列表筛选和排序字段白名单
+collaborator_crud = CRUDBase[Collaborator, CollaboratorCreate, CollaboratorUpdate](
+    Collaborator,
+    filters={
+        "is_deleted": FilterField("eq", Collaborator.is_deleted),
+        "search": FilterField("fts", index=SEARCH_INDEXES["collaborators"]),
+    },
+    orderings={
+        "name": Collaborator.name,
+        "created_at": Collaborator.created_at,
+        "updated_at": Collaborator.updated_at,
+        "project_count": Ordering(PROJECT_COUNT, nullable=False),
+        "idea_count": Ordering(IDEA_COUNT, nullable=False),
+        "log_count": Ordering(LOG_COUNT, nullable=False),
+    },
+)
+
 # Request Models
 class GroupCreateRequest(BaseModel):
     group_name: str
@@ -26,22 +57,32 @@ class GroupCreateRequest(BaseModel):
 
 @router.get("/", response_model=List[CollaboratorSchema])
 async def get_collaborators(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     include_deleted: bool = False,
+    search: Optional[str] = Query(None, description="全文检索：姓名、背景"),
+    ordering: Optional[str] = Query(None, description="排序，逗号分隔，-前缀倒序（如 name、-created_at）"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
     db: Session = Depends(get_db)
 ):
-    """获取合作者列表"""
-    query = db.query(Collaborator)
-    if not include_deleted:
-        query = query.filter(Collaborator.is_deleted == False)
-    collaborators = query.offset(skip).limit(limit).all()
-
-    # 计算每个合作者的项目数（利用ORM关系）
-    for collaborator in collaborators:
-        collaborator.project_count = len(collaborator.projects)
-
-    return collaborators
+    """获取合作者列表（项目数按状态、Ideas数、交流记录数由分组子查询在同一次查询中算出）"""
+    try:
+        page = collaborator_crud.paginate(
+            db,
+            with_collaborator_stats(select(Collaborator)),
+            filters={"is_deleted": None if include_deleted else False, "search": search},
+            ordering=ordering,
+            cursor=cursor,
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    return [apply_collaborator_stats(row) for row in page.rows]
 
 @router.post("/", response_model=CollaboratorSchema)
 async def create_collaborator(
@@ -66,99 +107,66 @@ async def create_collaborator(
 
 # ===== 具体路径的静态路由 =====
 
+def _collaborator_import_job(context: JobContext, path: str, chunk_size: int):
+    """后台任务：导入已保存到临时文件的Excel"""
+    with open(path, "rb") as f:
+        result = import_collaborator_workbook(context.db, f, chunk_size, progress=context.report)
+    return FileUploadResponse(
+        message=f"Successfully imported {result.imported_count} collaborator records",
+        imported_count=result.imported_count,
+        errors=result.errors
+    ).model_dump()
+
+
+def _spool_upload(file: UploadFile) -> str:
+    """把上传文件复制到上传目录下的临时文件（请求结束后UploadFile即关闭，后台任务需要自己的副本）"""
+    file.file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=settings.UPLOAD_DIR, suffix=".xlsx", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        return tmp.name
+
+
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_collaborators_file(
     file: UploadFile = File(...),
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）"),
     db: Session = Depends(get_db)
 ):
-    """上传Excel文件批量导入合作者信息"""
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    """
+    上传Excel文件批量导入合作者信息
+
+    - 只读模式流式解析.xlsx，按块（COLLABORATOR_IMPORT_CHUNK_SIZE）一次IN查询匹配已有姓名，批量插入/更新
+    - 已存在的合作者（包括已删除的）更新背景并恢复，其余新建
+    - 解析和写入在线程池中执行，不阻塞事件循环；as_job=true 时提交为后台任务，进度和结果见 GET /api/jobs/{id}
+    """
+    if not file.filename.endswith('.xlsx'):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only Excel files (.xlsx, .xls) are supported"
+            detail="Only Excel files (.xlsx) are supported"
         )
 
-    try:
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-
-        imported_count = 0
-        errors = []
-
-        # Expected columns mapping for collaborators
-        column_mapping = {
-            'name': ['姓名', 'name', 'Name', '名字'],
-            'gender': ['性别', 'gender', 'Gender'],
-            'class_name': ['班级', 'class', 'Class', '专业班级'],
-            'future_plan': ['未来规划', 'future_plan', 'Future Plan', '规划'],
-            'background': ['具体情况和背景', 'background', 'Background', '背景', '情况'],
-            'contact_info': ['联系方式', 'contact', 'Contact', 'Email', '邮箱']
-        }
-
-        # Map columns
-        mapped_columns = {}
-        for standard_col, possible_names in column_mapping.items():
-            for col_name in df.columns:
-                if col_name in possible_names:
-                    mapped_columns[standard_col] = col_name
-                    break
-
-        if 'name' not in mapped_columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Name column (姓名) is required"
-            )
-
-        for index, row in df.iterrows():
-            try:
-                collaborator_data = {}
-
-                # Map required fields
-                collaborator_data['name'] = str(row[mapped_columns['name']])[:100]
-
-                # Map optional fields
-                for field, col_name in mapped_columns.items():
-                    if field != 'name' and col_name in df.columns:
-                        value = row[col_name]
-                        if pd.notna(value):
-                            if field in ['gender', 'class_name', 'contact_info']:
-                                collaborator_data[field] = str(value)[:100 if field != 'contact_info' else 200]
-                            else:
-                                collaborator_data[field] = str(value)
-
-                # Check if collaborator already exists (including soft deleted)
-                existing = db.query(Collaborator).filter(
-                    Collaborator.name == collaborator_data['name']
-                ).first()
-
-                if existing:
-                    # Update existing collaborator
-                    for key, value in collaborator_data.items():
-                        if key != 'name':  # Don't update name
-                            setattr(existing, key, value)
-                    # 如果是已删除的，恢复它
-                    if existing.is_deleted:
-                        existing.is_deleted = False
-                        existing.deleted_at = None
-                else:
-                    # Create new collaborator
-                    db_collaborator = Collaborator(**collaborator_data)
-                    db.add(db_collaborator)
-
-                imported_count += 1
-
-            except Exception as e:
-                errors.append(f"Row {index + 1}: {str(e)}")
-
-        db.commit()
+    if as_job:
+        path = await run_in_threadpool(_spool_upload, file)
+        job_id = await job_queue.submit(
+            "collaborator_import", _collaborator_import_job, path, settings.COLLABORATOR_IMPORT_CHUNK_SIZE,
+            cleanup=functools.partial(os.remove, path)
+        )
+        return job_accepted_response(job_id, "collaborator_import")
 
+    try:
+        result = await run_in_threadpool(
+            import_collaborator_workbook, db, file.file, settings.COLLABORATOR_IMPORT_CHUNK_SIZE
+        )
         return FileUploadResponse(
-            message=f"Successfully imported {imported_count} collaborator records",
-            imported_count=imported_count,
-            errors=errors
+            message=f"Successfully imported {result.imported_count} collaborator records",
+            imported_count=result.imported_count,
+            errors=result.errors
         )
 
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing file: {str(e)}"
@@ -201,29 +209,34 @@ async def clean_collaborator_names(
 @router.post("/create-batch")
 async def create_collaborators_batch(
     collaborators: List[CollaboratorCreate],
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """批量创建合作者"""
+    """批量创建合作者（一次IN查询跳过已存在的姓名，一条多行INSERT写入，审计记录批量写入）"""
     try:
-        created_collaborators = []
+        # 请求中重复的姓名只创建第一条
+        pending = {}
         for collaborator_data in collaborators:
-            # 检查是否已存在
-            existing = db.query(Collaborator).filter(
-                Collaborator.name == collaborator_data.name
-            ).first()
+            pending.setdefault(collaborator_data.name, collaborator_data)
 
-            if not existing:
-                db_collaborator = Collaborator(**collaborator_data.model_dump())
-                db.add(db_collaborator)
-                created_collaborators.append(db_collaborator)
+        existing = set(db.execute(
+            select(Collaborator.name).where(Collaborator.name.in_(list(pending)))
+        ).scalars()) if pending else set()
 
-        db.commit()
+        created_ids = collaborator_crud.bulk_create(
+            db,
+            [data for name, data in pending.items() if name not in existing],
+            audit=True,
+            ip_address=request.client.host if request.client else None
+        )
 
         return {
-            "message": f"成功创建 {len(created_collaborators)} 个合作者",
-            "created_count": len(created_collaborators)
+            "message": f"成功创建 {len(created_ids)} 个合作者",
+            "created_count": len(created_ids)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"批量创建失败: {str(e)}")
@@ -265,6 +278,53 @@ async def create_collaborator_group(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"创建组失败: {str(e)}")
 
+@router.post("/check-dependencies")
+async def check_collaborators_dependencies(
+    request_data: BatchDeleteRequest,
+    db: Session = Depends(get_db)
+):
+    """批量检查合作者的依赖关系（批量删除前使用），不存在的ID返回 exists=false"""
+    dependencies = DataValidator.check_collaborators_dependencies(request_data.ids, db)
+    results = list(dependencies.values())
+    existing = [item for item in results if item["exists"]]
+    return {
+        "results": results,
+        "summary": {
+            "total": len(results),
+            "not_found_ids": [collaborator_id for collaborator_id, item in dependencies.items() if not item["exists"]],
+            "safe_to_delete_ids": [item["collaborator_id"] for item in existing if item["recommendation"] == "safe_to_delete"],
+            "soft_delete_only_ids": [item["collaborator_id"] for item in existing if item["recommendation"] == "soft_delete_only"],
+            "cannot_delete_ids": [item["collaborator_id"] for item in existing if item["recommendation"] == "cannot_delete"],
+        }
+    }
+
+@router.get("/graph")
+def get_collaboration_graph(
+    min_weight: int = Query(1, ge=1, description="只返回权重（共同项目数 + 共同Idea数）不低于该值的边"),
+    include_isolated: bool = Query(True, description="是否返回没有合作关系的合作者")
+):
+    """
+    合作关系图（进程内缓存，关联表变化后重建）
+
+    节点为未删除的合作者，边权重为共同参与的项目数与共同负责的Idea数之和；
+    节点附带度、加权度、度中心性、特征向量中心性和连通分量编号（0为最大分量）
+    """
+    try:
+        return collaboration_graph.graph(min_weight=min_weight, include_isolated=include_isolated)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取合作关系图失败: {str(e)}")
+
+@router.get("/graph/{collaborator_id}/neighbors")
+def get_collaborator_neighbors(
+    collaborator_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="最多返回的合作者数量，默认全部")
+):
+    """某个合作者的合作者（按合作权重降序），附带该合作者的度和中心性"""
+    result = collaboration_graph.neighbors(collaborator_id, limit=limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="合作者不存在")
+    return result
+
 @router.get("/deleted/list", response_model=List[CollaboratorSchema])
 async def get_deleted_collaborators(
     skip: int = 0,
@@ -343,20 +403,20 @@ async def get_collaborator_projects(collaborator_id: int, db: Session = Depends(
 @router.get("/{collaborator_id}", response_model=CollaboratorSchema)
 async def get_collaborator(collaborator_id: int, db: Session = Depends(get_db)):
     """获取单个合作者详情"""
-    collaborator = db.query(Collaborator).filter(
-        Collaborator.id == collaborator_id,
-        Collaborator.is_deleted == False
+    row = db.execute(
+        with_collaborator_stats(select(Collaborator)).where(
+            Collaborator.id == collaborator_id,
+            Collaborator.is_deleted == False
+        )
     ).first()
-    if not collaborator:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Collaborator not found"
         )
 
-    # 计算项目数
-    collaborator.project_count = len(collaborator.projects)
-
-    return collaborator
+    # 项目数等统计
+    return apply_collaborator_stats(row)
 
 @router.put("/{collaborator_id}", response_model=CollaboratorSchema)
 async def update_collaborator(
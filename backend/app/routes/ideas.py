@@ -4,55 +4,91 @@ Ideas管理路由 - 负责人外键化版本
 包含转化为研究项目功能（自动添加负责人到合作者列表）
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Optional
 from datetime import datetime
 import logging
 
-from ..models import get_db, Idea, ResearchProject, IdeaCreate, IdeaUpdate, IdeaSchema, Collaborator
-from ..models.schemas import BatchDeleteRequest, BatchUpdateMaturityRequest
+from ..models import get_db, get_async_db, Idea, ResearchProject, IdeaCreate, IdeaUpdate, IdeaSchema, Collaborator
+from ..models.schemas import BatchDeleteRequest, BatchUpdateMaturityRequest, IdeaBatchConvertRequest
+from ..models.search_index import SEARCH_INDEXES
 from ..services.audit import AuditService
-from ..utils.crud_base import CRUDBase
+from ..services.idea_conversion import convert_ideas_to_projects
+from ..utils.crud_base import CRUDBase, FilterField
 from ..utils.response import success_response
-from ..utils.research_method_helper import update_research_method_usage
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# 创建CRUD实例
-idea_crud = CRUDBase[Idea, IdeaCreate, IdeaUpdate](Idea)
+# 创建CRUD实例（列表筛选和排序字段白名单）
+idea_crud = CRUDBase[Idea, IdeaCreate, IdeaUpdate](
+    Idea,
+    filters={
+        "search": FilterField("fts", index=SEARCH_INDEXES["ideas"]),
+        "maturity": FilterField("eq", Idea.maturity),
+        "research_method": FilterField("eq", Idea.research_method),
+        "responsible_person_id": FilterField("eq", Idea.responsible_person_id),
+        "created_at": FilterField("range", Idea.created_at),
+    },
+    orderings={
+        "created_at": Idea.created_at,
+        "updated_at": Idea.updated_at,
+        "project_name": Idea.project_name,
+        "maturity": Idea.maturity,
+    },
+    default_ordering="-created_at",
+)
+
+# 序列化IdeaSchema所需的负责人关联（异步会话不支持懒加载）
+IDEA_LOAD_OPTIONS = (
+    selectinload(Idea.responsible_person),
+    selectinload(Idea.responsible_persons),
+)
 
 @router.get("/", response_model=List[IdeaSchema])
 async def get_ideas(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     maturity: Optional[str] = None,
     responsible_person_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    research_method: Optional[str] = None,
+    search: Optional[str] = Query(None, description="全文检索：项目名称、描述、来源等"),
+    created_from: Optional[datetime] = Query(None, description="创建时间下限"),
+    created_to: Optional[datetime] = Query(None, description="创建时间上限"),
+    ordering: Optional[str] = Query(None, description="排序，逗号分隔，-前缀倒序（默认 -created_at）"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取Ideas列表（预加载负责人信息）"""
+    """获取Ideas列表（预加载负责人信息，默认按创建时间倒序，排序在数据库中完成后再分页）"""
     try:
-        # 使用joinedload预加载responsible_person和responsible_persons关系，避免N+1查询
-        query = db.query(Idea).options(
-            joinedload(Idea.responsible_person),
-            joinedload(Idea.responsible_persons)
+        # 预加载responsible_person和responsible_persons关系，避免N+1查询
+        page = await idea_crud.paginate_async(
+            db,
+            select(Idea).options(*IDEA_LOAD_OPTIONS),
+            filters={
+                "search": search,
+                "maturity": maturity,
+                "research_method": research_method,
+                "responsible_person_id": responsible_person_id,
+                "created_at": (created_from, created_to),
+            },
+            ordering=ordering,
+            cursor=cursor,
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
         )
-
-        if maturity:
-            query = query.filter(Idea.maturity == maturity)
-        if responsible_person_id:
-            query = query.filter(Idea.responsible_person_id == responsible_person_id)
-
-        ideas = query.offset(skip).limit(limit).all()
-
-        # 按创建时间倒序排序
-        ideas.sort(key=lambda x: x.created_at, reverse=True)
-
-        return ideas
+        page.set_headers(response)
+        return page.scalars()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取Ideas列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取Ideas列表失败: {str(e)}")
@@ -61,11 +97,11 @@ async def get_ideas(
 async def get_idea(
     idea_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取单个Idea详情"""
     try:
-        idea = idea_crud.get(db, id=idea_id)
+        idea = await db.get(Idea, idea_id, options=list(IDEA_LOAD_OPTIONS))
         if not idea:
             raise HTTPException(status_code=404, detail="Idea not found")
         return idea
@@ -106,10 +142,6 @@ async def create_idea(
             if persons and not new_idea.responsible_person_id:
                 new_idea.responsible_person_id = persons[0].id
 
-        # 更新研究方法使用次数
-        if new_idea.research_method:
-            update_research_method_usage(db, new_idea.research_method, 1)
-
         db.commit()
         db.refresh(new_idea)
 
@@ -152,9 +184,6 @@ async def update_idea(
         if not db_idea:
             raise HTTPException(status_code=404, detail="Idea not found")
 
-        # 保存旧的研究方法，用于更新usage_count
-        old_research_method = db_idea.research_method
-
         # 验证maturity值（如果提供）
         if idea_update.maturity and idea_update.maturity not in ['mature', 'immature']:
             raise HTTPException(status_code=400, detail="Maturity must be 'mature' or 'immature'")
@@ -188,14 +217,6 @@ async def update_idea(
             if persons and not db_idea.responsible_person_id:
                 db_idea.responsible_person_id = persons[0].id
 
-        # 更新研究方法使用次数
-        new_research_method = db_idea.research_method
-        if old_research_method != new_research_method:
-            if old_research_method:
-                update_research_method_usage(db, old_research_method, -1)
-            if new_research_method:
-                update_research_method_usage(db, new_research_method, 1)
-
         db.commit()
         db.refresh(db_idea)
 
@@ -235,19 +256,12 @@ async def delete_idea(
         if not db_idea:
             raise HTTPException(status_code=404, detail="Idea not found")
 
-        # 保存研究方法，用于更新usage_count
-        research_method = db_idea.research_method
-
         # 使用序列化服务记录审计日志
         old_values = AuditService.serialize_model_instance(db_idea)
 
         # 使用CRUD基类删除
         idea_crud.remove(db, id=idea_id)
 
-        # 更新研究方法使用次数
-        if research_method:
-            update_research_method_usage(db, research_method, -1)
-
         # 记录审计日志
         try:
             AuditService.log_delete(
@@ -306,12 +320,6 @@ async def convert_to_project(
         # 添加到数据库
         db.add(new_project)
 
-        # 🔥 关键修复：更新研究方法usage_count
-        # Idea将被删除（-1），Project被创建（+1），净变化应为0
-        # 但由于我们直接创建对象不走create函数，需要手动+1
-        if idea.research_method:
-            update_research_method_usage(db, idea.research_method, 1)
-
         # 删除已转化的Idea
         db.delete(idea)
 
@@ -354,50 +362,51 @@ async def convert_to_project(
         raise HTTPException(status_code=500, detail=f"转化为研究项目失败: {str(e)}")
 
 
+@router.post("/batch-convert-to-project")
+async def batch_convert_to_project(
+    request_data: IdeaBatchConvertRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """批量将Ideas转化为研究项目（一个事务，负责人自动加入合作者列表）"""
+    try:
+        result = convert_ideas_to_projects(
+            db, request_data.ids,
+            ip_address=request.client.host if request.client else None,
+        )
+        return success_response(
+            message=f"Successfully converted {result['converted_count']} ideas",
+            data=result
+        )
+    except Exception as e:
+        logger.error(f"批量转化为研究项目失败: {e}")
+        raise HTTPException(status_code=500, detail=f"批量转化为研究项目失败: {str(e)}")
+
+
 @router.post("/batch-delete")
 async def batch_delete_ideas(
     request_data: BatchDeleteRequest,
     request: Request,
     db: Session = Depends(get_db)
 ):
-    """批量删除Ideas"""
+    """批量删除Ideas（一条DELETE取回旧值，审计记录在同一事务中批量写入；研究方法使用次数由触发器维护）"""
     try:
-        # 获取所有要删除的记录
-        ideas_to_delete = db.query(Idea).filter(Idea.id.in_(request_data.ids)).all()
-        deleted_count = len(ideas_to_delete)
-
-        # 收集所有研究方法，用于更新usage_count
-        research_methods = [idea.research_method for idea in ideas_to_delete if idea.research_method]
-
-        # 记录审计日志
-        for idea in ideas_to_delete:
-            try:
-                AuditService.log_delete(
-                    db,
-                    table_name="ideas",
-                    record_id=idea.id,
-                    old_values={
-                        "project_name": idea.project_name,
-                        "project_description": idea.project_description,
-                        "maturity": idea.maturity
-                    }
-                )
-            except Exception as audit_error:
-                logger.warning(f"审计日志记录失败: {audit_error}")
-
-        # 批量删除
-        db.query(Idea).filter(Idea.id.in_(request_data.ids)).delete(synchronize_session=False)
+        deleted = idea_crud.bulk_delete(
+            db, request_data.ids,
+            columns=("project_name", "project_description", "maturity", "research_method"),
+            audit=True,
+            ip_address=request.client.host if request.client else None,
+            commit=False
+        )
         db.commit()
 
-        # 更新研究方法使用次数
-        for method in research_methods:
-            update_research_method_usage(db, method, -1)
-
         return success_response(
-            message=f"Successfully deleted {deleted_count} ideas",
-            data={"deleted_count": deleted_count}
+            message=f"Successfully deleted {len(deleted)} ideas",
+            data={"deleted_count": len(deleted)}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"批量删除失败: {e}")
@@ -410,38 +419,22 @@ async def batch_update_maturity(
     request: Request,
     db: Session = Depends(get_db)
 ):
-    """批量更新Ideas成熟度"""
+    """批量更新Ideas成熟度（一条UPDATE，成熟度有变化的记录写入审计日志）"""
     try:
-        # 获取现有记录用于审计
-        existing_ideas = db.query(Idea).filter(Idea.id.in_(request_data.ids)).all()
-
-        # 记录审计日志
-        for idea in existing_ideas:
-            try:
-                AuditService.log_update(
-                    db,
-                    table_name="ideas",
-                    record_id=idea.id,
-                    old_values={"maturity": idea.maturity},
-                    new_values={"maturity": request_data.maturity}
-                )
-            except Exception as audit_error:
-                logger.warning(f"审计日志记录失败: {audit_error}")
-
-        # 批量更新
-        updated_count = db.query(Idea).filter(
-            Idea.id.in_(request_data.ids)
-        ).update(
+        updated_ids = idea_crud.bulk_update(
+            db, request_data.ids,
             {"maturity": request_data.maturity},
-            synchronize_session=False
+            audit=True,
+            ip_address=request.client.host if request.client else None
         )
-        db.commit()
 
         return success_response(
-            message=f"Successfully updated {updated_count} ideas",
-            data={"updated_count": updated_count, "new_maturity": request_data.maturity}
+            message=f"Successfully updated {len(updated_ids)} ideas",
+            data={"updated_count": len(updated_ids), "new_maturity": request_data.maturity}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"批量更新成熟度失败: {e}")
@@ -451,19 +444,19 @@ async def batch_update_maturity(
 @router.get("/stats")
 async def get_ideas_stats(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取Ideas统计信息"""
     try:
-        total = db.query(Idea).count()
-        mature = db.query(Idea).filter(Idea.maturity == 'mature').count()
-        immature = db.query(Idea).filter(Idea.maturity == 'immature').count()
+        total = await db.scalar(select(func.count(Idea.id)))
+        mature = await db.scalar(select(func.count(Idea.id)).where(Idea.maturity == 'mature'))
+        immature = await db.scalar(select(func.count(Idea.id)).where(Idea.maturity == 'immature'))
 
         # 按负责人统计
-        responsible_stats = db.query(
-            Idea.responsible_person_id,
-            func.count(Idea.id).label('count')
-        ).group_by(Idea.responsible_person_id).all()
+        responsible_stats = (await db.execute(
+            select(Idea.responsible_person_id, func.count(Idea.id).label('count'))
+            .group_by(Idea.responsible_person_id)
+        )).all()
 
         return {
             "total": total,
@@ -0,0 +1,52 @@
+"""
+后台任务API路由
+查询任务状态、进度和结果，取消排队中或执行中的任务
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ..models import get_db, BackgroundJob, BackgroundJobSchema
+from ..services.job_queue import job_queue
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[BackgroundJobSchema])
+def get_jobs(
+    status: Optional[str] = Query(None, description="按状态筛选: pending/running/succeeded/failed/cancelled"),
+    kind: Optional[str] = Query(None, description="按任务类型筛选"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """最近提交的后台任务（按提交时间倒序）"""
+    query = select(BackgroundJob).order_by(BackgroundJob.created_at.desc()).limit(limit)
+    if status:
+        query = query.where(BackgroundJob.status == status)
+    if kind:
+        query = query.where(BackgroundJob.kind == kind)
+    return db.execute(query).scalars().all()
+
+
+@router.get("/{job_id}", response_model=BackgroundJobSchema)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """获取任务状态、进度（0~1）和结果（成功后result为原接口的返回内容）"""
+    job = db.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=BackgroundJobSchema)
+def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    取消任务
+
+    - 排队中的任务立即取消
+    - 执行中的任务在下一次报告进度时停止，已提交的数据保留
+    - 已结束的任务不受影响
+    """
+    if job_queue.cancel(job_id) is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return db.get(BackgroundJob, job_id)
@@ -11,6 +11,7 @@ import logging
 
 from ..models import get_db, Journal, JournalOnlineFirstTracking
 from ..utils.response import success_response
+from ..services.write_queue import write_queue
 
 logger = logging.getLogger(__name__)
 
@@ -64,87 +65,66 @@ def get_online_first_tracking(
         raise HTTPException(status_code=500, detail=f"获取网络首发追踪记录失败: {str(e)}")
 
 
+def _tracking_data(record: JournalOnlineFirstTracking) -> dict:
+    return {
+        "id": record.id,
+        "journal_id": record.journal_id,
+        "tracked_date": record.tracked_date.isoformat(),
+        "tracked_at": record.tracked_at.isoformat(),
+        "notes": record.notes,
+        "is_today": True,
+    }
+
+
+def _upsert_tracking_today(db: Session, journal_id: int, notes: Optional[str]):
+    """在写入队列中执行：创建或更新今天的追踪记录，返回 (数据, 提示信息)"""
+    # 验证期刊存在
+    journal = db.query(Journal.id).filter(Journal.id == journal_id).first()
+    if not journal:
+        raise HTTPException(status_code=404, detail="期刊不存在")
+
+    today = date.today()
+
+    # 检查今天是否已有记录
+    existing = db.query(JournalOnlineFirstTracking).filter(
+        JournalOnlineFirstTracking.journal_id == journal_id,
+        JournalOnlineFirstTracking.tracked_date == today
+    ).first()
+
+    if existing:
+        # 如果今天已有记录，更新备注
+        if notes is not None:
+            existing.notes = notes
+            existing.tracked_at = datetime.utcnow()
+            db.flush()
+            return _tracking_data(existing), "今天已有记录，已更新备注"
+        return _tracking_data(existing), "今天已有追踪记录"
+
+    # 创建新记录
+    new_tracking = JournalOnlineFirstTracking(
+        journal_id=journal_id,
+        tracked_date=today,
+        tracked_at=datetime.utcnow(),
+        notes=notes
+    )
+    db.add(new_tracking)
+    db.flush()
+    return _tracking_data(new_tracking), "追踪记录创建成功"
+
+
 @router.post("/journals/{journal_id}/online-first-tracking/today")
 def create_tracking_today(
     journal_id: int,
     notes: Optional[str] = Query(None, description="备注"),
-    db: Session = Depends(get_db)
 ):
-    """一键创建今天的追踪记录"""
+    """一键创建今天的追踪记录（经写入队列合并提交）"""
     try:
-        # 验证期刊存在
-        journal = db.query(Journal).filter(Journal.id == journal_id).first()
-        if not journal:
-            raise HTTPException(status_code=404, detail="期刊不存在")
-
-        today = date.today()
-
-        # 检查今天是否已有记录
-        existing = db.query(JournalOnlineFirstTracking).filter(
-            JournalOnlineFirstTracking.journal_id == journal_id,
-            JournalOnlineFirstTracking.tracked_date == today
-        ).first()
-
-        if existing:
-            # 如果今天已有记录，更新备注
-            if notes is not None:
-                existing.notes = notes
-                existing.tracked_at = datetime.utcnow()
-                db.commit()
-                db.refresh(existing)
-
-                return success_response(
-                    data={
-                        "id": existing.id,
-                        "journal_id": existing.journal_id,
-                        "tracked_date": existing.tracked_date.isoformat(),
-                        "tracked_at": existing.tracked_at.isoformat(),
-                        "notes": existing.notes,
-                        "is_today": True,
-                    },
-                    message="今天已有记录，已更新备注"
-                )
-            else:
-                return success_response(
-                    data={
-                        "id": existing.id,
-                        "journal_id": existing.journal_id,
-                        "tracked_date": existing.tracked_date.isoformat(),
-                        "tracked_at": existing.tracked_at.isoformat(),
-                        "notes": existing.notes,
-                        "is_today": True,
-                    },
-                    message="今天已有追踪记录"
-                )
-
-        # 创建新记录
-        new_tracking = JournalOnlineFirstTracking(
-            journal_id=journal_id,
-            tracked_date=today,
-            tracked_at=datetime.utcnow(),
-            notes=notes
-        )
-
-        db.add(new_tracking)
-        db.commit()
-        db.refresh(new_tracking)
-
-        return success_response(
-            data={
-                "id": new_tracking.id,
-                "journal_id": new_tracking.journal_id,
-                "tracked_date": new_tracking.tracked_date.isoformat(),
-                "tracked_at": new_tracking.tracked_at.isoformat(),
-                "notes": new_tracking.notes,
-                "is_today": True,
-            },
-            message="追踪记录创建成功"
-        )
+        data, message = write_queue.run(_upsert_tracking_today, journal_id, notes)
+        return success_response(data=data, message=message)
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         logger.error(f"创建网络首发追踪记录失败: {e}")
         raise HTTPException(status_code=500, detail=f"创建网络首发追踪记录失败: {str(e)}")
 
@@ -3,29 +3,63 @@
 提供期刊CRUD、统计查询、引用追踪、批量导入等功能
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, func, select, literal, tuple_, union_all
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import json
 import logging
 
 from ..models import (
-    get_db, Journal, JournalIssue, Idea, ResearchProject, Tag, Prompt, journal_tags, prompt_tags,
+    get_db, get_async_db, AsyncSessionLocal, Collaborator, Journal, JournalStats, Idea, ResearchProject, Tag, Prompt, journal_tags, prompt_tags,
     JournalCreate, JournalUpdate, JournalSchema
 )
-from ..models.schemas import BatchDeleteRequest
+from ..models.schemas import BatchDeleteRequest, JournalMergeRequest
+from ..models.search_index import SEARCH_INDEXES
+from ..core.config import settings
 from ..services.audit import AuditService
-from ..utils.response import success_response, paginated_response
-from ..utils.crud_base import CRUDBase
+from ..services.journal_catalog import journal_catalog
+from ..services.job_queue import JobContext, job_queue
+from ..services.journal_dedup import find_duplicate_journals, merge_journals
+from ..services.journal_import import (
+    JournalImportResult, import_journal_chunk, import_journals, iter_lines, parse_csv, parse_ndjson
+)
+from ..utils.response import success_response, paginated_response, job_accepted_response
+from ..utils.crud_base import CRUDBase, FilterField
+from ..utils.cursor import decode_cursor, encode_cursor
 from ..utils.string_helpers import to_title_case
+from ..utils.journal_helper import relink_journal_references, rename_journal_references
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 引用明细流式输出时每次从游标读取的行数
+REFERENCE_STREAM_BATCH_SIZE = 500
+
 # 创建CRUD实例
-journal_crud = CRUDBase[Journal, JournalCreate, JournalUpdate](Journal)
+journal_crud = CRUDBase[Journal, JournalCreate, JournalUpdate](
+    Journal,
+    filters={
+        # 标签筛选（包含任一指定标签）走 journal_tags 子查询，无需JOIN后去重
+        "tag_ids": FilterField("in", journal_tags.c.tag_id, convert=int, through=journal_tags.c.journal_id),
+        # 名称全文检索（FTS5），有MATCH条件时可按相关度排序
+        "search": FilterField("fts", index=SEARCH_INDEXES["journals"], index_columns=["name"]),
+    },
+    orderings={
+        "name": Journal.name,
+        "created_at": Journal.created_at,
+        "updated_at": Journal.updated_at,
+        "reference_count": JournalStats.reference_count,
+        "target_count": JournalStats.target_count,
+        "issues_count": JournalStats.issues_count,
+    },
+    default_ordering="name",
+)
 
 
 # ===== 期刊统计辅助函数 =====
@@ -41,37 +75,23 @@ def calculate_journal_stats(db: Session, journal_name: str) -> Dict[str, int]:
     Returns:
         统计字典包含: reference_count, target_count, total_count
     """
-    # 统计作为参考期刊的次数（大小写不敏感）
-    reference_count = (
-        db.query(Idea).filter(func.lower(Idea.reference_journal) == func.lower(journal_name)).count() +
-        db.query(ResearchProject).filter(func.lower(ResearchProject.reference_journal) == func.lower(journal_name)).count()
-    )
-
-    # 统计作为投稿期刊的次数（大小写不敏感）
-    target_count = (
-        db.query(Idea).filter(func.lower(Idea.target_journal) == func.lower(journal_name)).count() +
-        db.query(ResearchProject).filter(func.lower(ResearchProject.target_journal) == func.lower(journal_name)).count()
-    )
-
-    return {
-        "reference_count": reference_count,
-        "target_count": target_count,
-        "total_count": reference_count + target_count
-    }
+    stats = batch_calculate_journal_stats(db, [journal_name])[journal_name]
+    stats["total_count"] = stats["reference_count"] + stats["target_count"]
+    return stats
 
 
 def batch_calculate_journal_stats(db: Session, journal_names: List[str], include_issues: bool = False) -> Dict[str, Dict[str, int]]:
     """
-    批量计算多个期刊的引用统计（避免N+1查询）
+    批量读取多个期刊的引用统计（一次JOIN journal_stats 物化表）
 
     简化计数设计（v4.2）：
-    - 参考：Idea + ResearchProject 中 reference_journal 的合计
-    - 投稿：Idea + ResearchProject 中 target_journal 的合计
+    - 参考：Idea + ResearchProject 中 reference_journal_id 的合计
+    - 投稿：Idea + ResearchProject 中 target_journal_id 的合计
 
     Args:
         db: 数据库会话
         journal_names: 期刊名称列表
-        include_issues: 是否计算浏览记录数量（issues_count）
+        include_issues: 是否返回浏览记录数量（issues_count）
 
     Returns:
         字典，key为期刊名称，value为统计字典
@@ -79,169 +99,149 @@ def batch_calculate_journal_stats(db: Session, journal_names: List[str], include
     if not journal_names:
         return {}
 
-    # ========== 参考期刊统计 ==========
-    # Idea中的参考期刊
-    idea_ref_counts = (
-        db.query(Idea.reference_journal, func.count(Idea.id))
-        .filter(Idea.reference_journal.in_(journal_names))
-        .group_by(Idea.reference_journal)
-        .all()
-    )
-
-    # ResearchProject中的参考期刊
-    project_ref_counts = (
-        db.query(ResearchProject.reference_journal, func.count(ResearchProject.id))
-        .filter(ResearchProject.reference_journal.in_(journal_names))
-        .group_by(ResearchProject.reference_journal)
+    rows = (
+        db.query(Journal.name, JournalStats.reference_count, JournalStats.target_count, JournalStats.issues_count)
+        .outerjoin(JournalStats, JournalStats.journal_id == Journal.id)
+        .filter(Journal.name.in_(journal_names))
         .all()
     )
+    stats_by_name = {row[0]: row[1:] for row in rows}
 
-    # ========== 投稿期刊统计 ==========
-    # Idea中的投稿期刊
-    idea_target_counts = (
-        db.query(Idea.target_journal, func.count(Idea.id))
-        .filter(Idea.target_journal.in_(journal_names))
-        .group_by(Idea.target_journal)
-        .all()
-    )
-
-    # ResearchProject中的投稿期刊
-    project_target_counts = (
-        db.query(ResearchProject.target_journal, func.count(ResearchProject.id))
-        .filter(ResearchProject.target_journal.in_(journal_names))
-        .group_by(ResearchProject.target_journal)
-        .all()
-    )
-
-    # ========== 获取期刊ID到名称的映射 ==========
-    journals = db.query(Journal).filter(Journal.name.in_(journal_names)).all()
-    journal_id_to_name = {j.id: j.name for j in journals}
-    journal_name_to_id = {j.name: j.id for j in journals}
-
-    # ========== 浏览记录统计（可选） ==========
-    issues_counts = {}
-    if include_issues and journal_id_to_name:
-        issue_counts_by_id = (
-            db.query(JournalIssue.journal_id, func.count(JournalIssue.id))
-            .filter(JournalIssue.journal_id.in_(list(journal_id_to_name.keys())))
-            .group_by(JournalIssue.journal_id)
-            .all()
-        )
-        # 映射 journal_id -> count，然后转换为 journal_name -> count
-        for journal_id, count in issue_counts_by_id:
-            journal_name = journal_id_to_name.get(journal_id)
-            if journal_name:
-                issues_counts[journal_name] = count
-
-    # ========== 转换为字典方便查找 ==========
-    # 参考计数
-    ref_counts = {}
-    for name, count in idea_ref_counts:
-        ref_counts[name] = ref_counts.get(name, 0) + count
-    for name, count in project_ref_counts:
-        ref_counts[name] = ref_counts.get(name, 0) + count
-
-    # 投稿计数
-    target_counts = {}
-    for name, count in idea_target_counts:
-        target_counts[name] = target_counts.get(name, 0) + count
-    for name, count in project_target_counts:
-        target_counts[name] = target_counts.get(name, 0) + count
-
-    # ========== 组装结果 ==========
     result = {}
     for name in journal_names:
+        reference_count, target_count, issues_count = stats_by_name.get(name, (0, 0, 0))
         result[name] = {
-            "reference_count": ref_counts.get(name, 0),
-            "target_count": target_counts.get(name, 0),
+            "reference_count": reference_count or 0,
+            "target_count": target_count or 0,
         }
         # 添加浏览记录数量（如果启用）
         if include_issues:
-            result[name]["issues_count"] = issues_counts.get(name, 0)
+            result[name]["issues_count"] = issues_count or 0
 
     return result
 
 
-def get_journal_references(db: Session, journal_name: str, ref_type: Optional[str] = None) -> Dict[str, Any]:
+# (引用类型, 条目类型, 模型, 标题列, 状态列)
+REFERENCE_SOURCES = (
+    ("reference", "idea", Idea, Idea.project_name, Idea.maturity),
+    ("reference", "project", ResearchProject, ResearchProject.title, ResearchProject.status),
+    ("target", "idea", Idea, Idea.project_name, Idea.maturity),
+    ("target", "project", ResearchProject, ResearchProject.title, ResearchProject.status),
+)
+REFERENCE_ORDERINGS = ("-created_at", "created_at")
+# created_at为空的记录排在最早
+REFERENCE_NULL_DATE = datetime(1970, 1, 1)
+
+
+def count_journal_references(db: Session, journal_id: int) -> Dict[str, int]:
+    """按引用类型和条目类型统计引用数量（一次UNION ALL查询，走各期刊外键索引）"""
+    branches = [
+        select(literal(f"{kind}_{item}s").label("key"), func.count().label("count"))
+        .select_from(model)
+        .where(getattr(model, f"{kind}_journal_id") == journal_id)
+        for kind, item, model, _, _ in REFERENCE_SOURCES
+    ]
+    counts = {key: count for key, count in db.execute(union_all(*branches)).all()}
+    return {
+        f"{kind}_{item}s_count": counts.get(f"{kind}_{item}s", 0)
+        for kind, item, _, _, _ in REFERENCE_SOURCES
+    }
+
+
+def build_journal_references_query(
+    journal_id: int,
+    ref_type: Optional[str] = None,
+    ordering: str = "-created_at",
+    after: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+):
     """
-    获取引用该期刊的所有Ideas和Projects
+    构造期刊引用明细的UNION ALL查询
 
-    Args:
-        db: 数据库会话
-        journal_name: 期刊名称
-        ref_type: 引用类型筛选 ('reference', 'target', None表示全部)
+    ref_type 下推为分支选择（只查询需要的外键列）；排序键为 (created_at, ref_type, type, id)，
+    after 为上一页最后一条的排序键（键集分页），每个分支各自按排序键取 limit 条后再合并
 
-    Returns:
-        包含ideas和projects列表的字典
+    Args:
+        journal_id: 期刊ID
+        ref_type: 'reference'、'target'，None表示全部
+        ordering: '-created_at'（新到旧）或 'created_at'
+        after: 游标位置 {"created_at", "ref_type", "type", "id"}
+        limit: 最多返回条数，None表示不限制（流式输出时使用）
     """
-    result = {
-        "reference_ideas": [],
-        "reference_projects": [],
-        "target_ideas": [],
-        "target_projects": []
+    descending = ordering.startswith("-")
+    branches = []
+    for kind, item, model, title_column, status_column in REFERENCE_SOURCES:
+        if ref_type not in (None, kind):
+            continue
+        sort_date = func.coalesce(model.created_at, REFERENCE_NULL_DATE)
+        sort_key = tuple_(sort_date, literal(kind), literal(item), model.id)
+        responsible_person = Collaborator.name if model is Idea else literal(None)
+
+        branch = select(
+            literal(kind).label("ref_type"),
+            literal(item).label("type"),
+            model.id.label("id"),
+            title_column.label("title"),
+            status_column.label("status"),
+            responsible_person.label("responsible_person"),
+            sort_date.label("created_at"),
+        ).where(getattr(model, f"{kind}_journal_id") == journal_id)
+        if model is Idea:
+            branch = branch.outerjoin(Collaborator, Collaborator.id == Idea.responsible_person_id)
+
+        if after is not None:
+            position = tuple_(
+                literal(after["created_at"]), literal(after["ref_type"]), literal(after["type"]), literal(after["id"])
+            )
+            branch = branch.where(sort_key < position if descending else sort_key > position)
+        if limit is not None:
+            order = [sort_date.desc(), model.id.desc()] if descending else [sort_date, model.id]
+            branch = select(branch.order_by(*order).limit(limit).subquery())
+        branches.append(branch)
+
+    compound = union_all(*branches).subquery()
+    columns = [compound.c.created_at, compound.c.ref_type, compound.c.type, compound.c.id]
+    query = select(compound).order_by(*[c.desc() for c in columns] if descending else columns)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def serialize_journal_reference(row) -> Dict[str, Any]:
+    """引用明细行转为响应字典"""
+    created_at = row.created_at if row.created_at != REFERENCE_NULL_DATE else None
+    return {
+        "ref_type": row.ref_type,
+        "type": row.type,
+        "id": row.id,
+        "title": row.title,
+        "status": row.status,
+        "responsible_person": row.responsible_person,
+        "created_at": created_at.isoformat() if created_at else None,
     }
 
-    # 查询作为参考期刊的Ideas
-    if ref_type in [None, 'reference']:
-        reference_ideas = db.query(Idea).filter(
-            Idea.reference_journal == journal_name
-        ).all()
-        result["reference_ideas"] = [
-            {
-                "id": idea.id,
-                "project_name": idea.project_name,
-                "responsible_person": idea.responsible_person.name if idea.responsible_person else None,
-                "maturity": idea.maturity,
-                "created_at": idea.created_at.isoformat() if idea.created_at else None
-            }
-            for idea in reference_ideas
-        ]
-
-        # 查询作为参考期刊的Projects
-        reference_projects = db.query(ResearchProject).filter(
-            ResearchProject.reference_journal == journal_name
-        ).all()
-        result["reference_projects"] = [
-            {
-                "id": project.id,
-                "title": project.title,
-                "status": project.status,
-                "created_at": project.created_at.isoformat() if project.created_at else None
-            }
-            for project in reference_projects
-        ]
-
-    # 查询作为投稿期刊的Ideas
-    if ref_type in [None, 'target']:
-        target_ideas = db.query(Idea).filter(
-            Idea.target_journal == journal_name
-        ).all()
-        result["target_ideas"] = [
-            {
-                "id": idea.id,
-                "project_name": idea.project_name,
-                "responsible_person": idea.responsible_person.name if idea.responsible_person else None,
-                "maturity": idea.maturity,
-                "created_at": idea.created_at.isoformat() if idea.created_at else None
+
+def group_journal_references(items: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """按 reference_ideas / reference_projects / target_ideas / target_projects 分组（兼容旧响应格式）"""
+    grouped = {f"{kind}_{item}s": [] for kind, item, _, _, _ in REFERENCE_SOURCES}
+    for entry in items:
+        if entry["type"] == "idea":
+            value = {
+                "id": entry["id"],
+                "project_name": entry["title"],
+                "responsible_person": entry["responsible_person"],
+                "maturity": entry["status"],
+                "created_at": entry["created_at"],
             }
-            for idea in target_ideas
-        ]
-
-        # 查询作为投稿期刊的Projects
-        target_projects = db.query(ResearchProject).filter(
-            ResearchProject.target_journal == journal_name
-        ).all()
-        result["target_projects"] = [
-            {
-                "id": project.id,
-                "title": project.title,
-                "status": project.status,
-                "created_at": project.created_at.isoformat() if project.created_at else None
+        else:
+            value = {
+                "id": entry["id"],
+                "title": entry["title"],
+                "status": entry["status"],
+                "created_at": entry["created_at"],
             }
-            for project in target_projects
-        ]
-
-    return result
+        grouped[f"{entry['ref_type']}_{entry['type']}s"].append(value)
+    return grouped
 
 
 # ===== 基础CRUD路由 =====
@@ -249,11 +249,15 @@ def get_journal_references(db: Session, journal_name: str, ref_type: Optional[st
 @router.get("/", response_model=List[JournalSchema])
 async def get_journals(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 1000,
     tag_ids: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    ordering: Optional[str] = Query(None, description="排序，逗号分隔，-前缀倒序（默认按名称；搜索时先按相关度）"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取期刊列表
@@ -261,50 +265,128 @@ async def get_journals(
     支持筛选参数：
     - tag_ids: 标签ID列表，逗号分隔（如 "1,2,3"）
     - search: 搜索关键词（匹配期刊名称）
+    - ordering: name / created_at / updated_at / reference_count / target_count / issues_count / rank
     """
     try:
-        # 使用joinedload预加载tags关系，确保序列化时包含标签数据
-        query = db.query(Journal).options(joinedload(Journal.tags))
+        # 使用selectinload预加载tags关系，确保序列化时包含标签数据（异步会话不支持懒加载）
+        # 引用统计直接JOIN物化表 journal_stats
+        query = (
+            select(Journal, JournalStats)
+            .outerjoin(JournalStats, JournalStats.journal_id == Journal.id)
+            .options(selectinload(Journal.tags))
+        )
+        page = await journal_crud.paginate_async(
+            db, query,
+            filters={"tag_ids": tag_ids, "search": search},
+            ordering=ordering or ("rank,name" if search else None),
+            cursor=cursor,
+            limit=limit,
+            skip=skip,
+            with_total=with_total,
+        )
+        page.set_headers(response)
 
-        # 标签筛选（支持多个标签）
-        if tag_ids:
-            tag_id_list = [int(tid.strip()) for tid in tag_ids.split(',') if tid.strip()]
-            if tag_id_list:
-                # JOIN journal_tags表来筛选包含指定标签的期刊
-                query = query.join(journal_tags, Journal.id == journal_tags.c.journal_id)\
-                    .filter(journal_tags.c.tag_id.in_(tag_id_list))\
-                    .distinct()
-
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(Journal.name.like(search_pattern))
-
-        # 按名称排序
-        query = query.order_by(Journal.name)
-
-        journals = query.offset(skip).limit(limit).all()
-
-        # 批量计算统计信息（避免N+1查询，包含浏览记录数量）
-        journal_names = [j.name for j in journals]
-        all_stats = batch_calculate_journal_stats(db, journal_names, include_issues=True)
-
-        for journal in journals:
-            stats = all_stats.get(journal.name, {
-                "reference_count": 0,
-                "target_count": 0,
-                "issues_count": 0,
-            })
-            journal.reference_count = stats["reference_count"]
-            journal.target_count = stats["target_count"]
-            journal.issues_count = stats.get("issues_count", 0)
+        journals = []
+        for row in page.rows:
+            journal, stats = row[0], row[1]
+            journal.reference_count = stats.reference_count if stats else 0
+            journal.target_count = stats.target_count if stats else 0
+            journal.issues_count = stats.issues_count if stats else 0
+            journals.append(journal)
 
         return journals
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取期刊列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取期刊列表失败: {str(e)}")
 
 
+@router.get("/catalog")
+def get_journal_catalog(
+    q: Optional[str] = Query(None, description="前缀：名称开头、名称中任一单词开头，或拼音/单词首字母（如 glsj）"),
+    tags_all: Optional[str] = Query(None, description="必须同时包含的标签ID，逗号分隔"),
+    tags_any: Optional[str] = Query(None, description="至少包含其一的标签ID，逗号分隔"),
+    tags_none: Optional[str] = Query(None, description="不能包含的标签ID，逗号分隔"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    期刊选择器的自动补全和标签筛选（进程内目录，不查询数据库）
+
+    返回匹配的期刊（id、名称、标签ID）、匹配总数，以及各标签在匹配结果中的数量（facets）
+    """
+    try:
+        return journal_catalog.query(
+            q=q,
+            tags_all=_parse_id_list(tags_all),
+            tags_any=_parse_id_list(tags_any),
+            tags_none=_parse_id_list(tags_none),
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="标签ID必须是逗号分隔的整数")
+    except Exception as e:
+        logger.error(f"查询期刊目录失败: {e}")
+        raise HTTPException(status_code=500, detail=f"查询期刊目录失败: {str(e)}")
+
+
+def _parse_id_list(value: Optional[str]) -> List[int]:
+    """解析逗号分隔的ID列表"""
+    if not value:
+        return []
+    return [int(part.strip()) for part in value.split(',') if part.strip()]
+
+
+@router.get("/duplicates")
+def get_duplicate_journals(
+    threshold: float = Query(0.6, ge=0.3, le=1.0, description="名称相似度阈值（trigram Jaccard）"),
+    limit: int = Query(100, ge=1, le=1000, description="最多返回的重复簇数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    检测近似重复的期刊（如 "J. of X" 与 "Journal of X"）
+
+    返回重复簇，每个簇包含建议保留的期刊ID和各成员的相似度，可配合 POST /merge 合并
+    """
+    try:
+        return find_duplicate_journals(db, threshold=threshold, limit=limit)
+    except Exception as e:
+        logger.error(f"检测重复期刊失败: {e}")
+        raise HTTPException(status_code=500, detail=f"检测重复期刊失败: {str(e)}")
+
+
+@router.post("/merge")
+def merge_duplicate_journals(
+    merge_request: JournalMergeRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    合并期刊：来源期刊的引用、浏览记录、网络首发追踪和标签迁移到目标期刊，然后删除来源期刊
+
+    整个合并在一个事务中完成，任一步失败则全部回滚
+    """
+    try:
+        summary = merge_journals(
+            db,
+            merge_request.target_id,
+            merge_request.source_ids,
+            ip_address=request.client.host if request.client else None,
+        )
+        db.commit()
+        return success_response(data=summary, message=f"已合并 {len(summary['merged_ids'])} 个期刊")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"合并期刊失败: {e}")
+        raise HTTPException(status_code=500, detail=f"合并期刊失败: {str(e)}")
+
+
 @router.post("/", response_model=JournalSchema, status_code=status.HTTP_201_CREATED)
 async def create_journal(
     journal: JournalCreate,
@@ -354,6 +436,9 @@ async def create_journal(
                     journal_tags.insert().values(journal_id=new_journal.id, tag_id=tag_id)
                 )
 
+        # 关联此前已填写该期刊名称、但期刊库中尚不存在的引用
+        relink_journal_references(db, [new_journal.id])
+
         db.commit()
         db.refresh(new_journal)
 
@@ -387,17 +472,17 @@ async def create_journal(
 async def get_journal(
     journal_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取单个期刊详情（含统计信息）"""
     try:
-        # 使用joinedload预加载tags关系
-        journal = db.query(Journal).options(joinedload(Journal.tags)).filter(Journal.id == journal_id).first()
+        # 使用selectinload预加载tags关系
+        journal = await db.get(Journal, journal_id, options=[selectinload(Journal.tags)])
         if not journal:
             raise HTTPException(status_code=404, detail="期刊不存在")
 
         # 添加引用统计信息
-        stats = calculate_journal_stats(db, journal.name)
+        stats = await db.run_sync(calculate_journal_stats, journal.name)
         journal.reference_count = stats["reference_count"]
         journal.target_count = stats["target_count"]
         journal.total_count = stats["total_count"]
@@ -475,6 +560,12 @@ async def update_journal(
             else:
                 setattr(db_journal, field, value)
 
+        # 名称变更：同步已关联引用的期刊文本，并关联使用新名称的未关联引用
+        if old_values["name"] != db_journal.name:
+            db.flush()
+            rename_journal_references(db, journal_id, db_journal.name)
+            relink_journal_references(db, [journal_id])
+
         db.commit()
 
         # 重新加载期刊对象（包含tags）
@@ -529,21 +620,13 @@ async def delete_journal(
         # 检查是否被Idea/Project引用（字符串引用）
         stats = calculate_journal_stats(db, journal.name)
         if stats["total_count"] > 0:
-            # 获取引用详情
-            references = get_journal_references(db, journal.name)
-
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail={
                     "error": "无法删除该期刊",
                     "reason": "该期刊正在被引用",
                     "stats": stats,
-                    "references": {
-                        "reference_ideas_count": len(references["reference_ideas"]),
-                        "reference_projects_count": len(references["reference_projects"]),
-                        "target_ideas_count": len(references["target_ideas"]),
-                        "target_projects_count": len(references["target_projects"])
-                    },
+                    "references": count_journal_references(db, journal_id),
                     "suggestion": "请先将引用该期刊的Ideas和Projects更改为其他期刊，然后再删除"
                 }
             )
@@ -587,20 +670,20 @@ async def delete_journal(
 async def get_journal_stats(
     journal_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取期刊详细统计信息"""
     try:
         # 检查期刊是否存在
-        journal = journal_crud.get(db, id=journal_id)
+        journal = await db.get(Journal, journal_id, options=[selectinload(Journal.tags)])
         if not journal:
             raise HTTPException(status_code=404, detail="期刊不存在")
 
         # 计算统计
-        stats = calculate_journal_stats(db, journal.name)
+        stats = await db.run_sync(calculate_journal_stats, journal.name)
 
-        # 获取引用详情
-        references = get_journal_references(db, journal.name)
+        # 引用数量明细
+        breakdown = await db.run_sync(count_journal_references, journal_id)
 
         return {
             "journal": {
@@ -610,12 +693,7 @@ async def get_journal_stats(
                 "tags": [{"id": t.id, "name": t.name, "color": t.color} for t in journal.tags]
             },
             "stats": stats,
-            "breakdown": {
-                "reference_ideas_count": len(references["reference_ideas"]),
-                "reference_projects_count": len(references["reference_projects"]),
-                "target_ideas_count": len(references["target_ideas"]),
-                "target_projects_count": len(references["target_projects"])
-            }
+            "breakdown": breakdown
         }
 
     except HTTPException:
@@ -630,17 +708,23 @@ async def get_journal_reference_details(
     journal_id: int,
     request: Request,
     ref_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    ordering: str = Query("-created_at", description="排序：-created_at（新到旧）或 created_at"),
+    limit: int = Query(200, ge=1, le=1000, description="每页条数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor"),
+    stream: bool = Query(False, description="以NDJSON流式返回全部引用（忽略分页参数）"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    获取引用该期刊的所有Ideas和Projects的详细列表
+    获取引用该期刊的Ideas和Projects明细（单条UNION ALL查询，键集分页）
 
     参数:
     - ref_type: 'reference'(参考期刊) 或 'target'(投稿期刊)，None表示全部
+    - ordering / limit / cursor: 按创建时间排序分页，has_more为true时用next_cursor取下一页
+    - stream: 为true时逐行输出NDJSON（每行一条引用），不在内存中汇总
     """
     try:
         # 检查期刊是否存在
-        journal = journal_crud.get(db, id=journal_id)
+        journal = await db.get(Journal, journal_id)
         if not journal:
             raise HTTPException(status_code=404, detail="期刊不存在")
 
@@ -650,14 +734,65 @@ async def get_journal_reference_details(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="ref_type must be 'reference', 'target', or None"
             )
+        if ordering not in REFERENCE_ORDERINGS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"ordering must be one of: {', '.join(REFERENCE_ORDERINGS)}"
+            )
+
+        if stream:
+            query = build_journal_references_query(journal_id, ref_type, ordering)
+
+            async def generate():
+                # 独立会话：响应流式发送期间逐批从游标读取，不占用请求依赖的会话
+                async with AsyncSessionLocal() as stream_db:
+                    result = await stream_db.stream(query)
+                    async for partition in result.partitions(REFERENCE_STREAM_BATCH_SIZE):
+                        yield "".join(
+                            json.dumps(serialize_journal_reference(row), ensure_ascii=False) + "\n"
+                            for row in partition
+                        )
+
+            return StreamingResponse(generate(), media_type="application/x-ndjson")
 
-        # 获取引用详情
-        references = get_journal_references(db, journal.name, ref_type)
+        after = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+                # 四个排序键都必须存在，缺失时在这里返回400，而不是在构造查询时抛出KeyError
+                after = {
+                    "created_at": datetime.fromisoformat(position["created_at"]),
+                    "ref_type": str(position["ref_type"]),
+                    "type": str(position["type"]),
+                    "id": int(position["id"]),
+                }
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+        # 多取1条判断是否还有下一页
+        query = build_journal_references_query(journal_id, ref_type, ordering, after, limit + 1)
+        rows = (await db.execute(query)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor({
+                "created_at": last.created_at.isoformat(),
+                "ref_type": last.ref_type,
+                "type": last.type,
+                "id": last.id,
+            })
 
+        items = [serialize_journal_reference(row) for row in rows]
         return {
             "journal_name": journal.name,
             "ref_type_filter": ref_type or "all",
-            "references": references
+            "items": items,
+            "references": group_journal_references(items),
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
 
     except HTTPException:
@@ -669,61 +804,36 @@ async def get_journal_reference_details(
 
 # ===== 批量操作路由 =====
 
+def _journal_import_job(context: JobContext, journals: List[JournalCreate], chunk_size: int):
+    """后台任务：批量导入期刊"""
+    return import_journals(context.db, journals, chunk_size, progress=context.report).to_dict()
+
+
 @router.post("/batch-import")
 async def batch_import_journals(
     journals: List[JournalCreate],
     request: Request,
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）"),
     db: Session = Depends(get_db)
 ):
     """
     批量导入期刊
 
     处理逻辑：
+    - 名称统一格式化为Title Case，按块（JOURNAL_IMPORT_CHUNK_SIZE）一次IN查询去重、批量插入，每块一个事务
     - 如果期刊名称已存在，跳过该条记录
-    - 返回成功导入数量和跳过的期刊列表
+    - 返回成功导入数量、跳过的期刊列表和每块的处理进度（chunks）
+    - as_job=true 时提交为后台任务，进度和结果见 GET /api/jobs/{id}
     """
-    try:
-        imported_count = 0
-        skipped_journals = []
-        errors = []
-
-        for journal_data in journals:
-            try:
-                # 格式化期刊名称为 Title Case（防止大小写重复）
-                formatted_name = to_title_case(journal_data.name.strip())
-
-                # 使用格式化后的名称检查期刊是否已存在
-                existing = db.query(Journal).filter(Journal.name == formatted_name).first()
-                if existing:
-                    skipped_journals.append({
-                        "name": journal_data.name,  # 保留原始名称用于日志
-                        "reason": "期刊名称已存在"
-                    })
-                    continue
-
-                # 创建期刊，使用格式化后的名称
-                journal_dict = journal_data.model_dump(exclude={'name'})
-                new_journal = Journal(name=formatted_name, **journal_dict)
-                db.add(new_journal)
-                imported_count += 1
-
-            except Exception as e:
-                errors.append({
-                    "name": journal_data.name,
-                    "error": str(e)
-                })
-
-        # 提交事务
-        db.commit()
+    if as_job:
+        job_id = await job_queue.submit(
+            "journal_import", _journal_import_job, journals, settings.JOURNAL_IMPORT_CHUNK_SIZE
+        )
+        return job_accepted_response(job_id, "journal_import")
 
-        return {
-            "message": f"成功导入 {imported_count} 个期刊",
-            "imported_count": imported_count,
-            "skipped_count": len(skipped_journals),
-            "error_count": len(errors),
-            "skipped_journals": skipped_journals,
-            "errors": errors
-        }
+    try:
+        result = await run_in_threadpool(import_journals, db, journals, settings.JOURNAL_IMPORT_CHUNK_SIZE)
+        return result.to_dict()
 
     except Exception as e:
         db.rollback()
@@ -731,4 +841,69 @@ async def batch_import_journals(
         raise HTTPException(status_code=500, detail=f"批量导入期刊失败: {str(e)}")
 
 
+@router.post("/batch-import/upload")
+async def upload_journals(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv 或 ndjson，默认按Content-Type/文件扩展名判断"),
+    db: Session = Depends(get_db)
+):
+    """
+    流式导入CSV / NDJSON期刊文件
+
+    请求体可以直接是文件内容（Content-Type: text/csv 或 application/x-ndjson），
+    也可以是multipart表单的file字段。边读取边解析，每满一块写入一次，返回每块的处理进度。
+    - CSV：首行为表头，name/期刊名称 必填，notes/备注、tag_ids/标签ID（分号或空格分隔）可选
+    - NDJSON：每行一个JSON对象 {"name": "...", "notes": "...", "tag_ids": [1, 2]}
+    """
+    content_type = request.headers.get("content-type", "")
+    filename = ""
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="缺少上传文件（file字段）")
+        filename = (upload.filename or "").lower()
+        content_type = upload.content_type or ""
+
+        async def body():
+            while data := await upload.read(64 * 1024):
+                yield data
+        chunks = body()
+    else:
+        chunks = request.stream()
+
+    if format is None:
+        if "csv" in content_type or filename.endswith(".csv"):
+            format = "csv"
+        elif any(kind in content_type for kind in ("ndjson", "jsonl")) or filename.endswith((".ndjson", ".jsonl")):
+            format = "ndjson"
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无法识别文件格式，请使用 format=csv 或 format=ndjson"
+        )
+
+    parser = parse_csv if format == "csv" else parse_ndjson
+    chunk_size = settings.JOURNAL_IMPORT_CHUNK_SIZE
+    result = JournalImportResult()
+    try:
+        chunk = []
+        async for record in parser(iter_lines(chunks)):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                # 数据库写入放到线程池，不阻塞事件循环
+                await run_in_threadpool(import_journal_chunk, db, chunk, result)
+                chunk = []
+        if chunk:
+            await run_in_threadpool(import_journal_chunk, db, chunk, result)
+        return result.to_dict()
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"上传导入期刊失败: {e}")
+        raise HTTPException(status_code=500, detail=f"上传导入期刊失败: {str(e)}")
+
+
 # ===== 期卷号统计路由已移除 - 点击"期卷号"按钮查看浏览记录 =====
@@ -2,14 +2,16 @@
 提示词管理路由（v4.8）
 提供提示词的CRUD操作、复制、统计等功能
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 from typing import List, Optional, Dict, Any
 import json
 import re
 
-from app.models.database import Prompt as PromptModel, Tag, get_db
+from app.models.database import Prompt as PromptModel, Tag, get_db, get_async_db
+from app.models.search_index import SEARCH_INDEXES
 from app.models.schemas import (
     PromptCreate,
     PromptUpdate,
@@ -18,9 +20,31 @@ from app.models.schemas import (
     PromptCopyResponse,
     PromptStats
 )
+from app.services.write_queue import write_queue
+from app.utils.crud_base import CRUDBase, FilterField
 
 router = APIRouter()
 
+# 列表筛选（搜索为FTS5全文检索：标题、内容、说明）和排序字段白名单
+prompt_crud = CRUDBase[PromptModel, PromptCreate, PromptUpdate](
+    PromptModel,
+    filters={
+        "category": FilterField("eq", PromptModel.category),
+        "search": FilterField("fts", index=SEARCH_INDEXES["prompts"]),
+        "is_active": FilterField("eq", PromptModel.is_active),
+        "is_favorite": FilterField("eq", PromptModel.is_favorite),
+    },
+    orderings={
+        "title": PromptModel.title,
+        "category": PromptModel.category,
+        "usage_count": PromptModel.usage_count,
+        "is_favorite": PromptModel.is_favorite,
+        "created_at": PromptModel.created_at,
+        "updated_at": PromptModel.updated_at,
+    },
+    default_ordering="-usage_count",
+)
+
 
 def extract_variables_from_content(content: str) -> List[str]:
     """从提示词内容中提取变量 {xxx}"""
@@ -30,61 +54,46 @@ def extract_variables_from_content(content: str) -> List[str]:
 
 @router.get("/", response_model=List[PromptSchema], summary="获取提示词列表")
 async def get_prompts(
+    response: Response,
     category: Optional[str] = Query(None, description="按分类筛选"),
     search: Optional[str] = Query(None, description="搜索关键词（标题或内容）"),
     ordering: Optional[str] = Query(None, description="排序字段（如：-usage_count）"),
     limit: Optional[int] = Query(None, description="限制返回数量"),
     is_active: Optional[bool] = Query(True, description="只显示启用的提示词"),
-    db: Session = Depends(get_db)
+    is_favorite: Optional[bool] = Query(None, description="只显示收藏（或未收藏）的提示词"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值（需指定limit）"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取提示词列表
 
     - **category**: 可选，按分类筛选（reading/writing/polishing/reviewer/horizontal）
     - **search**: 可选，搜索关键词（标题或内容）
-    - **ordering**: 可选，排序字段（如：-usage_count 表示倒序）
-    - **limit**: 可选，限制返回数量
+    - **ordering**: 可选，排序字段，逗号分隔（如：-usage_count 表示倒序；可选 title/category/usage_count/is_favorite/created_at/updated_at/rank）
+    - **limit**: 可选，限制返回数量，下一页游标在响应头 X-Next-Cursor 中
     - **is_active**: 可选，只显示启用的提示词（默认true）
     - 返回：提示词列表
     """
-    query = db.query(PromptModel)
-
-    # 分类过滤
-    if category:
-        query = query.filter(PromptModel.category == category)
-
-    # 搜索过滤
-    if search:
-        query = query.filter(
-            (PromptModel.title.contains(search)) |
-            (PromptModel.content.contains(search)) |
-            (PromptModel.description.contains(search))
+    # 搜索时默认按相关度排序，相关度相同再按使用次数；否则默认按使用次数倒序排列
+    if not ordering and search:
+        ordering = "rank,-usage_count"
+
+    try:
+        # 预加载tags关系（异步会话不支持懒加载）
+        page = await prompt_crud.paginate_async(
+            db,
+            select(PromptModel).options(selectinload(PromptModel.tags)),
+            filters={"category": category, "search": search, "is_active": is_active, "is_favorite": is_favorite},
+            ordering=ordering,
+            cursor=cursor,
+            limit=limit,
+            with_total=with_total,
         )
-
-    # 启用状态过滤
-    if is_active is not None:
-        query = query.filter(PromptModel.is_active == is_active)
-
-    # 排序
-    if ordering:
-        if ordering.startswith('-'):
-            # 倒序
-            field = ordering[1:]
-            if hasattr(PromptModel, field):
-                query = query.order_by(desc(getattr(PromptModel, field)))
-        else:
-            # 正序
-            if hasattr(PromptModel, ordering):
-                query = query.order_by(getattr(PromptModel, ordering))
-    else:
-        # 默认按使用次数倒序排列
-        query = query.order_by(desc(PromptModel.usage_count))
-
-    # 限制数量
-    if limit:
-        query = query.limit(limit)
-
-    prompts = query.all()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    prompts = page.scalars()
 
     # 解析变量列表
     for prompt in prompts:
@@ -101,7 +110,7 @@ async def get_prompts(
 
 @router.get("/stats/usage", response_model=PromptStats, summary="获取使用统计")
 async def get_usage_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取提示词使用统计
@@ -109,22 +118,23 @@ async def get_usage_stats(
     - 返回：总数、按分类统计、最常用的提示词
     """
     # 总数
-    total_count = db.query(func.count(PromptModel.id)).scalar() or 0
+    total_count = await db.scalar(select(func.count(PromptModel.id))) or 0
 
     # 按分类统计
-    category_stats = db.query(
-        PromptModel.category,
-        func.count(PromptModel.id).label('count')
-    ).group_by(PromptModel.category).all()
+    category_stats = (await db.execute(
+        select(PromptModel.category, func.count(PromptModel.id).label('count'))
+        .group_by(PromptModel.category)
+    )).all()
 
     by_category = {cat: count for cat, count in category_stats}
 
     # 最常用的提示词（前10）
-    top_prompts_query = db.query(PromptModel)\
-        .filter(PromptModel.usage_count > 0)\
-        .order_by(desc(PromptModel.usage_count))\
-        .limit(10)\
-        .all()
+    top_prompts_query = (await db.execute(
+        select(PromptModel)
+        .where(PromptModel.usage_count > 0)
+        .order_by(desc(PromptModel.usage_count))
+        .limit(10)
+    )).scalars().all()
 
     top_prompts = [
         {
@@ -145,7 +155,7 @@ async def get_usage_stats(
 
 @router.get("/categories", response_model=Dict[str, Any], summary="获取分类统计")
 async def get_categories(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取所有分类及统计信息
@@ -163,9 +173,9 @@ async def get_categories(
     # 统计各分类数量
     category_counts = {}
     for cat in categories:
-        count = db.query(func.count(PromptModel.id))\
-            .filter(PromptModel.category == cat["value"])\
-            .scalar() or 0
+        count = await db.scalar(
+            select(func.count(PromptModel.id)).where(PromptModel.category == cat["value"])
+        ) or 0
         category_counts[cat["value"]] = count
 
     return {
@@ -177,7 +187,7 @@ async def get_categories(
 @router.get("/{prompt_id}", response_model=PromptSchema, summary="获取单个提示词详情")
 async def get_prompt(
     prompt_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取单个提示词的详细信息
@@ -185,7 +195,7 @@ async def get_prompt(
     - **prompt_id**: 提示词ID
     - 返回：提示词信息
     """
-    prompt = db.query(PromptModel).filter(PromptModel.id == prompt_id).first()
+    prompt = await db.get(PromptModel, prompt_id, options=[selectinload(PromptModel.tags)])
     if not prompt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -345,11 +355,19 @@ async def delete_prompt(
     return {"message": f"提示词 '{prompt.title}' 删除成功", "prompt_id": prompt_id}
 
 
+def _increment_prompt_usage(db: Session, prompt_id: int):
+    """原子自增使用次数，避免并发复制时丢失计数"""
+    db.query(PromptModel).filter(PromptModel.id == prompt_id).update(
+        {PromptModel.usage_count: PromptModel.usage_count + 1},
+        synchronize_session=False
+    )
+
+
 @router.post("/{prompt_id}/copy", response_model=PromptCopyResponse, summary="复制提示词（支持变量替换）")
 async def copy_prompt(
     prompt_id: int,
     request: PromptCopyRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     复制提示词内容，支持变量替换
@@ -360,11 +378,11 @@ async def copy_prompt(
     流程：
     1. 获取提示词内容
     2. 如果提供了变量值，替换 {xxx} 为实际值
-    3. 记录使用次数（usage_count += 1）
+    3. 记录使用次数（usage_count += 1，经写入队列合并提交）
     4. 返回替换后的完整文本
     """
     # 查找提示词
-    prompt = db.query(PromptModel).filter(PromptModel.id == prompt_id).first()
+    prompt = await db.get(PromptModel, prompt_id)
     if not prompt:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -383,8 +401,7 @@ async def copy_prompt(
                 variables_used.append(key)
 
     # 记录使用
-    prompt.usage_count += 1
-    db.commit()
+    await write_queue.submit(_increment_prompt_usage, prompt_id)
 
     return PromptCopyResponse(
         content=content,
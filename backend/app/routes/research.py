@@ -1,87 +1,318 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import json
 from ..models import (
-    get_db, ResearchProject, Collaborator, CommunicationLog, Idea,
+    get_db, get_async_db, ResearchProject, Collaborator, CommunicationLog, Idea,
     ResearchProjectSchema, ResearchProjectCreate, ResearchProjectUpdate,
     CommunicationLogSchema, CommunicationLogCreate, CommunicationLogUpdate,
-    ResearchMethod
+    ResearchMethod, ResearchProjectSummary, RecentCommunicationLog, project_collaborators
 )
+from ..models.schemas import ResearchProjectBatchRequest
+from ..models.search_index import SEARCH_INDEXES
 from ..utils import DataValidator
+from ..utils.crud_base import CRUDBase, FilterField, Ordering
 from ..utils.security_validators import SecurityValidator
 from ..utils.response import success_response
-from ..utils.research_method_helper import update_research_method_usage
+from ..services.research_batch import BatchRejected, apply_project_batch
+from ..services.write_queue import write_queue
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ResearchProjectSchema])
-async def get_research_projects(
-    skip: int = 0,
-    limit: int = 100,
+# 摘要列表返回的项目列（不含描述、参考论文等长文本）
+SUMMARY_COLUMNS = (
+    "id", "title", "research_method", "reference_journal", "target_journal",
+    "reference_journal_id", "target_journal_id", "status", "progress", "my_role",
+    "is_todo", "todo_marked_at", "start_date", "expected_completion", "created_at", "updated_at",
+)
+
+# 序列化ResearchProjectSchema所需的全部关联（异步会话不支持懒加载）
+PROJECT_LOAD_OPTIONS = (
+    selectinload(ResearchProject.collaborators),
+    selectinload(ResearchProject.communication_logs).selectinload(CommunicationLog.collaborator),
+)
+
+# 研究项目列表的筛选和排序（完整列表和摘要列表共用）
+# 期刊名称筛选先在期刊名称全文索引中匹配，再按期刊外键（有索引）过滤
+project_crud = CRUDBase[ResearchProject, ResearchProjectCreate, ResearchProjectUpdate](
+    ResearchProject,
+    filters={
+        "search": FilterField("fts", index=SEARCH_INDEXES["research_projects"]),
+        "status": FilterField("eq", ResearchProject.status),
+        "my_role": FilterField("eq", ResearchProject.my_role),
+        "is_todo": FilterField("eq", ResearchProject.is_todo),
+        "research_method": FilterField(
+            "fts", ResearchProject.id, index=SEARCH_INDEXES["research_projects"], index_columns=["research_method"]
+        ),
+        "target_journal": FilterField("fts", ResearchProject.target_journal_id, index=SEARCH_INDEXES["journals"], index_columns=["name"]),
+        "reference_journal": FilterField("fts", ResearchProject.reference_journal_id, index=SEARCH_INDEXES["journals"], index_columns=["name"]),
+        "target_journal_id": FilterField("eq", ResearchProject.target_journal_id),
+        "reference_journal_id": FilterField("eq", ResearchProject.reference_journal_id),
+        "created_at": FilterField("range", ResearchProject.created_at),
+    },
+    orderings={
+        "title": ResearchProject.title,
+        "status": ResearchProject.status,
+        "progress": ResearchProject.progress,
+        "start_date": ResearchProject.start_date,
+        "expected_completion": ResearchProject.expected_completion,
+        "created_at": ResearchProject.created_at,
+        "updated_at": ResearchProject.updated_at,
+    },
+)
+
+
+# 交流记录的筛选和排序（项目交流记录和跨项目最近交流共用筛选字段）
+LOG_FILTERS = {
+    "project_id": FilterField("eq", CommunicationLog.project_id),
+    "communication_type": FilterField("eq", CommunicationLog.communication_type),
+    "collaborator_id": FilterField("eq", CommunicationLog.collaborator_id),
+    "communication_date": FilterField("range", CommunicationLog.communication_date),
+}
+log_crud = CRUDBase[CommunicationLog, CommunicationLogCreate, CommunicationLogUpdate](
+    CommunicationLog,
+    filters=LOG_FILTERS,
+    orderings={
+        "communication_date": CommunicationLog.communication_date,
+        "created_at": CommunicationLog.created_at,
+    },
+    default_ordering="-communication_date",
+)
+# 最近交流只包含有交流日期的记录：日期声明为非空排序键，游标条件是 (communication_date, id) 行值比较，
+# 配合日期索引倒序扫描，翻页时直接在索引上定位，不扫描全表也不排序
+recent_log_crud = CRUDBase[CommunicationLog, CommunicationLogCreate, CommunicationLogUpdate](
+    CommunicationLog,
+    filters=LOG_FILTERS,
+    orderings={"communication_date": Ordering(CommunicationLog.communication_date, nullable=False)},
+    default_ordering="-communication_date",
+)
+LOG_LOAD_OPTIONS = (selectinload(CommunicationLog.collaborator),)
+
+
+def log_list_filters(
+    communication_type: Optional[str] = Query(None, description="交流类型：meeting / email / chat / phone"),
+    collaborator_id: Optional[int] = None,
+    date_from: Optional[datetime] = Query(None, description="交流日期下限"),
+    date_to: Optional[datetime] = Query(None, description="交流日期上限"),
+) -> Dict[str, Any]:
+    """交流记录的筛选参数"""
+    return {
+        "communication_type": communication_type,
+        "collaborator_id": collaborator_id,
+        "communication_date": (date_from, date_to),
+    }
+
+def project_list_filters(
+    search: Optional[str] = Query(None, description="全文检索：标题、描述、研究方法等"),
     status: Optional[str] = None,
     my_role: Optional[str] = None,
+    is_todo: Optional[bool] = None,
     research_method: Optional[str] = None,
     target_journal: Optional[str] = None,
     reference_journal: Optional[str] = None,
-    db: Session = Depends(get_db)
+    target_journal_id: Optional[int] = None,
+    reference_journal_id: Optional[int] = None,
+    created_from: Optional[datetime] = Query(None, description="创建时间下限"),
+    created_to: Optional[datetime] = Query(None, description="创建时间上限"),
+) -> Dict[str, Any]:
+    """研究项目列表的筛选参数"""
+    return {
+        "search": search,
+        "status": status,
+        "my_role": my_role,
+        "is_todo": is_todo,
+        "research_method": research_method,
+        "target_journal": target_journal,
+        "reference_journal": reference_journal,
+        "target_journal_id": target_journal_id,
+        "reference_journal_id": reference_journal_id,
+        "created_at": (created_from, created_to),
+    }
+
+
+@router.get("/", response_model=List[ResearchProjectSchema])
+async def get_research_projects(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ordering: Optional[str] = Query(None, description="排序，逗号分隔，-前缀倒序（如 -updated_at,title）"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    filters: Dict[str, Any] = Depends(project_list_filters),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取研究项目列表（数据共享，包含交流记录）"""
-    # 基础查询 + 安全的关联加载
-    query = db.query(ResearchProject).options(
-        joinedload(ResearchProject.collaborators),
-        joinedload(ResearchProject.communication_logs)
-    )
+    try:
+        # 基础查询 + 安全的关联加载
+        page = await project_crud.paginate_async(
+            db, select(ResearchProject).options(*PROJECT_LOAD_OPTIONS),
+            filters=filters, ordering=ordering, cursor=cursor, limit=limit, skip=skip, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    return page.scalars()
 
-    # 按状态筛选
-    if status:
-        query = query.filter(ResearchProject.status == status)
 
-    # 按我的身份筛选
-    if my_role:
-        query = query.filter(ResearchProject.my_role == my_role)
+@router.get("/summary", response_model=List[ResearchProjectSummary])
+async def get_research_project_summaries(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ordering: Optional[str] = Query(None, description="排序，与完整列表相同"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    filters: Dict[str, Any] = Depends(project_list_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取研究项目摘要列表（筛选、排序和分页参数与完整列表相同）
+
+    只返回合作者ID/姓名、交流记录数量和最新交流日期，均由分组子查询一次算出；
+    交流记录全文通过 /{project_id}/logs 获取
+    """
+    log_stats = (
+        select(
+            CommunicationLog.project_id,
+            func.count(CommunicationLog.id).label("log_count"),
+            func.max(CommunicationLog.communication_date).label("latest_log_date"),
+        )
+        .group_by(CommunicationLog.project_id)
+        .subquery()
+    )
+    collaborator_lists = (
+        select(
+            project_collaborators.c.project_id,
+            func.json_group_array(
+                func.json_object("id", Collaborator.id, "name", Collaborator.name)
+            ).label("collaborators"),
+        )
+        .join(Collaborator, Collaborator.id == project_collaborators.c.collaborator_id)
+        .group_by(project_collaborators.c.project_id)
+        .subquery()
+    )
+
+    columns = [getattr(ResearchProject, name) for name in SUMMARY_COLUMNS]
+    query = (
+        select(
+            *columns,
+            func.coalesce(log_stats.c.log_count, 0).label("log_count"),
+            log_stats.c.latest_log_date,
+            collaborator_lists.c.collaborators,
+        )
+        .outerjoin(log_stats, log_stats.c.project_id == ResearchProject.id)
+        .outerjoin(collaborator_lists, collaborator_lists.c.project_id == ResearchProject.id)
+    )
+    try:
+        page = await project_crud.paginate_async(
+            db, query, filters=filters, ordering=ordering, cursor=cursor, limit=limit, skip=skip, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+
+    summaries = []
+    for row in page.rows:
+        item = dict(row._mapping)
+        item["collaborators"] = json.loads(row.collaborators) if row.collaborators else []
+        summaries.append(item)
+    return summaries
+
+
+@router.get("/logs/recent", response_model=List[RecentCommunicationLog])
+async def get_recent_communication_logs(
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    project_id: Optional[int] = None,
+    filters: Dict[str, Any] = Depends(log_list_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    跨项目的最近交流记录（按交流日期倒序，附带项目标题）
+
+    按日期索引倒序读取前limit条，不扫描全表；下一页游标在响应头 X-Next-Cursor 中
+    """
+    query = (
+        select(CommunicationLog, ResearchProject.title)
+        .join(ResearchProject, ResearchProject.id == CommunicationLog.project_id)
+        .where(CommunicationLog.communication_date.isnot(None))
+        .options(*LOG_LOAD_OPTIONS)
+    )
+    try:
+        page = await recent_log_crud.paginate_async(
+            db, query, filters={**filters, "project_id": project_id}, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+
+    logs = []
+    for row in page.rows:
+        log = row[0]
+        log.project_title = row[1]
+        logs.append(log)
+    return logs
 
-    # 按研究方法筛选（模糊匹配）
-    if research_method:
-        query = query.filter(ResearchProject.research_method.contains(research_method))
 
-    # 按投稿期刊筛选（模糊匹配）
-    if target_journal:
-        query = query.filter(ResearchProject.target_journal.contains(target_journal))
+@router.post("/batch")
+async def batch_update_research_projects(
+    request_data: ResearchProjectBatchRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    批量部分更新研究项目（状态、进度、待办、身份、研究方法、日期、期刊）
 
-    # 按参考期刊筛选（模糊匹配）
-    if reference_journal:
-        query = query.filter(ResearchProject.reference_journal.contains(reference_journal))
+    所有修改在一个事务中提交，相同字段集合的项目合并为一条UPDATE；
+    每一项单独返回结果，atomic=true 时任一项失败则不做任何修改（返回400和各项结果）
+    """
+    try:
+        result = apply_project_batch(
+            db, request_data.items, atomic=request_data.atomic,
+            ip_address=request.client.host if request.client else None,
+        )
+        return success_response(
+            message=f"Successfully updated {result['updated_count']} projects",
+            data=result
+        )
+    except BatchRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": str(e), "results": e.results}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"批量更新失败: {str(e)}"
+        )
 
-    projects = query.offset(skip).limit(limit).all()
-    return projects
 
 # ============ 用户独立待办功能 API ============
 # 注意：这些路由必须在 /{project_id} 之前定义，否则会被错误匹配
 
 @router.get("/todos", response_model=List[ResearchProjectSchema])
 async def get_user_todos(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取所有待办项目（单用户模式）"""
     # 直接查询is_todo=True的项目
-    projects = db.query(ResearchProject).filter(
-        ResearchProject.is_todo == True
-    ).options(
-        joinedload(ResearchProject.collaborators),
-        joinedload(ResearchProject.communication_logs)
-    ).order_by(desc(ResearchProject.todo_marked_at)).all()
+    result = await db.execute(
+        select(ResearchProject)
+        .where(ResearchProject.is_todo == True)
+        .options(*PROJECT_LOAD_OPTIONS)
+        .order_by(desc(ResearchProject.todo_marked_at))
+    )
 
-    return projects
+    return result.scalars().all()
 
 @router.get("/{project_id}", response_model=ResearchProjectSchema)
-async def get_research_project(project_id: int, db: Session = Depends(get_db)):
+async def get_research_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """获取单个研究项目详情（包含交流记录）"""
-    project = db.query(ResearchProject).options(
-        joinedload(ResearchProject.communication_logs)
-    ).filter(ResearchProject.id == project_id).first()
+    project = await db.get(ResearchProject, project_id, options=list(PROJECT_LOAD_OPTIONS))
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,10 +358,6 @@ async def convert_project_to_idea(
         db.add(new_idea)
         db.flush()  # 获取new_idea的ID
 
-        # 更新研究方法使用次数
-        if project.research_method:
-            update_research_method_usage(db, project.research_method, 1)
-
         # 删除原研究项目
         db.delete(project)
 
@@ -208,11 +435,6 @@ async def create_research_project(
     db.commit()
     db.refresh(db_project)
 
-    # 更新研究方法的使用次数（v4.7）
-    if db_project.research_method:
-        update_research_method_usage(db, db_project.research_method, 1)
-        db.commit()
-
     return db_project
 
 @router.put("/{project_id}", response_model=ResearchProjectSchema)
@@ -229,9 +451,6 @@ async def update_research_project(
             detail="Research project not found"
         )
 
-    # 保存旧的研究方法，用于更新usage_count（v4.7）
-    old_research_method = db_project.research_method
-
     update_data = project_update.model_dump(exclude_unset=True, exclude={'collaborator_ids'})
 
     # 特殊处理is_todo字段
@@ -260,17 +479,6 @@ async def update_research_project(
     db.commit()
     db.refresh(db_project)
 
-    # 更新研究方法的使用次数（v4.7）
-    new_research_method = db_project.research_method
-    if old_research_method != new_research_method:
-        # 减少旧方法的使用次数
-        if old_research_method:
-            update_research_method_usage(db, old_research_method, -1)
-        # 增加新方法的使用次数
-        if new_research_method:
-            update_research_method_usage(db, new_research_method, 1)
-        db.commit()
-
     return db_project
 
 @router.delete("/{project_id}")
@@ -283,9 +491,6 @@ async def delete_research_project(project_id: int, db: Session = Depends(get_db)
             detail="Research project not found"
         )
 
-    # 保存研究方法，用于更新usage_count（v4.7）
-    research_method = db_project.research_method
-
     try:
         # 获取关联数据统计（用于返回信息）
         log_count = db.query(CommunicationLog).filter(CommunicationLog.project_id == project_id).count()
@@ -295,11 +500,6 @@ async def delete_research_project(project_id: int, db: Session = Depends(get_db)
         db.delete(db_project)
         db.commit()
 
-        # 更新研究方法的使用次数（v4.7）
-        if research_method:
-            update_research_method_usage(db, research_method, -1)
-            db.commit()
-
         return {
             "message": "Research project deleted successfully",
             "deleted_logs": log_count,
@@ -314,14 +514,26 @@ async def delete_research_project(project_id: int, db: Session = Depends(get_db)
 
 @router.get("/{project_id}/logs", response_model=List[CommunicationLogSchema])
 async def get_project_communication_logs(
-    project_id: int, 
-    db: Session = Depends(get_db)
+    project_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="每页数量，不指定时返回全部"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    ordering: Optional[str] = Query(None, description="排序：-communication_date（默认）/ communication_date / created_at"),
+    with_total: bool = Query(False, description="在响应头 X-Total-Count 中返回总数"),
+    filters: Dict[str, Any] = Depends(log_list_filters),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取项目交流日志"""
-    logs = db.query(CommunicationLog).filter(
-        CommunicationLog.project_id == project_id
-    ).order_by(CommunicationLog.communication_date.desc()).all()
-    return logs
+    """获取项目交流日志（按 (project_id, communication_date) 索引分页，支持日期范围、类型和合作者筛选）"""
+    try:
+        page = await log_crud.paginate_async(
+            db, select(CommunicationLog).options(*LOG_LOAD_OPTIONS),
+            filters={**filters, "project_id": project_id},
+            ordering=ordering, cursor=cursor, limit=limit, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    return page.scalars()
 
 @router.post("/{project_id}/logs", response_model=CommunicationLogSchema)
 async def create_communication_log(
@@ -414,28 +626,31 @@ async def delete_communication_log(
     db.commit()
     return success_response(message="Communication log deleted successfully")
 
+def _update_project_fields(db: Session, project_id: int, values: dict):
+    """在写入队列中执行的单行UPDATE，项目不存在时返回404"""
+    updated = db.query(ResearchProject).filter(
+        ResearchProject.id == project_id
+    ).update(values, synchronize_session=False)
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Research project not found"
+        )
+
+
 @router.put("/{project_id}/progress")
 async def update_project_progress(
     project_id: int,
     progress: float,
-    db: Session = Depends(get_db)
 ):
-    """更新项目进度"""
+    """更新项目进度（经写入队列合并提交）"""
     if not 0 <= progress <= 100:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Progress must be between 0 and 100"
         )
-    
-    db_project = db.query(ResearchProject).filter(ResearchProject.id == project_id).first()
-    if not db_project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Research project not found"
-        )
-    
-    db_project.progress = progress
-    db.commit()
+
+    await write_queue.submit(_update_project_fields, project_id, {"progress": progress})
     return {"message": "Progress updated successfully", "progress": progress}
 
 @router.get("/{project_id}/check-dependencies")
@@ -451,40 +666,22 @@ async def check_project_dependencies(project_id: int, db: Session = Depends(get_
 
 
 @router.post("/{project_id}/todo")
-async def mark_project_as_todo(
-    project_id: int,
-    db: Session = Depends(get_db)
-):
-    """将项目标记为待办（单用户模式）"""
-    project = db.query(ResearchProject).filter(ResearchProject.id == project_id).first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Research project not found"
-        )
-
-    project.is_todo = True
-    project.todo_marked_at = datetime.utcnow()
-    db.commit()
+async def mark_project_as_todo(project_id: int):
+    """将项目标记为待办（单用户模式，经写入队列合并提交）"""
+    await write_queue.submit(
+        _update_project_fields, project_id,
+        {"is_todo": True, "todo_marked_at": datetime.utcnow()}
+    )
     return {"message": "Project marked as todo successfully"}
 
 
 @router.delete("/{project_id}/todo")
-async def unmark_project_as_todo(
-    project_id: int,
-    db: Session = Depends(get_db)
-):
-    """取消项目的待办标记（单用户模式）"""
-    project = db.query(ResearchProject).filter(ResearchProject.id == project_id).first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Research project not found"
-        )
-
-    project.is_todo = False
-    project.todo_marked_at = None
-    db.commit()
+async def unmark_project_as_todo(project_id: int):
+    """取消项目的待办标记（单用户模式，经写入队列合并提交）"""
+    await write_queue.submit(
+        _update_project_fields, project_id,
+        {"is_todo": False, "todo_marked_at": None}
+    )
     return {"message": "Project todo unmarked successfully"}
 
 
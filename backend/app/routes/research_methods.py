@@ -3,11 +3,15 @@
 提供研究方法的CRUD操作
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, exc
 from typing import List, Optional
 from app.models.database import ResearchMethod as ResearchMethodModel, ResearchProject, get_db
 from app.models.schemas import ResearchMethodCreate, ResearchMethodUpdate, ResearchMethod as ResearchMethodSchema
+from app.services.job_queue import job_queue
+from app.utils.response import job_accepted_response
+from app.utils.research_method_helper import cleanup_unused_methods, reconcile_method_usage
 
 router = APIRouter()
 
@@ -66,6 +70,39 @@ async def create_research_method(
     return new_method
 
 
+@router.get("/usage-drift", summary="检查研究方法使用次数漂移")
+async def get_research_method_usage_drift(db: Session = Depends(get_db)):
+    """
+    报告存储的usage_count与实际引用数（Idea + 研究项目）不一致的研究方法
+
+    - 使用次数由数据库触发器维护，正常情况下应为空；一次GROUP BY统计全部方法
+    """
+    try:
+        drifted = await run_in_threadpool(reconcile_method_usage, db, False)
+        return {"drifted_count": len(drifted), "drifted_methods": drifted}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"检查研究方法使用次数失败: {str(e)}")
+
+
+@router.post("/usage-drift/repair", summary="修复研究方法使用次数漂移")
+async def repair_research_method_usage_drift(db: Session = Depends(get_db)):
+    """
+    按实际引用重新统计全部研究方法的usage_count（一条UPDATE）
+
+    - 返回：修复前不一致的方法（stored为修复前的值，actual为修复后的值）
+    """
+    try:
+        drifted = await run_in_threadpool(reconcile_method_usage, db)
+        return {
+            "message": f"已修复 {len(drifted)} 个研究方法的使用次数",
+            "drifted_count": len(drifted),
+            "drifted_methods": drifted
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"修复研究方法使用次数失败: {str(e)}")
+
+
 @router.put("/{method_id}", response_model=ResearchMethodSchema, summary="更新研究方法")
 async def update_research_method(
     method_id: int,
@@ -222,29 +259,30 @@ async def get_or_create_research_method(
         )
 
 
+def _cleanup_unused(db: Session) -> dict:
+    """一条DELETE删除没有任何Idea或研究项目引用的研究方法，返回删除的数量和名称列表"""
+    method_names = cleanup_unused_methods(db)
+
+    return {
+        "message": f"成功删除 {len(method_names)} 个未使用的研究方法",
+        "deleted_count": len(method_names),
+        "deleted_methods": method_names
+    }
+
+
 @router.post("/cleanup-unused", status_code=status.HTTP_200_OK, summary="清理未使用的研究方法")
 async def cleanup_unused_research_methods(
+    as_job: bool = Query(False, description="作为后台任务执行，立即返回任务ID（202）"),
     db: Session = Depends(get_db)
 ):
     """
-    自动删除usage_count为0的研究方法
+    自动删除没有任何Idea或研究项目引用的研究方法（按实际引用判断，不依赖usage_count）
 
     - 返回：删除的方法数量和列表
+    - as_job=true 时提交为后台任务，结果见 GET /api/jobs/{id}
     """
-    from ..utils.research_method_helper import cleanup_unused_methods
+    if as_job:
+        job_id = await job_queue.submit("research_method_cleanup", lambda context: _cleanup_unused(context.db))
+        return job_accepted_response(job_id, "research_method_cleanup")
 
-    # 获取未使用的方法列表（用于返回信息）
-    unused_methods = db.query(ResearchMethodModel).filter(
-        ResearchMethodModel.usage_count == 0
-    ).all()
-
-    method_names = [method.name for method in unused_methods]
-
-    # 执行清理
-    deleted_count = cleanup_unused_methods(db)
-
-    return {
-        "message": f"成功删除 {deleted_count} 个未使用的研究方法",
-        "deleted_count": deleted_count,
-        "deleted_methods": method_names
-    }
+    return await run_in_threadpool(_cleanup_unused, db)
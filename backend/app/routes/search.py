@@ -0,0 +1,43 @@
+"""
+全局搜索API路由
+一次请求检索期刊、Idea、研究项目、提示词、合作者和交流记录
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import logging
+
+from ..models.database import get_async_db
+from ..services.search import SEARCH_ENTITIES, search_all
+from ..utils.response import success_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索关键词，空格分隔的多个词需同时命中"),
+    types: Optional[str] = Query(None, description=f"逗号分隔的类型：{', '.join(SEARCH_ENTITIES)}，默认全部"),
+    limit: int = Query(20, ge=1, le=100, description="本页最多返回的结果数"),
+    per_type_limit: Optional[int] = Query(None, ge=1, le=100, description="本页每种类型最多返回的结果数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    全局搜索
+
+    结果按相关度（bm25）合并排序，snippet为HTML转义后的摘要，命中部分用<mark>包裹；
+    has_more为true时使用next_cursor获取下一页
+    """
+    try:
+        data = await search_all(
+            db, q, types=types, limit=limit, per_type_limit=per_type_limit, cursor=cursor
+        )
+        return success_response(data=data, message="搜索成功")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"全局搜索失败: {e}")
+        raise HTTPException(status_code=500, detail=f"全局搜索失败: {str(e)}")
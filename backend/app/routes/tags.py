@@ -3,10 +3,11 @@
 提供标签的CRUD操作和关联期刊查询
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Optional
-from app.models.database import Tag as TagModel, Journal as JournalModel, journal_tags, get_db
+from app.models.database import Tag as TagModel, Journal as JournalModel, journal_tags, get_db, get_async_db
 from app.models.schemas import TagCreate, TagUpdate, Tag as TagSchema, Journal as JournalSchema
 
 router = APIRouter()
@@ -15,7 +16,7 @@ router = APIRouter()
 @router.get("/", response_model=List[TagSchema], summary="获取标签列表")
 async def get_tags(
     search: Optional[str] = Query(None, description="搜索关键词（标签名称）"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取所有标签列表
@@ -23,20 +24,20 @@ async def get_tags(
     - **search**: 可选，按标签名称搜索
     - 返回：标签列表，包含每个标签关联的期刊数量
     """
-    query = db.query(TagModel)
+    query = select(TagModel)
 
     # 搜索过滤
     if search:
-        query = query.filter(TagModel.name.contains(search))
+        query = query.where(TagModel.name.contains(search))
 
     # 按创建时间倒序排列
-    tags = query.order_by(TagModel.created_at.desc()).all()
+    tags = (await db.execute(query.order_by(TagModel.created_at.desc()))).scalars().all()
 
     # 为每个标签计算关联的期刊数量（动态添加属性）
     for tag in tags:
-        tag.journal_count = db.query(func.count(journal_tags.c.journal_id))\
-            .filter(journal_tags.c.tag_id == tag.id)\
-            .scalar() or 0
+        tag.journal_count = await db.scalar(
+            select(func.count(journal_tags.c.journal_id)).where(journal_tags.c.tag_id == tag.id)
+        ) or 0
 
     return tags
 
@@ -170,7 +171,7 @@ async def delete_tag(
 @router.get("/{tag_id}/journals", response_model=List[JournalSchema], summary="获取标签的关联期刊")
 async def get_tag_journals(
     tag_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取指定标签关联的所有期刊
@@ -179,19 +180,21 @@ async def get_tag_journals(
     - 返回：期刊列表（包含完整的期刊信息）
     """
     # 查找标签
-    tag = db.query(TagModel).filter(TagModel.id == tag_id).first()
+    tag = await db.get(TagModel, tag_id)
     if not tag:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"标签ID {tag_id} 不存在"
         )
 
-    # 查询关联的期刊（通过journal_tags表）
-    journals = db.query(JournalModel)\
-        .join(journal_tags, JournalModel.id == journal_tags.c.journal_id)\
-        .filter(journal_tags.c.tag_id == tag_id)\
-        .order_by(JournalModel.name)\
-        .all()
+    # 查询关联的期刊（通过journal_tags表），同时预加载每个期刊的标签
+    journals = (await db.execute(
+        select(JournalModel)
+        .join(journal_tags, JournalModel.id == journal_tags.c.journal_id)
+        .where(journal_tags.c.tag_id == tag_id)
+        .options(selectinload(JournalModel.tags))
+        .order_by(JournalModel.name)
+    )).scalars().all()
 
     # 为每个期刊添加tags列表和统计信息
     result = []
@@ -217,7 +220,7 @@ async def get_tag_journals(
 @router.get("/{tag_id}", response_model=TagSchema, summary="获取单个标签详情")
 async def get_tag(
     tag_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取单个标签的详细信息
@@ -225,7 +228,7 @@ async def get_tag(
     - **tag_id**: 标签ID
     - 返回：标签信息，包含关联的期刊数量
     """
-    tag = db.query(TagModel).filter(TagModel.id == tag_id).first()
+    tag = await db.get(TagModel, tag_id)
     if not tag:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -233,8 +236,8 @@ async def get_tag(
         )
 
     # 添加journal_count属性
-    tag.journal_count = db.query(func.count(journal_tags.c.journal_id))\
-        .filter(journal_tags.c.tag_id == tag.id)\
-        .scalar() or 0
+    tag.journal_count = await db.scalar(
+        select(func.count(journal_tags.c.journal_id)).where(journal_tags.c.tag_id == tag.id)
+    ) or 0
 
     return tag
@@ -4,5 +4,7 @@
 
 from .validation import ValidationService
 from .audit import AuditService
+from .write_queue import WriteQueue, write_queue
+from .search import search_all
 
-__all__ = ['ValidationService', 'AuditService']
\ No newline at end of file
+__all__ = ['ValidationService', 'AuditService', 'WriteQueue', 'write_queue', 'search_all']
\ No newline at end of file
@@ -4,9 +4,9 @@
 
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect
+from sqlalchemy import inspect, insert
 from ..models.database import AuditLog
 
 class AuditService:
@@ -34,6 +34,38 @@ class AuditService:
         db.commit()
         return audit_log
     
+    @staticmethod
+    def log_create_many(
+        db: Session,
+        table_name: str,
+        entries: Iterable[Tuple[int, Dict[str, Any]]],
+        ip_address: Optional[str] = None
+    ) -> int:
+        """
+        批量记录创建操作：一条多行INSERT，不提交（随调用方的事务一起提交）
+
+        Args:
+            entries: (record_id, new_values)
+
+        Returns:
+            写入的审计记录数
+        """
+        rows = [
+            {
+                "table_name": table_name,
+                "record_id": record_id,
+                "action": "CREATE",
+                "ip_address": ip_address,
+                "old_values": None,
+                "new_values": json.dumps(new_values, ensure_ascii=False, default=str),
+                "changes": json.dumps(list(new_values.keys()), ensure_ascii=False),
+            }
+            for record_id, new_values in entries
+        ]
+        if rows:
+            db.execute(insert(AuditLog), rows)
+        return len(rows)
+    
     @staticmethod
     def log_update(
         db: Session,
@@ -71,6 +103,44 @@ class AuditService:
         db.commit()
         return audit_log
     
+    @staticmethod
+    def log_update_many(
+        db: Session,
+        table_name: str,
+        entries: Iterable[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+        ip_address: Optional[str] = None
+    ) -> int:
+        """
+        批量记录更新操作：一条多行INSERT，不提交（随调用方的事务一起提交）
+
+        Args:
+            entries: (record_id, old_values, new_values)，没有变更的记录不写入
+
+        Returns:
+            写入的审计记录数
+        """
+        rows = []
+        for record_id, old_values, new_values in entries:
+            changes = {
+                key: {"old": old_values.get(key), "new": new_value}
+                for key, new_value in new_values.items()
+                if old_values.get(key) != new_value
+            }
+            if not changes:
+                continue
+            rows.append({
+                "table_name": table_name,
+                "record_id": record_id,
+                "action": "UPDATE",
+                "ip_address": ip_address,
+                "old_values": json.dumps(old_values, ensure_ascii=False, default=str),
+                "new_values": json.dumps(new_values, ensure_ascii=False, default=str),
+                "changes": json.dumps(changes, ensure_ascii=False, default=str),
+            })
+        if rows:
+            db.execute(insert(AuditLog), rows)
+        return len(rows)
+    
     @staticmethod
     def log_delete(
         db: Session,
@@ -96,6 +166,38 @@ class AuditService:
         db.commit()
         return audit_log
     
+    @staticmethod
+    def log_delete_many(
+        db: Session,
+        table_name: str,
+        entries: Iterable[Tuple[int, Dict[str, Any]]],
+        ip_address: Optional[str] = None
+    ) -> int:
+        """
+        批量记录删除操作：一条多行INSERT，不提交（随调用方的事务一起提交）
+
+        Args:
+            entries: (record_id, old_values)
+
+        Returns:
+            写入的审计记录数
+        """
+        rows = [
+            {
+                "table_name": table_name,
+                "record_id": record_id,
+                "action": "DELETE",
+                "ip_address": ip_address,
+                "old_values": json.dumps(old_values, ensure_ascii=False, default=str),
+                "new_values": None,
+                "changes": json.dumps({"deleted": True}, ensure_ascii=False),
+            }
+            for record_id, old_values in entries
+        ]
+        if rows:
+            db.execute(insert(AuditLog), rows)
+        return len(rows)
+    
     @staticmethod
     def log_restore(
         db: Session,
@@ -0,0 +1,291 @@
+"""
+进程内合作关系图
+合作者为节点，共同参与的项目（project_collaborators）和共同负责的Idea（idea_responsible_persons）为加权边：
+- 两张关联表各扫描一次，邻接表以CSR形式（offsets + 邻居/权重数组）保存，每个节点的邻居按权重降序排列
+- 构建时计算度、加权度、度中心性、特征向量中心性和连通分量，查询时只做数组切片
+关联表或合作者表有写入提交后图失效（删除项目/Idea会级联删除关联记录，也视为写入），下次查询时重建
+"""
+
+import itertools
+import logging
+import math
+import re
+import time
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models.database import Collaborator, ReadSessionLocal, idea_responsible_persons, project_collaborators
+from app.utils.snapshot_cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+# 修改合作关系的语句；项目和Idea的删除会通过外键级联删除关联记录
+GRAPH_WRITE_PATTERN = re.compile(
+    r"^\s*(?:(?:INSERT|UPDATE|DELETE|REPLACE)\b.*?\b(?:project_collaborators|idea_responsible_persons|collaborators)\b"
+    r"|DELETE\s+FROM\s+(?:research_projects|ideas)\b)",
+    re.I | re.S,
+)
+
+# 特征向量中心性的幂迭代参数
+EIGENVECTOR_MAX_ITERATIONS = 100
+EIGENVECTOR_TOLERANCE = 1e-8
+
+
+def _pair_counts(groups: Iterable[Tuple[int, Iterable[int]]], positions: Dict[int, int]) -> Dict[Tuple[int, int], int]:
+    """每组（一个项目或一个Idea）内的成员两两计数一次"""
+    counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    for _, members in groups:
+        indices = sorted({positions[member] for member in members if member in positions})
+        for pair in itertools.combinations(indices, 2):
+            counts[pair] += 1
+    return counts
+
+
+def _grouped(rows: Iterable[Tuple[int, int]]) -> Iterable[Tuple[int, Iterable[int]]]:
+    """(分组ID, 合作者ID) 行按分组ID排序后的分组"""
+    for group_id, members in itertools.groupby(rows, key=lambda row: row[0]):
+        yield group_id, (collaborator_id for _, collaborator_id in members)
+
+
+def _eigenvector_centrality(offsets: array, neighbors: array, weights: array) -> List[float]:
+    """加权特征向量中心性（幂迭代，迭代矩阵为 A + I 以保证收敛，结果按L2范数归一化）"""
+    count = len(offsets) - 1
+    if count == 0:
+        return []
+    scores = [1.0 / math.sqrt(count)] * count
+    for _ in range(EIGENVECTOR_MAX_ITERATIONS):
+        updated = scores[:]
+        for node in range(count):
+            total = 0.0
+            for index in range(offsets[node], offsets[node + 1]):
+                total += weights[index] * scores[neighbors[index]]
+            updated[node] += total
+        norm = math.sqrt(sum(value * value for value in updated)) or 1.0
+        updated = [value / norm for value in updated]
+        if sum(abs(new - old) for new, old in zip(updated, scores)) < count * EIGENVECTOR_TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def _components(offsets: array, neighbors: array) -> List[int]:
+    """连通分量编号（按分量大小降序编号，0为最大分量）"""
+    count = len(offsets) - 1
+    labels = [-1] * count
+    members: List[List[int]] = []
+    for start in range(count):
+        if labels[start] != -1:
+            continue
+        label = len(members)
+        labels[start] = label
+        stack, component = [start], [start]
+        while stack:
+            node = stack.pop()
+            for index in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[index]
+                if labels[neighbor] == -1:
+                    labels[neighbor] = label
+                    stack.append(neighbor)
+                    component.append(neighbor)
+        members.append(component)
+
+    order = sorted(range(len(members)), key=lambda label: (-len(members[label]), label))
+    renumber = {label: rank for rank, label in enumerate(order)}
+    return [renumber[label] for label in labels]
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """某一时刻的合作关系图（构建后只读，查询无需加锁）"""
+    collaborators: List[Tuple[int, str]]  # (id, name)，按id排序
+    positions: Dict[int, int]
+    offsets: array  # 节点i的邻居位于 [offsets[i], offsets[i+1])
+    neighbors: array
+    project_weights: array
+    idea_weights: array
+    weights: array  # 共同项目数 + 共同Idea数
+    weighted_degrees: List[int]
+    eigenvector: List[float]
+    components: List[int]
+    built_at: float = field(default_factory=time.time)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.neighbors) // 2
+
+    def degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def node_dict(self, node: int) -> Dict[str, Any]:
+        collaborator_id, name = self.collaborators[node]
+        count = len(self.collaborators)
+        degree = self.degree(node)
+        return {
+            "id": collaborator_id,
+            "name": name,
+            "degree": degree,
+            "weighted_degree": self.weighted_degrees[node],
+            "degree_centrality": round(degree / (count - 1), 6) if count > 1 else 0.0,
+            "eigenvector_centrality": round(self.eigenvector[node], 6),
+            "component": self.components[node],
+        }
+
+    def neighbor_dicts(self, node: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        start, end = self.offsets[node], self.offsets[node + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [
+            {
+                "id": self.collaborators[self.neighbors[index]][0],
+                "name": self.collaborators[self.neighbors[index]][1],
+                "weight": self.weights[index],
+                "projects": self.project_weights[index],
+                "ideas": self.idea_weights[index],
+            }
+            for index in range(start, end)
+        ]
+
+
+class CollaborationGraph:
+    """合作关系图：失效后在下一次查询时惰性重建"""
+
+    def __init__(self):
+        self._cache: SnapshotCache[GraphSnapshot] = SnapshotCache(self._build, GRAPH_WRITE_PATTERN)
+
+    @property
+    def rebuild_count(self) -> int:
+        return self._cache.rebuild_count
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def snapshot(self) -> GraphSnapshot:
+        return self._cache.get()
+
+    def _build(self) -> GraphSnapshot:
+        start = time.perf_counter()
+        db = ReadSessionLocal()
+        try:
+            collaborator_rows = db.execute(
+                select(Collaborator.id, Collaborator.name)
+                .where(Collaborator.is_deleted.is_not(True))
+                .order_by(Collaborator.id)
+            ).all()
+            project_rows = db.execute(
+                select(project_collaborators.c.project_id, project_collaborators.c.collaborator_id)
+                .order_by(project_collaborators.c.project_id)
+            ).all()
+            idea_rows = db.execute(
+                select(idea_responsible_persons.c.idea_id, idea_responsible_persons.c.collaborator_id)
+                .order_by(idea_responsible_persons.c.idea_id)
+            ).all()
+        finally:
+            db.close()
+
+        collaborators = [(row.id, row.name) for row in collaborator_rows]
+        positions = {collaborator_id: position for position, (collaborator_id, _) in enumerate(collaborators)}
+        project_pairs = _pair_counts(_grouped(project_rows), positions)
+        idea_pairs = _pair_counts(_grouped(idea_rows), positions)
+
+        # 无向边在两端各存一次，每个节点的邻居按 (权重降序, 位置) 排列
+        adjacency: List[List[Tuple[int, int, int]]] = [[] for _ in collaborators]
+        for pair in project_pairs.keys() | idea_pairs.keys():
+            projects, ideas = project_pairs.get(pair, 0), idea_pairs.get(pair, 0)
+            left, right = pair
+            adjacency[left].append((right, projects, ideas))
+            adjacency[right].append((left, projects, ideas))
+
+        offsets, neighbors = array("i", [0]), array("i")
+        project_weights, idea_weights, weights = array("i"), array("i"), array("i")
+        weighted_degrees = []
+        for edges in adjacency:
+            edges.sort(key=lambda edge: (-(edge[1] + edge[2]), edge[0]))
+            for neighbor, projects, ideas in edges:
+                neighbors.append(neighbor)
+                project_weights.append(projects)
+                idea_weights.append(ideas)
+                weights.append(projects + ideas)
+            offsets.append(len(neighbors))
+            weighted_degrees.append(sum(projects + ideas for _, projects, ideas in edges))
+
+        snapshot = GraphSnapshot(
+            collaborators=collaborators,
+            positions=positions,
+            offsets=offsets,
+            neighbors=neighbors,
+            project_weights=project_weights,
+            idea_weights=idea_weights,
+            weights=weights,
+            weighted_degrees=weighted_degrees,
+            eigenvector=_eigenvector_centrality(offsets, neighbors, weights),
+            components=_components(offsets, neighbors),
+        )
+        logger.info(f"合作关系图已重建: {len(collaborators)} 个合作者, {snapshot.edge_count} 条边, "
+                    f"耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        return snapshot
+
+    def graph(self, min_weight: int = 1, include_isolated: bool = True) -> Dict[str, Any]:
+        """
+        整张图
+
+        Args:
+            min_weight: 只返回权重不低于该值的边
+            include_isolated: 是否返回没有任何边的合作者（度为0）
+
+        Returns:
+            nodes（含度和中心性）、edges（source < target）和汇总统计
+        """
+        snapshot = self.snapshot()
+        offsets, neighbors, weights = snapshot.offsets, snapshot.neighbors, snapshot.weights
+        edges = []
+        for node in range(len(snapshot.collaborators)):
+            source = snapshot.collaborators[node][0]
+            for index in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[index]
+                if neighbor > node and weights[index] >= min_weight:
+                    edges.append({
+                        "source": source,
+                        "target": snapshot.collaborators[neighbor][0],
+                        "weight": weights[index],
+                        "projects": snapshot.project_weights[index],
+                        "ideas": snapshot.idea_weights[index],
+                    })
+
+        nodes = [
+            snapshot.node_dict(node) for node in range(len(snapshot.collaborators))
+            if include_isolated or snapshot.degree(node) > 0
+        ]
+        count = len(snapshot.collaborators)
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "stats": {
+                "node_count": count,
+                "edge_count": snapshot.edge_count,
+                "component_count": max(snapshot.components, default=-1) + 1,
+                "density": round(2 * snapshot.edge_count / (count * (count - 1)), 6) if count > 1 else 0.0,
+                "built_at": snapshot.built_at,
+            },
+        }
+
+    def neighbors(self, collaborator_id: int, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        某个合作者的合作者（按权重降序）
+
+        Returns:
+            节点信息和邻居列表；合作者不存在或已删除时返回None
+        """
+        snapshot = self.snapshot()
+        node = snapshot.positions.get(collaborator_id)
+        if node is None:
+            return None
+        return {**snapshot.node_dict(node), "neighbors": snapshot.neighbor_dicts(node, limit)}
+
+
+# 全局合作关系图实例
+collaboration_graph = CollaborationGraph()
+
@@ -0,0 +1,167 @@
+"""
+合作者Excel批量导入服务
+openpyxl只读模式逐行读取工作表，表头只映射一次；按块处理：
+块内按姓名去重 → 一次IN查询找出已存在的合作者 → 批量INSERT新合作者、按主键批量UPDATE已有合作者，
+每块一个事务，内存中只保留当前块
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.database import Collaborator
+
+logger = logging.getLogger(__name__)
+
+# Excel表头别名：合作者模型只保留姓名和背景两个业务字段，其他列（性别、班级等）忽略
+COLUMN_MAPPING = {
+    "name": ["姓名", "name", "Name", "名字"],
+    "background": ["具体情况和背景", "background", "Background", "背景", "情况"],
+}
+NAME_MAX_LENGTH = 100
+
+
+class CollaboratorImportResult:
+    """导入结果汇总"""
+
+    def __init__(self):
+        self.created_count = 0
+        self.updated_count = 0
+        self.errors: List[str] = []
+        self.chunk_count = 0
+
+    @property
+    def imported_count(self) -> int:
+        return self.created_count + self.updated_count
+
+
+def _map_header(row: Tuple[Any, ...]) -> Dict[str, int]:
+    columns = ["" if cell is None else str(cell).strip() for cell in row]
+    header = {}
+    for field, aliases in COLUMN_MAPPING.items():
+        for index, column in enumerate(columns):
+            if column in aliases:
+                header[field] = index
+                break
+    if "name" not in header:
+        raise ValueError("Name column (姓名) is required")
+    return header
+
+
+def _cell_text(row: Tuple[Any, ...], index: Optional[int]) -> Optional[str]:
+    if index is None or index >= len(row) or row[index] is None:
+        return None
+    text = str(row[index]).strip()
+    return text or None
+
+
+def import_collaborator_chunk(db: Session, rows: List[Tuple[int, str, Optional[str]]],
+                              result: CollaboratorImportResult):
+    """
+    导入一块 (行号, 姓名, 背景) 并提交事务
+
+    与逐行导入的语义一致：同名合作者已存在（包括已软删除的）时更新背景并恢复，否则新建；
+    块内重复的姓名以最后一次出现的背景为准
+    """
+    start = time.perf_counter()
+    pending: Dict[str, Tuple[int, Optional[str]]] = {}
+    for line, name, background in rows:
+        previous = pending.get(name)
+        if previous is not None and background is None:
+            background = previous[1]
+        pending[name] = (line, background)
+
+    try:
+        # 一次IN查询；历史数据中同名的多条记录只更新id最小的一条（与逐行查询的first()一致）
+        existing: Dict[str, int] = {}
+        statement = select(Collaborator.id, Collaborator.name).where(
+            Collaborator.name.in_(list(pending))
+        ).order_by(Collaborator.id)
+        for collaborator_id, name in db.execute(statement):
+            existing.setdefault(name, collaborator_id)
+
+        now = datetime.utcnow()
+        new_rows = [
+            {"name": name, "background": background or "", "created_at": now, "updated_at": now}
+            for name, (_, background) in pending.items() if name not in existing
+        ]
+        # 按主键批量更新：executemany要求每行的列相同，没有背景的行只做恢复
+        restore = {"is_deleted": False, "deleted_at": None, "updated_at": now}
+        with_background = []
+        restore_only = []
+        for name, collaborator_id in existing.items():
+            background = pending[name][1]
+            if background is None:
+                restore_only.append({"id": collaborator_id, **restore})
+            else:
+                with_background.append({"id": collaborator_id, "background": background, **restore})
+
+        if new_rows:
+            db.execute(insert(Collaborator), new_rows)
+        for params in (with_background, restore_only):
+            if params:
+                db.execute(update(Collaborator), params)
+        db.commit()
+
+        result.created_count += len(new_rows)
+        result.updated_count += len(existing)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"合作者导入块写入失败: {e}")
+        result.errors.extend(f"Row {line}: {str(e)}" for line, _ in pending.values())
+
+    result.chunk_count += 1
+    logger.info(f"合作者导入进度: 第{result.chunk_count}块 {len(rows)}行，"
+                f"耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+def import_collaborator_workbook(db: Session, file: BinaryIO, chunk_size: int,
+                                 progress: Optional[Callable[[float, str], None]] = None) -> CollaboratorImportResult:
+    """
+    流式导入.xlsx文件（同步执行，路由中放到线程池或后台任务中运行）
+
+    Args:
+        file: 可seek的二进制文件对象（UploadFile.file 即可，无需整体读入内存）
+        chunk_size: 每个事务处理的行数
+        progress: 每块提交后的回调 (进度0~1, 说明)，进度按工作表声明的行数估算
+
+    Raises:
+        ValueError: 工作表为空或缺少姓名列
+    """
+    result = CollaboratorImportResult()
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        total_rows = worksheet.max_row or 0
+        rows = worksheet.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            raise ValueError("Excel文件为空")
+        header = _map_header(header_row)
+        name_index = header["name"]
+        background_index = header.get("background")
+
+        chunk: List[Tuple[int, str, Optional[str]]] = []
+        # 第1行为表头，数据行号与Excel中显示的行号一致
+        for line, row in enumerate(rows, start=2):
+            name = _cell_text(row, name_index)
+            if name is None:
+                if any(cell is not None for cell in row):
+                    result.errors.append(f"Row {line}: 姓名为空")
+                continue
+            chunk.append((line, name[:NAME_MAX_LENGTH], _cell_text(row, background_index)))
+            if len(chunk) >= chunk_size:
+                import_collaborator_chunk(db, chunk, result)
+                chunk = []
+                if progress:
+                    progress(line / total_rows if total_rows else 0.0, f"已处理 {line - 1} 行")
+        if chunk:
+            import_collaborator_chunk(db, chunk, result)
+    finally:
+        workbook.close()
+    return result
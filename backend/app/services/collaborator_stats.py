@@ -0,0 +1,77 @@
+"""
+合作者统计：参与项目数（按状态）、负责的Ideas数、交流记录数
+三个按合作者分组的子查询，与合作者查询 LEFT JOIN 后一次查询取回，不加载任何关系
+"""
+
+import json
+from typing import Any
+
+from sqlalchemy import distinct, func, select, union
+
+from app.models.database import (
+    CommunicationLog, Collaborator, Idea, ResearchProject, idea_responsible_persons, project_collaborators
+)
+
+# 项目数：先按 (合作者, 状态) 分组，再汇总为总数和 {状态: 数量}
+_projects_by_status = (
+    select(
+        project_collaborators.c.collaborator_id,
+        ResearchProject.status,
+        func.count(distinct(ResearchProject.id)).label("n"),
+    )
+    .join(ResearchProject, ResearchProject.id == project_collaborators.c.project_id)
+    .group_by(project_collaborators.c.collaborator_id, ResearchProject.status)
+    .subquery()
+)
+PROJECT_STATS = (
+    select(
+        _projects_by_status.c.collaborator_id,
+        func.sum(_projects_by_status.c.n).label("project_count"),
+        func.json_group_object(_projects_by_status.c.status, _projects_by_status.c.n).label("project_status_counts"),
+    )
+    .group_by(_projects_by_status.c.collaborator_id)
+    .subquery("collaborator_project_stats")
+)
+
+# Ideas数：主负责人和多选负责人合并去重（UNION）
+_idea_links = union(
+    select(idea_responsible_persons.c.idea_id, idea_responsible_persons.c.collaborator_id),
+    select(Idea.id, Idea.responsible_person_id).where(Idea.responsible_person_id.isnot(None)),
+).subquery()
+IDEA_STATS = (
+    select(_idea_links.c.collaborator_id, func.count().label("idea_count"))
+    .group_by(_idea_links.c.collaborator_id)
+    .subquery("collaborator_idea_stats")
+)
+
+LOG_STATS = (
+    select(CommunicationLog.collaborator_id, func.count(CommunicationLog.id).label("log_count"))
+    .where(CommunicationLog.collaborator_id.isnot(None))
+    .group_by(CommunicationLog.collaborator_id)
+    .subquery("collaborator_log_stats")
+)
+
+PROJECT_COUNT = func.coalesce(PROJECT_STATS.c.project_count, 0)
+IDEA_COUNT = func.coalesce(IDEA_STATS.c.idea_count, 0)
+LOG_COUNT = func.coalesce(LOG_STATS.c.log_count, 0)
+
+
+def with_collaborator_stats(query):
+    """给 select(Collaborator) 附加统计列（依次为项目数、按状态项目数JSON、Ideas数、交流记录数）"""
+    return (
+        query
+        .add_columns(PROJECT_COUNT, PROJECT_STATS.c.project_status_counts, IDEA_COUNT, LOG_COUNT)
+        .outerjoin(PROJECT_STATS, PROJECT_STATS.c.collaborator_id == Collaborator.id)
+        .outerjoin(IDEA_STATS, IDEA_STATS.c.collaborator_id == Collaborator.id)
+        .outerjoin(LOG_STATS, LOG_STATS.c.collaborator_id == Collaborator.id)
+    )
+
+
+def apply_collaborator_stats(row: Any) -> Collaborator:
+    """把 with_collaborator_stats 查询的一行中的统计值设置到合作者对象上（计算属性，不存储）"""
+    collaborator = row[0]
+    collaborator.project_count = row[1]
+    collaborator.project_status_counts = json.loads(row[2]) if row[2] else {}
+    collaborator.idea_count = row[3]
+    collaborator.log_count = row[4]
+    return collaborator
@@ -0,0 +1,145 @@
+"""
+Ideas批量转化为研究项目
+同一事务内：一次查询读取Ideas → 一次查询读取负责人 → 多行INSERT创建项目 →
+一条INSERT写入 project_collaborators → 删除Ideas → 多行INSERT写审计日志（研究方法使用次数由触发器维护）
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.database import Collaborator, Idea, ResearchProject, idea_responsible_persons, project_collaborators
+from app.services.audit import AuditService
+
+logger = logging.getLogger(__name__)
+
+IDEA_COLUMNS = (
+    Idea.id, Idea.project_name, Idea.project_description, Idea.research_method, Idea.source,
+    Idea.reference_paper, Idea.reference_journal, Idea.target_journal,
+    Idea.reference_journal_id, Idea.target_journal_id, Idea.responsible_person_id,
+)
+
+
+def _project_values(idea) -> Dict[str, Any]:
+    """与单个转化接口相同的字段映射；期刊外键直接沿用Idea上已解析的值"""
+    return {
+        "title": idea.project_name,
+        "idea_description": idea.project_description or idea.project_name,
+        "research_method": idea.research_method,
+        "reference_paper": idea.reference_paper or None,
+        "reference_journal": idea.reference_journal or None,
+        "target_journal": idea.target_journal or None,
+        "reference_journal_id": idea.reference_journal_id,
+        "target_journal_id": idea.target_journal_id,
+        # 优先使用新字段，如果新字段为空则回退到source
+        "source": idea.source if (not idea.reference_paper and not idea.reference_journal) else None,
+        "status": "writing",
+        "progress": 0.0,
+        "my_role": "first_author",
+    }
+
+
+def _load_responsible_persons(db: Session, ideas: List[Any]) -> Dict[int, List[Any]]:
+    """每个Idea的负责人（主负责人在前，去重，不含已删除的合作者）"""
+    candidates: Dict[int, List[int]] = defaultdict(list)
+    for idea in ideas:
+        if idea.responsible_person_id:
+            candidates[idea.id].append(idea.responsible_person_id)
+    links = db.execute(
+        select(idea_responsible_persons.c.idea_id, idea_responsible_persons.c.collaborator_id)
+        .where(idea_responsible_persons.c.idea_id.in_([idea.id for idea in ideas]))
+    )
+    for idea_id, collaborator_id in links:
+        candidates[idea_id].append(collaborator_id)
+
+    collaborator_ids = {collaborator_id for ids in candidates.values() for collaborator_id in ids}
+    collaborators = {
+        row.id: row
+        for row in db.execute(
+            select(Collaborator.id, Collaborator.name)
+            .where(Collaborator.id.in_(collaborator_ids), Collaborator.is_deleted == False)
+        )
+    } if collaborator_ids else {}
+
+    persons = {}
+    for idea_id, ids in candidates.items():
+        persons[idea_id] = [collaborators[cid] for cid in dict.fromkeys(ids) if cid in collaborators]
+    return persons
+
+
+def convert_ideas_to_projects(db: Session, idea_ids: List[int], ip_address: Optional[str] = None) -> Dict[str, Any]:
+    """
+    把多个Idea转化为研究项目并提交（负责人自动加入项目合作者）
+
+    Returns:
+        converted_count、failed_count 和每个Idea的结果（按请求顺序，重复的ID只转化一次）
+    """
+    requested = list(dict.fromkeys(idea_ids))
+    ideas = {row.id: row for row in db.execute(select(*IDEA_COLUMNS).where(Idea.id.in_(requested)))}
+    found = [ideas[idea_id] for idea_id in requested if idea_id in ideas]
+
+    results = []
+    if found:
+        persons = _load_responsible_persons(db, found)
+        try:
+            # 多行INSERT，按参数顺序返回新项目ID
+            project_ids = db.execute(
+                insert(ResearchProject).returning(ResearchProject.id, sort_by_parameter_order=True),
+                [_project_values(idea) for idea in found],
+            ).scalars().all()
+            project_by_idea = dict(zip((idea.id for idea in found), project_ids))
+
+            links = [
+                {"project_id": project_by_idea[idea.id], "collaborator_id": person.id}
+                for idea in found for person in persons.get(idea.id, [])
+            ]
+            if links:
+                db.execute(insert(project_collaborators), links)
+
+            found_ids = [idea.id for idea in found]
+            db.execute(delete(idea_responsible_persons).where(idea_responsible_persons.c.idea_id.in_(found_ids)))
+            db.execute(delete(Idea).where(Idea.id.in_(found_ids)).execution_options(synchronize_session=False))
+
+            # 审计日志（CONVERT 视为 DELETE，附加转换信息）
+            AuditService.log_delete_many(
+                db,
+                "ideas",
+                [
+                    (idea.id, {
+                        "action": "CONVERT",
+                        "converted_to_project_id": project_by_idea[idea.id],
+                        "project_title": idea.project_name,
+                        "responsible_persons_added": [person.name for person in persons.get(idea.id, [])],
+                        "original_idea": {
+                            "project_name": idea.project_name,
+                            "project_description": idea.project_description
+                        }
+                    })
+                    for idea in found
+                ],
+                ip_address=ip_address,
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    for idea_id in requested:
+        idea = ideas.get(idea_id)
+        if idea is None:
+            results.append({"idea_id": idea_id, "success": False, "error": "Idea not found"})
+            continue
+        results.append({
+            "idea_id": idea_id,
+            "success": True,
+            "project_id": project_by_idea[idea_id],
+            "project_title": idea.project_name,
+            "responsible_persons_added": [person.name for person in persons.get(idea_id, [])],
+        })
+
+    converted_count = len(found)
+    logger.info(f"Ideas批量转化: {converted_count} 个转化为研究项目，{len(requested) - converted_count} 个不存在")
+    return {"converted_count": converted_count, "failed_count": len(requested) - converted_count, "results": results}
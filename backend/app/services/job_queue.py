@@ -0,0 +1,308 @@
+"""
+后台任务队列
+耗时操作（Excel导入、批量导入、备份与恢复、一致性检查、研究方法清理）提交为后台任务后立即返回任务ID：
+- 任务记录持久化在 background_jobs 表，GET /api/jobs/{id} 查询状态、进度和结果
+- 独立线程上的事件循环持有asyncio队列，JOB_WORKERS个消费协程把任务交给同样大小的线程池执行
+- 取消：排队中的任务直接标记为已取消；执行中的任务在下一次报告进度时停止（协作式取消，已提交的数据保留）
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..models.database import BackgroundJob, SessionLocal, write_engine
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+ACTIVE_STATUSES = (JOB_PENDING, JOB_RUNNING)
+
+# 任务函数：第一个参数为JobContext，返回值（可JSON序列化）作为任务结果保存
+JobFunction = Callable[..., Any]
+QueueItem = Tuple[str, str, JobFunction, tuple, Optional[Callable[[], None]]]
+
+
+class JobCancelled(Exception):
+    """任务在执行过程中被取消"""
+
+
+def _update_job(job_id: str, *conditions, **values) -> bool:
+    """更新任务记录，conditions不满足时不更新；返回是否更新成功"""
+    with write_engine.begin() as conn:
+        statement = update(BackgroundJob).where(BackgroundJob.id == job_id, *conditions).values(**values)
+        return conn.execute(statement).rowcount > 0
+
+
+class JobContext:
+    """传给任务函数的上下文：数据库会话、进度报告和取消检查"""
+
+    # 进度写库的最小间隔（秒）
+    REPORT_INTERVAL = 0.5
+
+    def __init__(self, job_id: str, kind: str, cancel_event: threading.Event):
+        self.job_id = job_id
+        self.kind = kind
+        self._cancel_event = cancel_event
+        self._db: Optional[Session] = None
+        self._last_report = 0.0
+
+    @property
+    def db(self) -> Session:
+        """任务专用的写会话（任务结束后关闭）"""
+        if self._db is None:
+            self._db = SessionLocal()
+        return self._db
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def report(self, progress: float, message: Optional[str] = None, force: bool = False):
+        """
+        报告进度（按REPORT_INTERVAL节流写库）
+
+        Raises:
+            JobCancelled: 已请求取消
+        """
+        self.check_cancelled()
+        now = time.monotonic()
+        if not force and now - self._last_report < self.REPORT_INTERVAL:
+            return
+        self._last_report = now
+        _update_job(self.job_id, progress=min(max(progress, 0.0), 1.0), message=message)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class JobQueue:
+    """后台任务队列：事件循环线程 + 有界线程池"""
+
+    def __init__(self, workers: int = 2, retention_days: int = 7):
+        """
+        Args:
+            workers: 同时执行的任务数
+            retention_days: 已结束任务的保留天数（启动时清理）
+        """
+        self.workers = max(1, workers)
+        self.retention_days = retention_days
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopping = False
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._futures: Set[Future] = set()
+
+    # ===== 对外接口 =====
+
+    async def submit(self, kind: str, function: JobFunction, *args,
+                     cleanup: Optional[Callable[[], None]] = None) -> str:
+        """
+        提交任务并立即返回任务ID（任务记录的写入放到线程池，不阻塞事件循环）
+
+        Args:
+            cleanup: 任务出队后必定调用一次（包括排队时已取消、未实际执行的情况），用于删除临时文件等
+        """
+        return await run_in_threadpool(functools.partial(self.enqueue, kind, function, *args, cleanup=cleanup))
+
+    def enqueue(self, kind: str, function: JobFunction, *args,
+                cleanup: Optional[Callable[[], None]] = None) -> str:
+        """同步版本的submit：写入任务记录后放入队列"""
+        self.start()
+        job_id = uuid.uuid4().hex
+        with write_engine.begin() as conn:
+            conn.execute(insert(BackgroundJob).values(
+                id=job_id, kind=kind, status=JOB_PENDING, progress=0,
+                cancel_requested=False, created_at=datetime.utcnow(),
+            ))
+        self._cancel_events[job_id] = threading.Event()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (job_id, kind, function, args, cleanup))
+        logger.info(f"后台任务已提交: {kind} {job_id}")
+        return job_id
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        请求取消任务
+
+        Returns:
+            取消请求后的任务状态；任务不存在时返回None
+        """
+        # 排队中的任务直接结束；执行线程开始前会以 status == pending 为条件抢占，二者只有一个成功
+        if _update_job(job_id, BackgroundJob.status == JOB_PENDING,
+                       status=JOB_CANCELLED, cancel_requested=True, finished_at=datetime.utcnow(),
+                       message="任务已取消"):
+            return JOB_CANCELLED
+        if _update_job(job_id, BackgroundJob.status == JOB_RUNNING, cancel_requested=True):
+            event = self._cancel_events.get(job_id)
+            if event is not None:
+                event.set()
+            return JOB_RUNNING
+        with write_engine.connect() as conn:
+            return conn.execute(select(BackgroundJob.status).where(BackgroundJob.id == job_id)).scalar()
+
+    def reattach(self, context: JobContext):
+        """
+        数据库内容被整体替换为备份（恢复备份）后重新登记任务记录
+
+        恢复后的数据库中可能没有任务表、没有当前任务，或带有备份时刻仍在执行的任务：
+        补建任务表，把不属于本进程的未完成任务标记为失败，并写回当前任务
+        """
+        now = datetime.utcnow()
+        BackgroundJob.__table__.create(write_engine, checkfirst=True)
+        with write_engine.begin() as conn:
+            conn.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.status.in_(ACTIVE_STATUSES),
+                       BackgroundJob.id.not_in(list(self._cancel_events)))
+                .values(status=JOB_FAILED, finished_at=now, error="数据库已恢复到备份，任务记录失效")
+            )
+            conn.execute(
+                sqlite_insert(BackgroundJob)
+                .values(id=context.job_id, kind=context.kind, status=JOB_RUNNING, progress=0,
+                        cancel_requested=False, created_at=now, started_at=now)
+                .on_conflict_do_update(index_elements=[BackgroundJob.id], set_={"status": JOB_RUNNING})
+            )
+
+    def start(self):
+        """启动事件循环线程（幂等）；首次启动时处理上次进程遗留的任务"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._recover()
+            self._stopping = False
+            self._ready.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+            self._thread = threading.Thread(target=self._run_loop, name="job-queue", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+
+    def shutdown(self, timeout: float = 5.0):
+        """停止接收任务，通知执行中的任务取消；排队中的任务在下次启动时标记为失败"""
+        if not (self._thread and self._thread.is_alive()):
+            return
+        self._stopping = True
+        for event in list(self._cancel_events.values()):
+            event.set()
+        for _ in range(self.workers):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        self._thread.join(timeout)
+        # 线程池中尚未开始执行的任务不再执行（shutdown的cancel_futures参数需要Python 3.9）
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=False)
+        self._thread = None
+
+    # ===== 事件循环线程 =====
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(
+                asyncio.gather(*(self._consume() for _ in range(self.workers)))
+            )
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            future = self._executor.submit(self._execute, *item)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+            try:
+                await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                return  # 关闭时取消
+            except Exception as e:  # 兜底，保证消费协程不会退出
+                logger.error(f"后台任务执行异常: {e}")
+
+    def _execute(self, job_id: str, kind: str, function: JobFunction, args: tuple,
+                 cleanup: Optional[Callable[[], None]]):
+        cancel_event = self._cancel_events.get(job_id) or threading.Event()
+        try:
+            if self._stopping:
+                return
+            if not _update_job(job_id, BackgroundJob.status == JOB_PENDING,
+                               status=JOB_RUNNING, started_at=datetime.utcnow()):
+                return  # 已在排队时取消
+
+            context = JobContext(job_id, kind, cancel_event)
+            try:
+                result = function(context, *args)
+                _update_job(job_id, status=JOB_SUCCEEDED, progress=1.0, finished_at=datetime.utcnow(),
+                            result=json.dumps(result, ensure_ascii=False, default=str))
+            except JobCancelled:
+                context.db.rollback()
+                _update_job(job_id, status=JOB_CANCELLED, finished_at=datetime.utcnow(), message="任务已取消")
+            except Exception as e:
+                context.db.rollback()
+                # HTTPException的str为空，优先取detail
+                error = getattr(e, "detail", None) or str(e) or type(e).__name__
+                logger.error(f"后台任务失败: {job_id}: {error}")
+                _update_job(job_id, status=JOB_FAILED, finished_at=datetime.utcnow(),
+                            error=error if isinstance(error, str) else json.dumps(error, ensure_ascii=False, default=str))
+            finally:
+                context.close()
+        finally:
+            self._cancel_events.pop(job_id, None)
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except Exception as e:
+                    logger.warning(f"后台任务清理失败: {job_id}: {e}")
+
+    def _recover(self):
+        """上次进程未完成的任务无法恢复执行，标记为失败；清理过期的已结束任务"""
+        now = datetime.utcnow()
+        with write_engine.begin() as conn:
+            interrupted = conn.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.status.in_(ACTIVE_STATUSES))
+                .values(status=JOB_FAILED, finished_at=now, error="服务重启，任务中断")
+            ).rowcount
+            conn.execute(
+                delete(BackgroundJob).where(
+                    BackgroundJob.status.not_in(ACTIVE_STATUSES),
+                    BackgroundJob.finished_at < now - timedelta(days=self.retention_days),
+                )
+            )
+        if interrupted:
+            logger.warning(f"{interrupted} 个后台任务因服务重启中断")
+
+
+# 全局后台任务队列实例
+job_queue = JobQueue(workers=settings.JOB_WORKERS, retention_days=settings.JOB_RETENTION_DAYS)
@@ -0,0 +1,222 @@
+"""
+进程内期刊目录索引
+期刊选择器的自动补全和标签筛选直接在内存中完成，不再每次查询SQLite：
+- 按casefold排序的名称、单词和拼音/单词首字母，二分查找前缀
+- 每个标签一个位图（Python int，第i位对应排序后的第i个期刊），AND/OR/NOT筛选和分面计数都是位运算
+期刊、标签或期刊标签关联表有写入提交后目录失效，下次查询时重建
+"""
+
+import bisect
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models.database import Journal, ReadSessionLocal, Tag, journal_tags
+from app.utils.snapshot_cache import SnapshotCache
+from app.utils.string_helpers import name_initials
+
+logger = logging.getLogger(__name__)
+
+# 修改目录数据的语句（journal_issues、journal_stats、journals_fts 等不匹配）
+CATALOG_WRITE_PATTERN = re.compile(
+    r"^\s*(INSERT|UPDATE|DELETE|REPLACE)\b.*?\b(journals|journal_tags|tags)\b", re.I | re.S
+)
+
+
+def _prefix_range(keys: List[Tuple[str, int]], prefix: str) -> Iterable[Tuple[str, int]]:
+    """有序 (key, position) 列表中以prefix开头的连续区间"""
+    start = bisect.bisect_left(keys, (prefix, -1))
+    for index in range(start, len(keys)):
+        if not keys[index][0].startswith(prefix):
+            break
+        yield keys[index]
+
+
+def _bit_count(mask: int) -> int:
+    """置位数（int.bit_count需要Python 3.10）"""
+    return bin(mask).count("1")
+
+
+def _iter_bits(mask: int) -> Iterable[int]:
+    """按从低到高的顺序返回位图中为1的位置"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """某一时刻的目录（构建后只读，查询无需加锁）"""
+    journals: List[Tuple[int, str]]  # (id, name)，按casefold名称排序
+    journal_tag_ids: List[Tuple[int, ...]]
+    names: List[Tuple[str, int]]
+    tokens: List[Tuple[str, int]]
+    initials: List[Tuple[str, int]]
+    tags: Dict[int, Dict[str, Any]]
+    tag_masks: Dict[int, int]
+    all_mask: int
+    built_at: float = field(default_factory=time.time)
+
+    def prefix_masks(self, prefix: str) -> Tuple[int, int]:
+        """
+        前缀匹配的位图
+
+        Returns:
+            (名称前缀命中, 单词前缀或首字母命中)
+        """
+        name_mask = 0
+        for _, position in _prefix_range(self.names, prefix):
+            name_mask |= 1 << position
+        other_mask = 0
+        for _, position in _prefix_range(self.tokens, prefix):
+            other_mask |= 1 << position
+        compact = prefix.replace(" ", "")
+        if compact.isalnum():
+            for _, position in _prefix_range(self.initials, compact):
+                other_mask |= 1 << position
+        return name_mask, other_mask & ~name_mask
+
+    def tag_union(self, tag_ids: Iterable[int]) -> int:
+        mask = 0
+        for tag_id in tag_ids:
+            mask |= self.tag_masks.get(tag_id, 0)
+        return mask
+
+
+class JournalCatalog:
+    """期刊目录：失效后在下一次查询时惰性重建"""
+
+    def __init__(self):
+        self._cache: SnapshotCache[CatalogSnapshot] = SnapshotCache(self._build, CATALOG_WRITE_PATTERN)
+
+    @property
+    def rebuild_count(self) -> int:
+        return self._cache.rebuild_count
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def snapshot(self) -> CatalogSnapshot:
+        return self._cache.get()
+
+    def _build(self) -> CatalogSnapshot:
+        start = time.perf_counter()
+        db = ReadSessionLocal()
+        try:
+            journal_rows = db.execute(select(Journal.id, Journal.name)).all()
+            tag_rows = db.execute(select(Tag.id, Tag.name, Tag.color)).all()
+            link_rows = db.execute(select(journal_tags.c.journal_id, journal_tags.c.tag_id)).all()
+        finally:
+            db.close()
+
+        journals = sorted(((row.id, row.name) for row in journal_rows), key=lambda j: (j[1].casefold(), j[0]))
+        positions = {journal_id: position for position, (journal_id, _) in enumerate(journals)}
+
+        names, tokens, initials = [], [], []
+        for position, (_, name) in enumerate(journals):
+            key = " ".join(name.split()).casefold()
+            names.append((key, position))
+            # 从第2个单词开始的各个后缀（第一个单词开头即名称前缀），支持多词前缀如 "management sci"
+            words = key.split()
+            tokens.extend((" ".join(words[i:]), position) for i in range(1, len(words)))
+            abbreviation = name_initials(name)
+            if abbreviation:
+                initials.append((abbreviation, position))
+        tokens.sort()
+        initials.sort()
+
+        tag_masks: Dict[int, int] = {row.id: 0 for row in tag_rows}
+        journal_tag_ids: List[List[int]] = [[] for _ in journals]
+        for journal_id, tag_id in link_rows:
+            position = positions.get(journal_id)
+            if position is None or tag_id not in tag_masks:
+                continue
+            tag_masks[tag_id] |= 1 << position
+            journal_tag_ids[position].append(tag_id)
+
+        snapshot = CatalogSnapshot(
+            journals=journals,
+            journal_tag_ids=[tuple(sorted(ids)) for ids in journal_tag_ids],
+            names=names,
+            tokens=tokens,
+            initials=initials,
+            tags={row.id: {"id": row.id, "name": row.name, "color": row.color} for row in tag_rows},
+            tag_masks=tag_masks,
+            all_mask=(1 << len(journals)) - 1,
+        )
+        logger.info(f"期刊目录已重建: {len(journals)} 个期刊, {len(tag_rows)} 个标签, "
+                    f"耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        return snapshot
+
+    def query(
+        self,
+        q: Optional[str] = None,
+        tags_all: Iterable[int] = (),
+        tags_any: Iterable[int] = (),
+        tags_none: Iterable[int] = (),
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        自动补全 + 标签筛选
+
+        Args:
+            q: 前缀（匹配名称开头、名称中任一单词开头、拼音/单词首字母），大小写不敏感
+            tags_all: 必须包含全部这些标签（AND）
+            tags_any: 至少包含其中一个标签（OR）
+            tags_none: 不能包含这些标签（NOT）
+            limit / offset: 分页
+
+        Returns:
+            items（名称前缀命中的排在前面，其余按名称排序）、total、各标签在结果中的分面计数
+        """
+        snapshot = self.snapshot()
+        mask = snapshot.all_mask
+        for tag_id in tags_all:
+            mask &= snapshot.tag_masks.get(tag_id, 0)
+        tags_any = list(tags_any)
+        if tags_any:
+            mask &= snapshot.tag_union(tags_any)
+        mask &= ~snapshot.tag_union(tags_none)
+
+        ordered_masks = [mask]
+        key = " ".join((q or "").split()).casefold()
+        if key:
+            name_mask, other_mask = snapshot.prefix_masks(key)
+            ordered_masks = [mask & name_mask, mask & other_mask]
+            mask = ordered_masks[0] | ordered_masks[1]
+
+        items = []
+        skipped = 0
+        for part in ordered_masks:
+            for position in _iter_bits(part):
+                if len(items) >= limit:
+                    break
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                journal_id, name = snapshot.journals[position]
+                items.append({"id": journal_id, "name": name, "tag_ids": list(snapshot.journal_tag_ids[position])})
+
+        facets = [
+            {**snapshot.tags[tag_id], "count": _bit_count(mask & tag_mask)}
+            for tag_id, tag_mask in snapshot.tag_masks.items()
+        ]
+        facets.sort(key=lambda facet: (-facet["count"], facet["name"]))
+
+        return {
+            "items": items,
+            "total": _bit_count(mask),
+            "facets": facets,
+            "built_at": snapshot.built_at,
+        }
+
+
+# 全局期刊目录实例
+journal_catalog = JournalCatalog()
+
@@ -0,0 +1,307 @@
+"""
+期刊近似重复检测与合并
+to_title_case 只能消除大小写差异，"J. of X" 与 "Journal of X" 这类缩写/标点变体需要近似匹配：
+- 名称规范化（展开常见缩写、去掉标点和虚词）后取字符trigram集合
+- MinHash + LSH分桶作为blocking索引，只比较落入同一个桶的候选对，整体接近线性
+- 候选对按trigram Jaccard相似度验证，并查集合并为重复簇
+合并在一个事务中把引用、浏览记录、网络首发追踪和标签迁移到保留的期刊后删除其余期刊
+"""
+
+import json
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, exists, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models.database import (
+    AuditLog, Journal, JournalIssue, JournalOnlineFirstTracking, JournalStats, journal_tags
+)
+from app.utils.journal_helper import JOURNAL_REFERENCE_FIELDS, JOURNAL_REFERENCE_MODELS
+
+# 期刊名称中常见的缩写（ISO 4 等）
+ABBREVIATIONS = {
+    "j": "journal", "jnl": "journal", "int": "international", "intl": "international",
+    "rev": "review", "res": "research", "sci": "science", "manag": "management",
+    "manage": "management", "mgmt": "management", "econ": "economics", "acad": "academy",
+    "trans": "transactions", "proc": "proceedings", "q": "quarterly", "am": "american",
+    "ann": "annals", "bull": "bulletin", "lett": "letters", "eur": "european",
+    "inf": "information", "syst": "systems", "oper": "operations", "stud": "studies",
+    "adm": "administrative", "assoc": "association", "technol": "technology",
+    "eng": "engineering", "psychol": "psychology", "strateg": "strategic",
+    "organ": "organization", "mark": "marketing", "mkt": "marketing",
+    "financ": "financial", "account": "accounting", "comput": "computer",
+    "natl": "national", "appl": "applied", "med": "medicine",
+}
+STOP_WORDS = {"of", "the", "and", "for", "in", "on", "a", "an"}
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[\u4e00-\u9fff]")
+
+NUM_PERMUTATIONS = 32
+BAND_ROWS = 2  # 16个band×2行，Jaccard约0.25以上的对大概率成为候选
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# 超大桶通常来自极短的名称，只比较桶内前若干个，避免退化为两两比较
+MAX_BUCKET_SIZE = 200
+
+# 固定种子的哈希参数（a, b），保证多次运行结果一致
+_PERMUTATIONS = [
+    (
+        (zlib.crc32(f"a{i}".encode()) * 2654435761 + 1) % MERSENNE_PRIME or 1,
+        zlib.crc32(f"b{i}".encode()) * 40503 % MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_journal_title(name: str) -> str:
+    """
+    近似匹配用的规范化名称：casefold、展开缩写、去掉标点和虚词，中文逐字保留
+
+    Examples:
+        "J. of Management Sci." -> "journal management science"
+        "Journal of Management Science" -> "journal management science"
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall((name or "").casefold().replace("&", " and ")):
+        token = ABBREVIATIONS.get(token, token)
+        if token not in STOP_WORDS:
+            tokens.append(token)
+    return " ".join(tokens)
+
+
+def trigram_set(normalized: str) -> FrozenSet[str]:
+    """去掉空格后的字符trigram集合（不足3个字符时用整个字符串）"""
+    compact = normalized.replace(" ", "")
+    if len(compact) < 3:
+        return frozenset([compact]) if compact else frozenset()
+    return frozenset(compact[i:i + 3] for i in range(len(compact) - 2))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(shingles: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME & MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def candidate_pairs(shingle_sets: Dict[int, FrozenSet[str]]) -> set:
+    """MinHash LSH分桶：同一个band签名相同的期刊成为候选对"""
+    buckets: Dict[Tuple, List[int]] = defaultdict(list)
+    for journal_id, shingles in shingle_sets.items():
+        if not shingles:
+            continue
+        signature = minhash_signature(shingles)
+        for band in range(NUM_PERMUTATIONS // BAND_ROWS):
+            key = (band,) + signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+            buckets[key].append(journal_id)
+
+    pairs = set()
+    for members in buckets.values():
+        if len(members) > 1:
+            pairs.update(combinations(sorted(members[:MAX_BUCKET_SIZE]), 2))
+    return pairs
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def find_duplicate_journals(db: Session, threshold: float = 0.6, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    查找近似重复的期刊簇
+
+    Args:
+        db: 数据库会话
+        threshold: trigram Jaccard相似度阈值（0-1）
+        limit: 最多返回的簇数量
+
+    Returns:
+        clusters（按最高相似度倒序），每个簇给出建议保留的期刊（引用和浏览记录最多者）和各成员与其的相似度
+    """
+    rows = db.execute(
+        select(Journal.id, Journal.name, JournalStats.reference_count, JournalStats.target_count, JournalStats.issues_count)
+        .outerjoin(JournalStats, JournalStats.journal_id == Journal.id)
+    ).all()
+    journals = {row.id: row for row in rows}
+    shingle_sets = {row.id: trigram_set(normalize_journal_title(row.name)) for row in rows}
+
+    pairs = candidate_pairs(shingle_sets)
+    union_find = _UnionFind()
+    edges: Dict[Tuple[int, int], float] = {}
+    for a, b in pairs:
+        score = jaccard(shingle_sets[a], shingle_sets[b])
+        if score >= threshold:
+            edges[(a, b)] = score
+            union_find.union(a, b)
+
+    members_by_root: Dict[int, List[int]] = defaultdict(list)
+    for journal_id in {x for pair in edges for x in pair}:
+        members_by_root[union_find.find(journal_id)].append(journal_id)
+    scores_by_root: Dict[int, List[float]] = defaultdict(list)
+    for (a, _), score in edges.items():
+        scores_by_root[union_find.find(a)].append(score)
+
+    def usage(journal_id: int) -> int:
+        row = journals[journal_id]
+        return (row.reference_count or 0) + (row.target_count or 0) + (row.issues_count or 0)
+
+    clusters = []
+    for root, members in members_by_root.items():
+        # 建议保留：使用最多的；相同时保留名称更长（通常是未缩写的全称）、ID更小的
+        keep = max(members, key=lambda j: (usage(j), len(journals[j].name), -j))
+        cluster_edges = scores_by_root[root]
+        clusters.append({
+            "suggested_target_id": keep,
+            "max_score": round(max(cluster_edges), 4),
+            "min_score": round(min(cluster_edges), 4),
+            "journals": sorted(
+                (
+                    {
+                        "id": j,
+                        "name": journals[j].name,
+                        "usage_count": usage(j),
+                        "score": 1.0 if j == keep else round(jaccard(shingle_sets[j], shingle_sets[keep]), 4),
+                    }
+                    for j in members
+                ),
+                key=lambda item: (-item["score"], item["id"]),
+            ),
+        })
+
+    clusters.sort(key=lambda c: (-c["max_score"], c["suggested_target_id"]))
+    total = len(clusters)
+    if limit is not None:
+        clusters = clusters[:limit]
+    return {
+        "threshold": threshold,
+        "journal_count": len(rows),
+        "candidate_pairs": len(pairs),
+        "cluster_count": total,
+        "clusters": clusters,
+    }
+
+
+def _dedupe_child_rows(db: Session, model, key_columns: Sequence[str], target_id: int, source_ids: List[int]) -> int:
+    """
+    删除迁移后会与唯一键冲突的来源行：目标期刊已有相同键，或其他来源期刊中有更早的同键记录
+    """
+    other = aliased(model)
+    same_key = and_(*(getattr(other, column) == getattr(model, column) for column in key_columns))
+    conflict = exists().where(
+        same_key,
+        (other.journal_id == target_id) | (other.journal_id.in_(source_ids) & (other.id < model.id)),
+    )
+    result = db.execute(
+        model.__table__.delete().where(model.journal_id.in_(source_ids), conflict)
+    )
+    return result.rowcount or 0
+
+
+def merge_journals(db: Session, target_id: int, source_ids: Sequence[int], ip_address: Optional[str] = None) -> Dict[str, Any]:
+    """
+    把来源期刊合并到目标期刊（不提交事务，由调用方提交或回滚）
+
+    - Idea/ResearchProject 的参考/投稿期刊外键指向目标期刊，期刊文本改为目标期刊名称
+    - 浏览记录（同卷期）和网络首发追踪（同日期）去重后迁移
+    - 标签合并到目标期刊
+    - 删除来源期刊，每个来源期刊写一条 MERGE 审计记录
+
+    Raises:
+        ValueError: 期刊不存在或参数无效
+    """
+    source_ids = sorted(set(source_ids) - {target_id})
+    if not source_ids:
+        raise ValueError("没有需要合并的来源期刊")
+
+    journals = {j.id: j for j in db.query(Journal).filter(Journal.id.in_([target_id] + source_ids)).all()}
+    if target_id not in journals:
+        raise ValueError(f"目标期刊ID {target_id} 不存在")
+    missing = [j for j in source_ids if j not in journals]
+    if missing:
+        raise ValueError(f"来源期刊不存在: {missing}")
+    target = journals[target_id]
+
+    summary: Dict[str, Any] = {"target_id": target_id, "target_name": target.name, "merged_ids": source_ids}
+
+    # 引用：外键和文本一起改写（journal_stats 计数由触发器随外键变化维护）
+    references_updated = 0
+    for model in JOURNAL_REFERENCE_MODELS:
+        for text_field, id_field in JOURNAL_REFERENCE_FIELDS:
+            result = db.execute(
+                update(model)
+                .where(getattr(model, id_field).in_(source_ids))
+                .values({id_field: target_id, text_field: target.name})
+                .execution_options(synchronize_session=False)
+            )
+            references_updated += result.rowcount or 0
+    summary["references_updated"] = references_updated
+
+    # 浏览记录和网络首发追踪：先删除会冲突的重复行，再整体迁移
+    for key, model, key_columns in (
+        ("issues", JournalIssue, ("volume", "issue")),
+        ("tracking", JournalOnlineFirstTracking, ("tracked_date",)),
+    ):
+        duplicates = _dedupe_child_rows(db, model, key_columns, target_id, source_ids)
+        moved = db.execute(
+            update(model)
+            .where(model.journal_id.in_(source_ids))
+            .values(journal_id=target_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount or 0
+        summary[f"{key}_moved"] = moved
+        summary[f"{key}_duplicates_removed"] = duplicates
+
+    # 标签：并入目标期刊（已有的关联忽略）
+    db.execute(
+        insert(journal_tags)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["journal_id", "tag_id", "created_at"],
+            select(target_id, journal_tags.c.tag_id, journal_tags.c.created_at)
+            .where(journal_tags.c.journal_id.in_(source_ids)),
+        )
+    )
+
+    # 备注：来源期刊的备注追加到目标期刊
+    extra_notes = [journals[j].notes for j in source_ids if journals[j].notes and journals[j].notes not in (target.notes or "")]
+    if extra_notes:
+        target.notes = "\n".join([target.notes] + extra_notes if target.notes else extra_notes)
+
+    for journal_id in source_ids:
+        source = journals[journal_id]
+        db.add(AuditLog(
+            table_name="journals",
+            record_id=journal_id,
+            action="MERGE",
+            ip_address=ip_address,
+            old_values=json.dumps({"name": source.name, "notes": source.notes}, ensure_ascii=False),
+            new_values=json.dumps({"merged_into": target_id, "name": target.name}, ensure_ascii=False),
+            changes=json.dumps(summary, ensure_ascii=False),
+        ))
+        db.delete(source)
+
+    db.flush()
+    return summary
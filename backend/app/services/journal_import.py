@@ -0,0 +1,284 @@
+"""
+期刊批量导入服务
+按块处理：名称统一格式化一次 → 一次IN查询去重 → INSERT ... ON CONFLICT DO NOTHING 批量写入，
+每块一个事务；上传的CSV / NDJSON按行流式解析，内存中只保留当前块
+"""
+
+import codecs
+import csv
+import json
+import logging
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.database import Journal, Tag, journal_tags
+from app.models.schemas import JournalCreate
+from app.utils.journal_helper import relink_journal_references
+from app.utils.string_helpers import to_title_case
+
+logger = logging.getLogger(__name__)
+
+# CSV表头别名（与合作者Excel导入的列映射方式一致）
+CSV_COLUMN_MAPPING = {
+    "name": ["name", "Name", "期刊名称", "期刊", "名称"],
+    "notes": ["notes", "Notes", "备注"],
+    "tag_ids": ["tag_ids", "标签ID"],
+}
+TAG_ID_SEPARATOR = re.compile(r"[,;|\s]+")
+
+
+class ImportRecord:
+    """待导入的一行：line为来源行号（JSON请求体中为序号）"""
+    __slots__ = ("line", "data", "error")
+
+    def __init__(self, line: int, data: Optional[JournalCreate] = None, error: Optional[str] = None):
+        self.line = line
+        self.data = data
+        self.error = error
+
+
+class JournalImportResult:
+    """导入结果汇总，progress为每块的处理情况"""
+
+    def __init__(self):
+        self.imported_count = 0
+        self.skipped_journals: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.progress: List[Dict[str, Any]] = []
+
+    @property
+    def processed_count(self) -> int:
+        return sum(chunk["rows"] for chunk in self.progress)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "message": f"成功导入 {self.imported_count} 个期刊",
+            "imported_count": self.imported_count,
+            "skipped_count": len(self.skipped_journals),
+            "error_count": len(self.errors),
+            "processed_count": self.processed_count,
+            "skipped_journals": self.skipped_journals,
+            "errors": self.errors,
+            "chunks": self.progress,
+        }
+
+
+def import_journal_chunk(db: Session, records: List[ImportRecord], result: JournalImportResult) -> Dict[str, Any]:
+    """
+    导入一块记录并提交事务
+
+    Returns:
+        本块的进度信息
+    """
+    start = time.perf_counter()
+    imported_before = result.imported_count
+    skipped_before = len(result.skipped_journals)
+    errors_before = len(result.errors)
+
+    # 名称只格式化一次；块内重复的名称保留第一条
+    pending: Dict[str, ImportRecord] = {}
+    for record in records:
+        if record.error:
+            result.errors.append({"line": record.line, "name": None, "error": record.error})
+            continue
+        name = to_title_case(record.data.name.strip())
+        if not name:
+            result.errors.append({"line": record.line, "name": record.data.name, "error": "期刊名称不能为空"})
+        elif name in pending:
+            result.skipped_journals.append({"line": record.line, "name": record.data.name, "reason": "导入数据中名称重复"})
+        else:
+            pending[name] = record
+
+    try:
+        # 一次IN查询找出已存在的期刊
+        existing = set(db.execute(select(Journal.name).where(Journal.name.in_(list(pending)))).scalars()) if pending else set()
+        for name in existing:
+            record = pending.pop(name)
+            result.skipped_journals.append({"line": record.line, "name": record.data.name, "reason": "期刊名称已存在"})
+
+        inserted: Dict[str, int] = {}
+        if pending:
+            # 并发导入时IN查询之后可能出现同名期刊，由ON CONFLICT兜底跳过
+            statement = (
+                sqlite_insert(Journal)
+                .on_conflict_do_nothing(index_elements=[Journal.name])
+                .returning(Journal.id, Journal.name)
+            )
+            rows = db.execute(
+                statement,
+                [{"name": name, "notes": record.data.notes} for name, record in pending.items()],
+            ).all()
+            inserted = {name: journal_id for journal_id, name in rows}
+            for name, record in pending.items():
+                if name not in inserted:
+                    result.skipped_journals.append({"line": record.line, "name": record.data.name, "reason": "期刊名称已存在"})
+
+            _insert_journal_tags(db, pending, inserted, result)
+            relink_journal_references(db, list(inserted.values()))
+
+        db.commit()
+        result.imported_count += len(inserted)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"期刊导入块写入失败: {e}")
+        for name, record in pending.items():
+            result.errors.append({"line": record.line, "name": record.data.name, "error": str(e)})
+
+    chunk = {
+        "chunk": len(result.progress) + 1,
+        "rows": len(records),
+        "imported": result.imported_count - imported_before,
+        "skipped": len(result.skipped_journals) - skipped_before,
+        "errors": len(result.errors) - errors_before,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    result.progress.append(chunk)
+    logger.info(f"期刊导入进度: 第{chunk['chunk']}块 {chunk['rows']}行，导入{chunk['imported']}，"
+                f"跳过{chunk['skipped']}，错误{chunk['errors']}")
+    return chunk
+
+
+def _insert_journal_tags(db: Session, pending: Dict[str, ImportRecord], inserted: Dict[str, int],
+                         result: JournalImportResult):
+    """新导入期刊的标签关联（一次IN查询校验标签，一次批量插入）"""
+    requested = {name: record.data.tag_ids for name, record in pending.items() if name in inserted and record.data.tag_ids}
+    if not requested:
+        return
+
+    all_tag_ids = {tag_id for tag_ids in requested.values() for tag_id in tag_ids}
+    valid_tag_ids = set(db.execute(select(Tag.id).where(Tag.id.in_(all_tag_ids))).scalars())
+
+    links = []
+    for name, tag_ids in requested.items():
+        invalid = sorted(set(tag_ids) - valid_tag_ids)
+        if invalid:
+            record = pending[name]
+            result.errors.append({"line": record.line, "name": record.data.name, "error": f"标签不存在，已忽略: {invalid}"})
+        links.extend({"journal_id": inserted[name], "tag_id": tag_id} for tag_id in set(tag_ids) & valid_tag_ids)
+    if links:
+        db.execute(sqlite_insert(journal_tags).on_conflict_do_nothing(), links)
+
+
+def import_journals(db: Session, journals: Sequence[JournalCreate], chunk_size: int,
+                    progress: Optional[Callable[[float, str], None]] = None) -> JournalImportResult:
+    """
+    导入已解析的期刊列表（JSON请求体）
+
+    Args:
+        progress: 每块提交后的回调 (进度0~1, 说明)
+    """
+    result = JournalImportResult()
+    chunk: List[ImportRecord] = []
+    for line, data in enumerate(journals, start=1):
+        chunk.append(ImportRecord(line, data))
+        if len(chunk) >= chunk_size:
+            import_journal_chunk(db, chunk, result)
+            chunk = []
+            if progress:
+                progress(line / len(journals), f"已处理 {line}/{len(journals)} 条")
+    if chunk:
+        import_journal_chunk(db, chunk, result)
+    return result
+
+
+# ===== 上传内容的流式解析 =====
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """按行解码字节流（UTF-8，兼容BOM）"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for data in chunks:
+        buffer += decoder.decode(data)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+def _parse_tag_ids(value: Any) -> List[int]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return value
+    return [int(part) for part in TAG_ID_SEPARATOR.split(str(value).strip()) if part]
+
+
+def _build_record(line: int, values: Dict[str, Any]) -> ImportRecord:
+    try:
+        values = dict(values)
+        values["tag_ids"] = _parse_tag_ids(values.get("tag_ids"))
+        return ImportRecord(line, JournalCreate(**values))
+    except (ValidationError, ValueError, TypeError) as e:
+        return ImportRecord(line, error=f"数据格式错误: {e}")
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ImportRecord]:
+    """NDJSON：每行一个JSON对象 {"name": ..., "notes": ..., "tag_ids": [...]}"""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError as e:
+            yield ImportRecord(line_number, error=f"JSON解析失败: {e}")
+            continue
+        if not isinstance(values, dict):
+            yield ImportRecord(line_number, error="每行必须是JSON对象")
+            continue
+        yield _build_record(line_number, values)
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ImportRecord]:
+    """
+    CSV：首行为表头（name/期刊名称 必填，notes/备注、tag_ids/标签ID 可选）
+
+    引号内的换行会使一条记录跨多行，按引号是否成对把物理行拼接成完整记录
+    """
+    header: Optional[Dict[str, int]] = None
+    record_lines: List[str] = []
+    start_line = line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not record_lines:
+            start_line = line_number
+        record_lines.append(line)
+        text = "\n".join(record_lines)
+        if text.count('"') % 2:
+            continue
+        record_lines = []
+        if not text.strip():
+            continue
+
+        row = next(csv.reader([text]))
+        if header is None:
+            header = _map_csv_header(row)
+            continue
+        values = {field: row[index].strip() for field, index in header.items() if index < len(row)}
+        values = {field: value for field, value in values.items() if value != "" or field == "name"}
+        yield _build_record(start_line, values)
+
+    if record_lines:
+        yield ImportRecord(start_line, error="CSV引号未闭合")
+
+
+def _map_csv_header(row: List[str]) -> Dict[str, int]:
+    columns = [cell.strip() for cell in row]
+    header = {}
+    for field, aliases in CSV_COLUMN_MAPPING.items():
+        for index, column in enumerate(columns):
+            if column in aliases:
+                header[field] = index
+                break
+    if "name" not in header:
+        raise ValueError(f"CSV缺少期刊名称列（可用列名: {', '.join(CSV_COLUMN_MAPPING['name'])}）")
+    return header
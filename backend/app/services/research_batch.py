@@ -0,0 +1,140 @@
+"""
+研究项目批量更新服务
+同一事务内：一次查询读取旧值 → 按修改的字段集合分组，每组一条UPDATE（各项目取值不同时用 CASE id）→
+审计日志一条多行INSERT（研究方法使用次数由触发器维护）
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from app.models.database import ResearchProject
+from app.models.schemas import ResearchProjectBatchItem
+from app.services.audit import AuditService
+from app.utils.journal_helper import resolve_journal_id
+
+logger = logging.getLogger(__name__)
+
+# 可以显式置空的字段；其余字段传null视为不修改
+NULLABLE_FIELDS = {"expected_completion", "target_journal", "reference_journal"}
+# 期刊名称文本 -> 同时写入的期刊外键（Core UPDATE不经过ORM的before_flush解析）
+JOURNAL_FIELDS = {"target_journal": "target_journal_id", "reference_journal": "reference_journal_id"}
+AUDITED_FIELDS = (
+    "status", "progress", "is_todo", "my_role", "research_method",
+    "start_date", "expected_completion", "target_journal", "reference_journal",
+)
+
+
+class BatchRejected(Exception):
+    """atomic模式下存在失败项，未做任何修改"""
+
+    def __init__(self, results: List[Dict[str, Any]]):
+        super().__init__("存在失败项，未做任何修改")
+        self.results = results
+
+
+def _item_changes(item: ResearchProjectBatchItem) -> Dict[str, Any]:
+    values = {}
+    for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+        if value is None and field not in NULLABLE_FIELDS:
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        if field in JOURNAL_FIELDS and isinstance(value, str):
+            value = value.strip() or None
+        values[field] = value
+    return values
+
+
+def _column_value(ids: List[int], values: List[Any]):
+    """一组项目的同一字段：取值都相同时直接赋值，否则按id用CASE取各自的值"""
+    first = values[0]
+    if all(value == first and type(value) is type(first) for value in values):
+        return first
+    return case(dict(zip(ids, values)), value=ResearchProject.id)
+
+
+def apply_project_batch(
+    db: Session,
+    items: List[ResearchProjectBatchItem],
+    atomic: bool = False,
+    ip_address: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    在一个事务中应用研究项目的批量部分更新并提交
+
+    Returns:
+        updated_count、failed_count 和每一项的结果（按请求顺序）
+
+    Raises:
+        BatchRejected: atomic模式下存在失败项
+    """
+    results: List[Dict[str, Any]] = [{"id": item.id, "success": True} for item in items]
+    requested: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+    for position, item in enumerate(items):
+        if item.id in requested:
+            results[position].update(success=False, error="项目ID在请求中重复")
+            continue
+        requested[item.id] = (position, _item_changes(item))
+
+    # 一次查询读取全部旧值（同时确认项目存在）
+    columns = [getattr(ResearchProject, field) for field in AUDITED_FIELDS]
+    old_rows = {
+        row.id: dict(zip(AUDITED_FIELDS, row[1:]))
+        for row in db.execute(select(ResearchProject.id, *columns).where(ResearchProject.id.in_(list(requested))))
+    }
+    for project_id, (position, _) in list(requested.items()):
+        if project_id not in old_rows:
+            results[position].update(success=False, error="Research project not found")
+            del requested[project_id]
+
+    if atomic and any(not result["success"] for result in results):
+        raise BatchRejected(results)
+
+    now = datetime.utcnow()
+    journal_ids: Dict[str, Optional[int]] = {}
+    groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+    audit_entries = []
+    for project_id, (position, values) in requested.items():
+        old = old_rows[project_id]
+        changed = {field: value for field, value in values.items() if old[field] != value}
+        results[position]["changed"] = sorted(changed)
+        if not changed:
+            continue
+        audit_entries.append((project_id, {field: old[field] for field in changed}, changed))
+
+        column_values = dict(changed)
+        if "is_todo" in changed:
+            column_values["todo_marked_at"] = now if changed["is_todo"] else None
+        for field, id_field in JOURNAL_FIELDS.items():
+            if field in changed:
+                name = changed[field]
+                if name not in journal_ids:
+                    journal_ids[name] = resolve_journal_id(db, name)
+                column_values[id_field] = journal_ids[name]
+        groups[tuple(sorted(column_values))].append((project_id, column_values))
+
+    try:
+        for fields, group in groups.items():
+            ids = [project_id for project_id, _ in group]
+            db.execute(
+                update(ResearchProject)
+                .where(ResearchProject.id.in_(ids))
+                .values({field: _column_value(ids, [values[field] for _, values in group]) for field in fields})
+                .execution_options(synchronize_session=False)
+            )
+        AuditService.log_update_many(db, "research_projects", audit_entries, ip_address=ip_address)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    updated_count = len(audit_entries)
+    failed_count = sum(1 for result in results if not result["success"])
+    logger.info(f"研究项目批量更新: {updated_count} 个项目已修改，{len(groups)} 条UPDATE，{failed_count} 项失败")
+    return {"updated_count": updated_count, "failed_count": failed_count, "results": results}
@@ -0,0 +1,220 @@
+"""
+跨实体全文检索服务
+在期刊、Idea、研究项目、提示词、合作者、交流记录的FTS5索引上执行一次UNION ALL查询，
+按相关度合并结果并生成高亮摘要，支持按类型限制数量和游标分页
+"""
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Collaborator, CommunicationLog, Idea, Journal, Prompt, ResearchProject
+from app.models.search_index import MIN_MATCH_LENGTH, SEARCH_INDEXES
+from app.utils.cursor import decode_cursor, encode_cursor
+
+# snippet() 使用控制字符作为高亮占位符，HTML转义之后再替换为<mark>标签，避免注入
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+HIGHLIGHT_PATTERN = re.compile(f"({HIGHLIGHT_START}.*?{HIGHLIGHT_END})", re.S)
+SNIPPET_TOKENS = 32  # trigram分词下大致对应摘要字符数
+ELLIPSIS = "…"
+
+
+@dataclass(frozen=True)
+class SearchEntity:
+    """可搜索的实体类型"""
+    index: str  # SEARCH_INDEXES 中的源表名
+    model: Any
+    title: Any  # 结果标题列
+    filters: Tuple = ()
+
+
+SEARCH_ENTITIES: Dict[str, SearchEntity] = {
+    "journals": SearchEntity("journals", Journal, Journal.name),
+    "ideas": SearchEntity("ideas", Idea, Idea.project_name),
+    "research": SearchEntity("research_projects", ResearchProject, ResearchProject.title),
+    "prompts": SearchEntity("prompts", Prompt, Prompt.title, (Prompt.is_active == True,)),
+    "collaborators": SearchEntity("collaborators", Collaborator, Collaborator.name, (Collaborator.is_deleted == False,)),
+    "communication_logs": SearchEntity("communication_logs", CommunicationLog, CommunicationLog.title),
+}
+ENTITY_ORDER = {name: position for position, name in enumerate(SEARCH_ENTITIES)}
+
+
+def parse_types(types: Optional[str]) -> List[str]:
+    """解析逗号分隔的类型列表，默认全部类型"""
+    if not types:
+        return list(SEARCH_ENTITIES)
+    selected = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in selected if t not in SEARCH_ENTITIES]
+    if unknown:
+        raise ValueError(f"不支持的搜索类型: {', '.join(unknown)}（可选: {', '.join(SEARCH_ENTITIES)}）")
+    return sorted(set(selected), key=ENTITY_ORDER.get)
+
+
+def _branch(entity_type: str, keyword: str, short_terms: Sequence[str],
+            after: Optional[List], fetch: int):
+    """单个实体类型的查询分支：按 (rank, id) 排序，从游标位置之后取 fetch 条"""
+    entity = SEARCH_ENTITIES[entity_type]
+    index = SEARCH_INDEXES[entity.index]
+    search_filter = index.search(keyword)
+
+    if search_filter.rank is not None:
+        rank = search_filter.rank
+        snippet = func.snippet(
+            literal_column(index.name), -1, HIGHLIGHT_START, HIGHLIGHT_END, ELLIPSIS, SNIPPET_TOKENS
+        )
+    else:
+        # 只有短关键词（LIKE匹配）时没有相关度，取第一个命中的列作为摘要原文
+        rank = literal(0.0)
+        snippet = case(
+            *((index.table.c[name].contains(short_terms[0], autoescape=True), index.table.c[name])
+              for name in index.columns),
+            else_=index.table.c[index.columns[0]],
+        )
+
+    query = (
+        select(
+            literal(entity_type).label("type"),
+            entity.model.id.label("id"),
+            entity.title.label("title"),
+            snippet.label("snippet"),
+            rank.label("rank"),
+        )
+        .select_from(index.table)
+        .join(entity.model, entity.model.id == index.rowid)
+        .where(search_filter.condition, *entity.filters)
+    )
+    if after is not None:
+        after_rank, after_id = after
+        query = query.where(or_(rank > after_rank, and_(rank == after_rank, entity.model.id > after_id)))
+    return select(query.order_by(rank, entity.model.id).limit(fetch).subquery())
+
+
+def _highlight_terms(text: str, terms: Sequence[str]) -> str:
+    """在尚未高亮的片段中为短关键词加高亮占位符"""
+    if not terms:
+        return text
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.I)
+    parts = HIGHLIGHT_PATTERN.split(text)
+    for i in range(0, len(parts), 2):  # 奇数下标是已高亮的片段
+        parts[i] = pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}", parts[i])
+    return "".join(parts)
+
+
+def _excerpt(text: str, term: str, length: int = SNIPPET_TOKENS) -> str:
+    """截取关键词附近的片段（LIKE匹配时没有snippet()可用）"""
+    position = text.casefold().find(term.casefold())
+    if len(text) <= length or position < 0:
+        return text if len(text) <= length else text[:length] + ELLIPSIS
+    start = max(0, min(position - length // 3, len(text) - length))
+    excerpt = text[start:start + length]
+    return (ELLIPSIS if start > 0 else "") + excerpt + (ELLIPSIS if start + length < len(text) else "")
+
+
+def render_snippet(raw: Optional[str], short_terms: Sequence[str], has_rank: bool) -> str:
+    """生成HTML安全的高亮摘要（命中部分用<mark>包裹）"""
+    if not raw:
+        return ""
+    if not has_rank and short_terms:
+        raw = _excerpt(raw, short_terms[0])
+    marked = html.escape(_highlight_terms(raw, short_terms))
+    return marked.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+async def search_all(
+    db: AsyncSession,
+    keyword: str,
+    types: Optional[str] = None,
+    limit: int = 20,
+    per_type_limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    跨实体检索
+
+    Args:
+        db: 异步数据库会话
+        keyword: 搜索关键词（空白分隔的多个词为AND关系）
+        types: 逗号分隔的实体类型，默认全部
+        limit: 本页最多返回的结果数
+        per_type_limit: 本页每种类型最多返回的结果数，默认不单独限制
+        cursor: 上一页返回的 next_cursor
+
+    Returns:
+        items（按相关度合并）、各类型本页数量、next_cursor
+
+    Raises:
+        ValueError: 类型或游标无效
+    """
+    keyword = " ".join(keyword.split())
+    if not keyword:
+        raise ValueError("搜索关键词不能为空")
+    entity_types = parse_types(types)
+    per_type_limit = min(per_type_limit or limit, limit)
+
+    # 游标记录每种类型已返回的最后位置 [rank, id]，以及已取完的类型
+    after: Dict[str, List] = {}
+    exhausted: set = set()
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("q") != keyword:
+            raise ValueError("分页游标与搜索关键词不匹配")
+        after = position.get("after", {})
+        exhausted = set(position.get("exhausted", []))
+
+    active_types = [t for t in entity_types if t not in exhausted]
+    short_terms = [term for term in keyword.split() if len(term) < MIN_MATCH_LENGTH]
+    has_rank = len(short_terms) < len(keyword.split())
+
+    rows = []
+    if active_types:
+        # 每种类型多取1条，用于判断该类型是否还有下一页
+        fetch = per_type_limit + 1
+        branches = [_branch(t, keyword, short_terms, after.get(t), fetch) for t in active_types]
+        statement = branches[0] if len(branches) == 1 else union_all(*branches)
+        rows = (await db.execute(statement)).all()
+
+    # 按相关度合并（rank越小越相关），同分时按类型顺序和id保证稳定
+    rows.sort(key=lambda row: (row.rank, ENTITY_ORDER[row.type], row.id))
+    items = []
+    counts = {t: 0 for t in entity_types}
+    fetched = {t: 0 for t in active_types}
+    for row in rows:
+        fetched[row.type] += 1
+        if len(items) >= limit or counts[row.type] >= per_type_limit:
+            continue
+        counts[row.type] += 1
+        after[row.type] = [row.rank, row.id]
+        items.append({
+            "type": row.type,
+            "id": row.id,
+            "title": row.title,
+            "snippet": render_snippet(row.snippet, short_terms, has_rank),
+            "score": round(-row.rank, 6) if has_rank else 0.0,
+        })
+
+    # 本页取走了该类型查到的全部结果，且查到的数量没有达到 fetch，说明该类型已取完
+    for t in active_types:
+        if counts[t] == fetched[t] and fetched[t] <= per_type_limit:
+            exhausted.add(t)
+    has_more = any(t not in exhausted for t in entity_types)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor({
+            "q": keyword,
+            "after": {t: position for t, position in after.items() if t not in exhausted},
+            "exhausted": sorted(exhausted & set(entity_types), key=ENTITY_ORDER.get),
+        })
+
+    return {
+        "query": keyword,
+        "items": items,
+        "counts": counts,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,202 @@
+"""
+写入合并队列（group commit）
+高频的小型写操作在一个短时间窗口内合并为一个事务、一次提交，减少SQLite的fsync次数
+
+每个操作在独立的SAVEPOINT中执行，单个操作失败只回滚自己，
+并把异常（包括HTTPException）原样返回给对应的调用方。
+"""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.config import settings
+from ..core.query_profiler import instrument_engine
+from ..models.database import DATABASE_URL, CONNECT_ARGS, set_sqlite_pragma
+
+logger = logging.getLogger(__name__)
+
+# 写操作：接收数据库会话和附加参数，返回值会作为调用方的结果（应返回普通数据而非ORM对象）
+WriteOperation = Callable[..., Any]
+# 操作在提交方的上下文中执行，SQL统计等上下文变量可以归属到原请求
+QueueItem = Tuple[WriteOperation, tuple, Future, contextvars.Context]
+
+
+class WriteQueue:
+    """单线程写入队列：收集窗口期内的写操作，合并为一个事务提交"""
+
+    def __init__(self, window_ms: int = 5, max_batch: int = 64):
+        """
+        Args:
+            window_ms: 收到第一个操作后继续等待合并的时间（毫秒）
+            max_batch: 单个事务最多合并的操作数
+        """
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.stats = {"batches": 0, "operations": 0, "failed_operations": 0, "fallbacks": 0}
+
+        self._queue: "queue.Queue[Optional[QueueItem]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._session_factory: Optional[sessionmaker] = None
+
+    # ===== 对外接口 =====
+
+    async def submit(self, operation: WriteOperation, *args) -> Any:
+        """提交写操作并等待其所在事务提交完成"""
+        return await asyncio.wrap_future(self.enqueue(operation, *args))
+
+    def run(self, operation: WriteOperation, *args, timeout: Optional[float] = None) -> Any:
+        """同步版本的submit，供线程池中的同步路由使用"""
+        return self.enqueue(operation, *args).result(timeout=timeout)
+
+    def enqueue(self, operation: WriteOperation, *args) -> Future:
+        """把写操作放入队列，返回concurrent.futures.Future"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((operation, args, future, contextvars.copy_context()))
+        return future
+
+    def shutdown(self, timeout: float = 5.0):
+        """处理完队列中剩余的操作后停止写线程"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    # ===== 写线程 =====
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            if self._session_factory is None:
+                self._session_factory = sessionmaker(
+                    bind=self._create_engine(), autoflush=False, expire_on_commit=False
+                )
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def _create_engine(self):
+        """写线程专用的单连接引擎"""
+        engine = create_engine(DATABASE_URL, connect_args=CONNECT_ARGS, pool_size=1, max_overflow=0)
+        instrument_engine(engine)
+        if DATABASE_URL.startswith("sqlite"):
+            event.listen(engine, "connect", set_sqlite_pragma)
+
+            # pysqlite自行管理事务时SAVEPOINT无法正常工作，改为由SQLAlchemy显式发出BEGIN
+            @event.listens_for(engine, "connect")
+            def _disable_driver_transactions(dbapi_conn, connection_record):
+                dbapi_conn.isolation_level = None
+
+            # 事务开始时即获取写锁，避免读锁升级失败导致的 "database is locked"
+            @event.listens_for(engine, "begin")
+            def _begin_immediate(conn):
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+        return engine
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    next_item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stopping = True
+                    break
+                batch.append(next_item)
+
+            try:
+                self._process_batch(batch)
+            except Exception as e:  # 兜底，保证写线程不会退出
+                logger.error(f"写入队列处理批次失败: {e}")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            if stopping:
+                return
+
+    def _process_batch(self, batch: List[QueueItem]):
+        """在一个事务中执行整批操作，每个操作使用独立的SAVEPOINT"""
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        outcomes = []
+        db: Session = self._session_factory()
+        try:
+            for operation, args, future, context in batch:
+                savepoint = db.begin_nested()
+                try:
+                    result = context.run(operation, db, *args)
+                    savepoint.commit()
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    savepoint.rollback()
+                    outcomes.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            # 提交失败时整批已回滚，逐个重新执行，保证每个调用方拿到自己的结果
+            db.rollback()
+            logger.warning(f"合并提交失败，改为逐个提交 {len(batch)} 个操作: {e}")
+            self.stats["fallbacks"] += 1
+            db.close()
+            self._process_individually(batch)
+            return
+        finally:
+            db.close()
+
+        self.stats["batches"] += 1
+        for future, result, error in outcomes:
+            self.stats["operations"] += 1
+            if error is not None:
+                self.stats["failed_operations"] += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _process_individually(self, batch: List[QueueItem]):
+        for operation, args, future, context in batch:
+            db: Session = self._session_factory()
+            try:
+                result = context.run(operation, db, *args)
+                db.commit()
+                future.set_result(result)
+            except Exception as e:
+                db.rollback()
+                self.stats["failed_operations"] += 1
+                future.set_exception(e)
+            finally:
+                db.close()
+            self.stats["batches"] += 1
+            self.stats["operations"] += 1
+
+
+# 全局写入队列实例
+write_queue = WriteQueue(
+    window_ms=settings.WRITE_QUEUE_WINDOW_MS,
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+)
@@ -58,9 +58,13 @@ class BackupManager:
         backup_folder = self.backup_dir / timestamp
         backup_folder.mkdir(exist_ok=True)
         
-        # 复制数据库文件
+        # 通过SQLite在线备份API复制：读取一致的快照，包括仍在WAL日志中的已提交事务
         backup_file = backup_folder / self.db_path.name
-        shutil.copy2(self.db_path, backup_file)
+        try:
+            self._copy_database(self.db_path, backup_file)
+        except sqlite3.Error:
+            shutil.rmtree(backup_folder, ignore_errors=True)
+            raise
         
         # 创建备份信息文件
         info_file = backup_folder / "backup_info.txt"
@@ -88,10 +92,31 @@ class BackupManager:
         if self.db_path.exists():
             self.create_backup("before_restore")
         
-        # 恢复备份
-        shutil.copy2(backup_path, self.db_path)
+        # 通过在线备份API写入正在使用的数据库：在SQLite的写锁下逐页替换，
+        # 连接池中的其他连接（包括WAL共享内存索引和内存映射）由SQLite自身保持一致，不直接覆盖文件
+        self._copy_database(backup_path, self.db_path)
         logger.info(f"数据库已从备份恢复: {backup_name}")
         return True
+
+    @staticmethod
+    def _copy_database(source_path: Path, target_path: Path):
+        """
+        使用 sqlite3.Connection.backup 把source数据库完整复制到target
+
+        Raises:
+            sqlite3.Error: 复制失败（如目标数据库在busy_timeout内无法获得写锁）
+        """
+        # 与应用连接相同的busy_timeout（毫秒），等待其他连接的写事务结束
+        timeout = float(settings.get_sqlite_pragmas().get("busy_timeout", 5000)) / 1000
+        source = sqlite3.connect(source_path, timeout=timeout)
+        try:
+            target = sqlite3.connect(target_path, timeout=timeout)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
     
     def list_backups(self):
         """列出所有可用备份"""
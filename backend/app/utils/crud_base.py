@@ -1,27 +1,325 @@
 """
 基础CRUD操作类
+列表查询引擎：声明式筛选（eq/in/range/contains/fts）、白名单多列排序、不透明的keyset游标、可选总数
+集合式批量操作：bulk_create / bulk_update / bulk_delete，各一条写语句，审计记录一条多行INSERT
 """
-from typing import Generic, Type, TypeVar, List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Generic, Type, TypeVar, List, Optional, Dict, Any, Callable, Sequence, Tuple
+from sqlalchemy import Date, DateTime, and_, delete, false, func, insert, or_, select, tuple_, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, Response
+
+from ..services.audit import AuditService
+from .cursor import decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
+FILTER_OPERATORS = ("eq", "in", "range", "contains", "fts")
+RANK_ORDERING = "rank"
+
+
+@dataclass(frozen=True)
+class FilterField:
+    """
+    声明式筛选字段
+
+    op:
+    - eq: column == value
+    - in: column IN values（列表或逗号分隔的字符串，convert逐个转换）；
+      指定through（关联表中指向本模型的列）时为 model.id IN (SELECT through WHERE column IN values)
+    - range: (下限, 上限) 闭区间，任一端为None表示不限
+    - contains: 子串匹配（LIKE，转义通配符）
+    - fts: 全文检索（index为SearchIndex，index_columns限定检索列）；
+      未指定column时JOIN本表的FTS索引，并提供相关度排序键 rank；指定column时为 column IN (匹配的rowid)
+    """
+    op: str
+    column: Any = None
+    convert: Optional[Callable[[Any], Any]] = None
+    index: Any = None
+    index_columns: Optional[Sequence[str]] = None
+    through: Any = None
+
+    def __post_init__(self):
+        if self.op not in FILTER_OPERATORS:
+            raise ValueError(f"不支持的筛选操作: {self.op}")
+
+
+@dataclass(frozen=True)
+class Ordering:
+    """排序字段声明：列可能为NULL时游标条件需要额外处理NULL，确定非空的列可声明nullable=False"""
+    expression: Any
+    nullable: bool = True
+
+
+@dataclass(frozen=True)
+class OrderKey:
+    """排序键：name为排序参数中的字段名"""
+    name: str
+    expression: Any
+    descending: bool = False
+    nullable: bool = True
+
+    @property
+    def signature(self) -> str:
+        return f"-{self.name}" if self.descending else self.name
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, str):
+            column_type = getattr(self.expression, "type", None)
+            if isinstance(column_type, DateTime):
+                return datetime.fromisoformat(value)
+            if isinstance(column_type, Date):
+                return date.fromisoformat(value)
+        return value
+
+    def after(self, value: Any):
+        """排在value之后的条件（SQLite中NULL在升序时最前、降序时最后）"""
+        if value is None:
+            return self.expression.isnot(None) if not self.descending else false()
+        if self.descending:
+            condition = self.expression < value
+            return or_(condition, self.expression.is_(None)) if self.nullable else condition
+        return self.expression > value
+
+    def equals(self, value: Any):
+        return self.expression.is_(None) if value is None else self.expression == value
+
+
+@dataclass
+class Page:
+    """一页结果：rows为原始行（末尾附加了排序键列），next_cursor为None表示没有下一页"""
+    rows: List[Any]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    def scalars(self) -> List[Any]:
+        return [row[0] for row in self.rows]
+
+    def set_headers(self, response: Response):
+        """总数和下一页游标放在响应头中（X-Total-Count / X-Next-Cursor），响应体仍为列表"""
+        if self.total is not None:
+            response.headers["X-Total-Count"] = str(self.total)
+        if self.next_cursor:
+            response.headers["X-Next-Cursor"] = self.next_cursor
+
+
+@dataclass
+class PageQuery:
+    """构建好的分页查询"""
+    statement: Any
+    count_statement: Any
+    keys: List[OrderKey]
+    limit: Optional[int]
+    signature: str = field(init=False)
+
+    def __post_init__(self):
+        self.signature = ",".join(key.signature for key in self.keys)
+
+    def finish(self, rows: List[Any], total: Optional[int]) -> Page:
+        next_cursor = None
+        if self.limit is not None and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1][-len(self.keys):]
+            next_cursor = encode_cursor({
+                "o": self.signature,
+                "k": [key.encode(value) for key, value in zip(self.keys, last)],
+            })
+        return Page(rows=list(rows), next_cursor=next_cursor, total=total)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """基础CRUD操作类"""
     
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self,
+        model: Type[ModelType],
+        filters: Optional[Dict[str, FilterField]] = None,
+        orderings: Optional[Dict[str, Any]] = None,
+        default_ordering: str = "id"
+    ):
         """
         初始化CRUD对象
         
         Args:
             model: SQLAlchemy模型类
+            filters: 列表查询可用的筛选字段 {参数名: FilterField}
+            orderings: 允许排序的字段白名单 {字段名: 列、表达式或Ordering}，id总是可用
+            default_ordering: 未指定排序时使用的排序，如 "-created_at"
         """
         self.model = model
+        self.filters = filters or {}
+        self.orderings = {"id": model.id, **(orderings or {})}
+        self.default_ordering = default_ordering
+
+    # ===== 列表查询引擎 =====
+
+    def apply_filters(self, query, values: Dict[str, Any]) -> Tuple[Any, Optional[Any]]:
+        """
+        按筛选字段声明添加条件，值为None、空字符串或空列表的字段不筛选
+
+        Returns:
+            (查询, 相关度排序表达式)，没有本表全文检索条件时相关度为None
+
+        Raises:
+            ValueError: 筛选值格式无效
+        """
+        rank = None
+        for name, value in values.items():
+            if value is None or value == "" or value == [] or value == (None, None):
+                continue
+            spec = self.filters[name]
+            if spec.op == "eq":
+                query = query.where(spec.column == value)
+            elif spec.op == "in":
+                items = self._parse_list(name, spec, value)
+                if spec.through is not None:
+                    condition = self.model.id.in_(select(spec.through).where(spec.column.in_(items)))
+                else:
+                    condition = spec.column.in_(items)
+                query = query.where(condition)
+            elif spec.op == "range":
+                low, high = value
+                if low is not None:
+                    query = query.where(spec.column >= low)
+                if high is not None:
+                    query = query.where(spec.column <= high)
+            elif spec.op == "contains":
+                query = query.where(spec.column.contains(value, autoescape=True))
+            elif spec.op == "fts":
+                if spec.column is not None:
+                    matching = spec.index.matching_ids(value, columns=spec.index_columns)
+                    if matching is not None:
+                        query = query.where(spec.column.in_(matching))
+                    continue
+                search_filter = spec.index.search(value, columns=spec.index_columns)
+                if search_filter is not None:
+                    query = query.join(spec.index.table, spec.index.rowid == self.model.id).where(search_filter.condition)
+                    rank = search_filter.rank
+        return query, rank
+
+    @staticmethod
+    def _parse_list(name: str, spec: FilterField, value: Any) -> List[Any]:
+        items = [part.strip() for part in value.split(",") if part.strip()] if isinstance(value, str) else list(value)
+        if spec.convert:
+            try:
+                items = [spec.convert(item) for item in items]
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"筛选参数 {name} 格式无效: {value}") from e
+        return items
+
+    def resolve_ordering(self, ordering: Optional[str], rank: Optional[Any] = None) -> List[OrderKey]:
+        """
+        解析排序参数（逗号分隔，"-"前缀表示倒序），最后总是按id兜底保证顺序唯一
+        （方向与最后一个排序键相同，(列, id) 上的索引可以整体正向或反向扫描）
+
+        rank 为全文检索相关度（bm25越小越相关），只在有本表全文检索条件时可用，
+        短关键词退化为子串匹配时没有相关度，忽略该排序键
+
+        Raises:
+            ValueError: 排序字段不在白名单中
+        """
+        keys: List[OrderKey] = []
+        for part in (ordering or self.default_ordering).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            descending = part.startswith("-")
+            name = part.lstrip("-")
+            if any(key.name == name for key in keys):
+                continue
+            if name == RANK_ORDERING:
+                if rank is not None:
+                    keys.append(OrderKey(name, rank, descending, nullable=False))
+                continue
+            if name not in self.orderings:
+                allowed = ", ".join([*self.orderings, RANK_ORDERING])
+                raise ValueError(f"不支持的排序字段: {name}（可选: {allowed}）")
+            spec = self.orderings[name]
+            if isinstance(spec, Ordering):
+                keys.append(OrderKey(name, spec.expression, descending, nullable=spec.nullable))
+            else:
+                keys.append(OrderKey(name, spec, descending, nullable=name != "id"))
+        if not any(key.name == "id" for key in keys):
+            keys.append(OrderKey("id", self.model.id, descending=bool(keys) and keys[-1].descending, nullable=False))
+        return keys
+
+    @staticmethod
+    def _keyset_condition(keys: List[OrderKey], values: List[Any]):
+        """游标位置之后的条件；排序键都非空且方向一致时用行值比较，SQLite可以直接在索引上定位"""
+        if all(not key.nullable for key in keys) and None not in values and len({key.descending for key in keys}) == 1:
+            columns, bounds = tuple_(*(key.expression for key in keys)), tuple_(*values)
+            return columns < bounds if keys[0].descending else columns > bounds
+        return or_(*(
+            and_(*(keys[j].equals(values[j]) for j in range(i)), keys[i].after(values[i]))
+            for i in range(len(keys))
+        ))
+
+    def build_page_query(
+        self,
+        query=None,
+        *,
+        filters: Optional[Dict[str, Any]] = None,
+        ordering: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = 100,
+        skip: int = 0
+    ) -> PageQuery:
+        """
+        构建列表查询：筛选 → 排序 → 游标位置 → 多取一条判断是否还有下一页
+
+        有游标时忽略skip；排序键作为附加列放在每行末尾，用于生成下一页游标
+
+        Raises:
+            ValueError: 筛选值、排序字段或游标无效
+        """
+        query = query if query is not None else select(self.model)
+        query, rank = self.apply_filters(query, filters or {})
+        keys = self.resolve_ordering(ordering, rank)
+        count_statement = select(func.count()).select_from(
+            query.with_only_columns(self.model.id).order_by(None).subquery()
+        )
+
+        page_query = PageQuery(statement=None, count_statement=count_statement, keys=keys, limit=limit)
+        if cursor:
+            position = decode_cursor(cursor)
+            values = position.get("k")
+            if position.get("o") != page_query.signature or not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError("分页游标与当前排序不匹配")
+            values = [key.decode(value) for key, value in zip(keys, values)]
+            query = query.where(self._keyset_condition(keys, values))
+        elif skip:
+            query = query.offset(skip)
+
+        query = query.add_columns(*(key.expression.label(f"order_key_{i}") for i, key in enumerate(keys)))
+        query = query.order_by(*(key.expression.desc() if key.descending else key.expression for key in keys))
+        if limit is not None:
+            query = query.limit(limit + 1)
+        page_query.statement = query
+        return page_query
+
+    def paginate(self, db: Session, query=None, *, with_total: bool = False, **options) -> Page:
+        """执行列表查询（同步会话），options同build_page_query"""
+        page_query = self.build_page_query(query, **options)
+        rows = db.execute(page_query.statement).all()
+        total = db.execute(page_query.count_statement).scalar() if with_total else None
+        return page_query.finish(rows, total)
+
+    async def paginate_async(self, db: AsyncSession, query=None, *, with_total: bool = False, **options) -> Page:
+        """执行列表查询（异步会话），options同build_page_query"""
+        page_query = self.build_page_query(query, **options)
+        rows = (await db.execute(page_query.statement)).all()
+        total = (await db.execute(page_query.count_statement)).scalar() if with_total else None
+        return page_query.finish(rows, total)
     
     def get(self, db: Session, id: int) -> Optional[ModelType]:
         """
@@ -140,6 +438,150 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.rollback()
             raise HTTPException(status_code=400, detail=str(e))
     
+    # ===== 集合式批量操作：每个方法一条写语句 + 一条多行审计INSERT =====
+    # 不经过ORM对象和会话事件（before_flush等），关系字段和派生数据由调用方处理
+
+    def _column_values(self, obj_in: Any) -> Dict[str, Any]:
+        """创建数据中属于模型列的字段（忽略tag_ids等关系字段）"""
+        data = obj_in.model_dump() if hasattr(obj_in, 'model_dump') else dict(obj_in)
+        columns = self.model.__table__.columns
+        return {key: value for key, value in data.items() if key in columns}
+
+    def bulk_create(
+        self,
+        db: Session,
+        objs_in: Sequence[Any],
+        *,
+        audit: bool = False,
+        ip_address: Optional[str] = None,
+        commit: bool = True
+    ) -> List[int]:
+        """
+        批量创建：一条多行INSERT ... RETURNING id
+
+        Args:
+            objs_in: 创建数据（schema或字典），只写入模型列
+            audit: 是否写入CREATE审计记录
+            commit: 是否提交；为False时由调用方在同一事务中继续写入后提交
+
+        Returns:
+            新记录ID，与objs_in顺序一致
+        """
+        rows = [self._column_values(obj_in) for obj_in in objs_in]
+        if not rows:
+            return []
+        try:
+            ids = list(db.execute(
+                insert(self.model).returning(self.model.id, sort_by_parameter_order=True), rows
+            ).scalars())
+            if audit:
+                AuditService.log_create_many(db, self.model.__tablename__, zip(ids, rows), ip_address)
+            if commit:
+                db.commit()
+            return ids
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def bulk_update(
+        self,
+        db: Session,
+        ids: Sequence[int],
+        values: Dict[str, Any],
+        *,
+        audit: bool = False,
+        ip_address: Optional[str] = None,
+        commit: bool = True
+    ) -> List[int]:
+        """
+        批量更新：一条 UPDATE ... WHERE id IN (...) RETURNING id，所有记录设置相同的值
+
+        Args:
+            values: {列名: 值}，值应为普通数据（审计记录原样保存）
+            audit: 是否写入UPDATE审计记录（先一次查询取旧值，值未变化的记录不写入）
+
+        Returns:
+            实际存在并被更新的记录ID
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids or not values:
+            return []
+        columns = [getattr(self.model, key) for key in values]
+        try:
+            old_values: Dict[int, Dict[str, Any]] = {}
+            if audit:
+                rows = db.execute(select(self.model.id, *columns).where(self.model.id.in_(ids))).all()
+                old_values = {row[0]: dict(zip(values, row[1:])) for row in rows}
+
+            updated_ids = list(db.execute(
+                update(self.model)
+                .where(self.model.id.in_(ids))
+                .values(values)
+                .returning(self.model.id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+
+            if audit:
+                AuditService.log_update_many(
+                    db, self.model.__tablename__,
+                    ((record_id, old_values.get(record_id, {}), values) for record_id in updated_ids),
+                    ip_address
+                )
+            if commit:
+                db.commit()
+            return updated_ids
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def bulk_delete(
+        self,
+        db: Session,
+        ids: Sequence[int],
+        *,
+        columns: Optional[Sequence[str]] = None,
+        audit: bool = False,
+        ip_address: Optional[str] = None,
+        commit: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        批量删除：一条 DELETE ... WHERE id IN (...) RETURNING，删除的同时取回旧值
+
+        Args:
+            columns: 取回（并写入审计记录）的列名，默认全部列
+            audit: 是否写入DELETE审计记录
+
+        Returns:
+            被删除记录的旧值（含id），调用方可据此更新派生数据（如使用次数）
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        names = list(columns) if columns is not None else [column.name for column in self.model.__table__.columns]
+        if "id" not in names:
+            names.insert(0, "id")
+        try:
+            rows = db.execute(
+                delete(self.model)
+                .where(self.model.id.in_(ids))
+                .returning(*(getattr(self.model, name) for name in names))
+                .execution_options(synchronize_session=False)
+            ).all()
+            deleted = [dict(zip(names, row)) for row in rows]
+
+            if audit:
+                AuditService.log_delete_many(
+                    db, self.model.__tablename__,
+                    ((values["id"], {key: value for key, value in values.items() if key != "id"}) for values in deleted),
+                    ip_address
+                )
+            if commit:
+                db.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
     def count(self, db: Session, filters: Optional[Dict[str, Any]] = None) -> int:
         """
         统计记录数
@@ -0,0 +1,31 @@
+"""
+游标分页辅助函数
+游标是对客户端不透明的字符串（URL安全的base64编码JSON），保存上一页最后一条记录的排序键
+"""
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """把排序位置编码为游标字符串"""
+    raw = json.dumps(position, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解码游标字符串
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+    if not isinstance(position, dict):
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return position
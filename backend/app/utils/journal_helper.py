@@ -0,0 +1,137 @@
+"""
+期刊引用外键辅助函数
+Idea/ResearchProject 的 reference_journal、target_journal 是自由文本，
+这里负责把文本解析为 journals.id，供引用统计和筛选使用索引化的整数关联
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.database import Idea, Journal, ResearchProject
+from app.utils.string_helpers import to_title_case
+
+# (文本字段, 外键字段)
+JOURNAL_REFERENCE_FIELDS = (
+    ("reference_journal", "reference_journal_id"),
+    ("target_journal", "target_journal_id"),
+)
+JOURNAL_REFERENCE_MODELS = (Idea, ResearchProject)
+
+
+def normalize_journal_name(name: Optional[str]) -> str:
+    """期刊名称的匹配键：折叠空白并casefold（to_title_case只改变大小写和空白，两者匹配结果一致）"""
+    if not name:
+        return ""
+    return " ".join(name.split()).casefold()
+
+
+def resolve_journal_id(db: Session, name: Optional[str]) -> Optional[int]:
+    """
+    把期刊名称文本解析为期刊ID
+
+    先按 to_title_case 格式化后的名称精确匹配（走唯一索引），
+    再按大小写不敏感匹配兜底（兼容格式化之前导入的期刊）
+    """
+    key = normalize_journal_name(name)
+    if not key:
+        return None
+
+    journal_id = db.query(Journal.id).filter(Journal.name == to_title_case(name.strip())).scalar()
+    if journal_id is not None:
+        return journal_id
+
+    candidates = (
+        db.query(Journal.id, Journal.name)
+        .filter(func.lower(Journal.name) == " ".join(name.split()).lower())
+        .order_by(Journal.id)
+        .all()
+    )
+    for candidate_id, candidate_name in candidates:
+        if normalize_journal_name(candidate_name) == key:
+            return candidate_id
+    return None
+
+
+def resolve_pending_journal_references(session: Session):
+    """
+    flush前调用（before_flush事件）：新建或期刊文本被修改的Idea/ResearchProject重新解析期刊外键
+
+    显式设置了外键字段的对象不做处理
+    """
+    cache: Dict[str, Optional[int]] = {}
+    pending = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, JOURNAL_REFERENCE_MODELS)
+    ]
+    if not pending:
+        return
+
+    with session.no_autoflush:
+        for obj in pending:
+            state = inspect(obj)
+            for text_field, id_field in JOURNAL_REFERENCE_FIELDS:
+                if state.attrs[id_field].history.has_changes():
+                    continue
+                if not state.pending and not state.attrs[text_field].history.has_changes():
+                    continue
+                name = getattr(obj, text_field)
+                key = normalize_journal_name(name)
+                if key not in cache:
+                    cache[key] = resolve_journal_id(session, name)
+                setattr(obj, id_field, cache[key])
+
+
+def relink_journal_references(db: Session, journal_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    把尚未关联期刊的引用重新关联（新建/导入/重命名期刊后调用，不提交事务）
+
+    Args:
+        db: 数据库会话
+        journal_ids: 只关联到这些期刊；None表示所有期刊
+
+    Returns:
+        更新的行数
+    """
+    journal_filter = []
+    if journal_ids is not None:
+        journal_ids = list(journal_ids)
+        if not journal_ids:
+            return 0
+        journal_filter.append(Journal.id.in_(journal_ids))
+
+    updated = 0
+    for model in JOURNAL_REFERENCE_MODELS:
+        for text_field, id_field in JOURNAL_REFERENCE_FIELDS:
+            text_column = getattr(model, text_field)
+            id_column = getattr(model, id_field)
+            matched_id = (
+                select(Journal.id)
+                .where(func.lower(Journal.name) == func.lower(func.trim(text_column)), *journal_filter)
+                .order_by(Journal.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            result = db.execute(
+                update(model)
+                .where(id_column.is_(None), text_column.isnot(None), matched_id.isnot(None))
+                .values({id_field: matched_id})
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount or 0
+    return updated
+
+
+def rename_journal_references(db: Session, journal_id: int, new_name: str) -> int:
+    """期刊重命名后，同步已关联该期刊的引用文本（不提交事务）"""
+    updated = 0
+    for model in JOURNAL_REFERENCE_MODELS:
+        for text_field, id_field in JOURNAL_REFERENCE_FIELDS:
+            result = db.execute(
+                update(model)
+                .where(getattr(model, id_field) == journal_id)
+                .values({text_field: new_name})
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount or 0
+    return updated
@@ -1,41 +1,41 @@
 """
 研究方法使用统计辅助函数
+使用次数由数据库触发器维护（见 app/models/research_method_usage.py），这里只提供清理和对账入口
 """
+from typing import Any, Dict, List
 from sqlalchemy.orm import Session
-from app.models.database import ResearchMethod
+from app.models.research_method_usage import (
+    delete_unused_research_methods,
+    find_research_method_usage_drift,
+    reconcile_research_method_usage,
+)
 
 
-def update_research_method_usage(db: Session, method_name: str, increment: int = 1):
+def cleanup_unused_methods(db: Session) -> List[str]:
     """
-    更新研究方法的使用次数
+    一条DELETE删除没有任何Idea或研究项目引用的研究方法（按实际引用判断，不受计数漂移影响）
 
-    Args:
-        db: 数据库会话
-        method_name: 研究方法名称
-        increment: 增量（正数增加，负数减少）
+    Returns:
+        删除的方法名称
     """
-    if not method_name:
-        return
+    deleted = delete_unused_research_methods(db.connection())
+    db.commit()
+    return deleted
 
-    method = db.query(ResearchMethod).filter(ResearchMethod.name == method_name).first()
-    if method:
-        method.usage_count = max(0, method.usage_count + increment)
 
-
-def cleanup_unused_methods(db: Session) -> int:
+def reconcile_method_usage(db: Session, repair: bool = True) -> List[Dict[str, Any]]:
     """
-    自动删除usage_count为0的研究方法
+    报告（并修复）使用次数漂移：一次GROUP BY统计全部方法的实际引用数
+
+    Args:
+        repair: 为False时只报告不修改
 
     Returns:
-        删除的方法数量
+        不一致的方法（id、name、stored、actual）
     """
-    unused_methods = db.query(ResearchMethod).filter(ResearchMethod.usage_count == 0).all()
-    deleted_count = len(unused_methods)
-
-    for method in unused_methods:
-        db.delete(method)
-
-    if deleted_count > 0:
-        db.commit()
-
-    return deleted_count
+    connection = db.connection()
+    if not repair:
+        return find_research_method_usage_drift(connection)
+    drifted = reconcile_research_method_usage(connection)
+    db.commit()
+    return drifted
@@ -2,6 +2,7 @@
 统一响应格式处理
 """
 from typing import TypeVar, Optional, Dict, Any, List, Union
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 T = TypeVar('T')
@@ -102,4 +103,25 @@ def paginated_response(
             "total_pages": (total + page_size - 1) // page_size
         },
         "errors": None
-    }
\ No newline at end of file
+    }
+
+def job_accepted_response(job_id: str, kind: str) -> JSONResponse:
+    """
+    后台任务已提交（HTTP 202）
+
+    Args:
+        job_id: 任务ID
+        kind: 任务类型
+
+    Returns:
+        包含任务ID和状态查询地址的响应
+    """
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "kind": kind,
+            "status": "pending",
+            "status_url": f"/api/jobs/{job_id}"
+        }
+    )
@@ -0,0 +1,101 @@
+"""
+进程内快照缓存
+从数据库构建的只读快照（期刊目录、合作关系图等）在相关表有写入提交后失效，下次读取时惰性重建：
+- 版本号 + 锁：失效只递增版本，读取时版本不一致才在锁内重建
+- 失效通知：所有引擎共用一组事件监听器，写语句按各缓存登记的表名模式匹配，提交后使对应缓存失效
+"""
+
+import re
+import threading
+from typing import Callable, Generic, List, Optional, Pattern, Set, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+T = TypeVar("T")
+
+# 只有写语句需要逐个匹配各缓存的模式（SELECT、PRAGMA等直接跳过）
+WRITE_STATEMENT = re.compile(r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.I)
+DIRTY_KEY = "snapshot_cache_dirty"
+COMMITTED_KEY = "snapshot_cache_committed"
+
+
+class SnapshotCache(Generic[T]):
+    """失效后在下一次读取时惰性重建的快照"""
+
+    def __init__(self, build: Callable[[], T], write_pattern: Optional[Pattern] = None):
+        """
+        Args:
+            build: 构建快照（在锁内调用，同一时间只有一个线程重建）
+            write_pattern: 匹配会使快照失效的写语句；为None时只能手动 invalidate()
+        """
+        self._build = build
+        self.write_pattern = write_pattern
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot: Optional[T] = None
+        self._snapshot_version = -1
+        self.rebuild_count = 0
+        if write_pattern is not None:
+            _registered_caches.append(self)
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+
+    def get(self) -> T:
+        snapshot = self._snapshot
+        if snapshot is not None and self._snapshot_version == self._version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot_version != self._version:
+                # 先记录版本再读取：读取期间发生的失效会让下一次查询再次重建
+                version = self._version
+                self._snapshot = self._build()
+                self._snapshot_version = version
+                self.rebuild_count += 1
+            return self._snapshot
+
+
+_registered_caches: List[SnapshotCache] = []
+
+
+def _invalidate_all(caches: Set[SnapshotCache]):
+    for cache in caches:
+        cache.invalidate()
+
+
+# ===== 失效通知：所有引擎上的写语句提交后使匹配的缓存失效 =====
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _mark_caches_dirty(conn, cursor, statement, parameters, context, executemany):
+    if not WRITE_STATEMENT.match(statement):
+        return
+    for cache in _registered_caches:
+        if cache.write_pattern.match(statement):
+            conn.info.setdefault(DIRTY_KEY, set()).add(cache)
+
+
+@event.listens_for(Engine, "commit")
+def _invalidate_caches_on_commit(conn):
+    # commit事件在真正提交之前触发：此时失效一次，连接归还连接池（提交已完成）时再失效一次，
+    # 避免其他线程在两者之间用提交前的数据重建快照
+    dirty = conn.info.pop(DIRTY_KEY, None)
+    if dirty:
+        conn.info.setdefault(COMMITTED_KEY, set()).update(dirty)
+        _invalidate_all(dirty)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_caches_dirty(conn):
+    conn.info.pop(DIRTY_KEY, None)
+
+
+@event.listens_for(Pool, "checkin")
+def _invalidate_caches_on_checkin(dbapi_connection, connection_record):
+    if connection_record is None:
+        return
+    committed = connection_record.info.pop(COMMITTED_KEY, None)
+    if committed:
+        _invalidate_all(committed)
@@ -48,3 +48,66 @@ def to_title_case(text: str) -> str:
             result.append(word)
 
     return ' '.join(result)
+
+
+# GB2312一级汉字按拼音排序，每个声母区段的起始编码（区段终点为0xD7F9）
+_GB2312_INITIAL_BOUNDARIES = (
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'), (0xB7A2, 'f'),
+    (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'), (0xC0AC, 'l'), (0xC2E8, 'm'),
+    (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'), (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'),
+    (0xCBFA, 't'), (0xCDDA, 'w'), (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+)
+_GB2312_LEVEL1_END = 0xD7F9
+
+
+def pinyin_initial(char: str) -> str:
+    """
+    单个汉字的拼音首字母（小写）
+
+    基于GB2312一级汉字的拼音排序区段计算，无需拼音库；
+    二级汉字、生僻字和非汉字返回空字符串
+
+    Examples:
+        "管" -> "g"
+        "A" -> ""
+    """
+    try:
+        encoded = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return ''
+    if len(encoded) != 2:
+        return ''
+
+    code = (encoded[0] << 8) | encoded[1]
+    if code < _GB2312_INITIAL_BOUNDARIES[0][0] or code > _GB2312_LEVEL1_END:
+        return ''
+
+    initial = ''
+    for boundary, letter in _GB2312_INITIAL_BOUNDARIES:
+        if code < boundary:
+            break
+        initial = letter
+    return initial
+
+
+def name_initials(text: str) -> str:
+    """
+    名称的首字母缩写（小写），用于自动补全
+
+    中文取每个汉字的拼音首字母，英文取每个单词的首字母
+
+    Examples:
+        "管理世界" -> "glsj"
+        "Journal of Management Science" -> "joms"
+    """
+    if not text:
+        return ''
+
+    initials = []
+    for word in text.split():
+        if any('\u4e00' <= char <= '\u9fff' for char in word):
+            initials.extend(pinyin_initial(char) if '\u4e00' <= char <= '\u9fff' else char.lower()
+                            for char in word if char.isalnum())
+        elif word[0].isalnum():
+            initials.append(word[0].lower())
+    return ''.join(initials)
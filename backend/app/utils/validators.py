@@ -1,9 +1,10 @@
 """
 数据验证和关联检查工具
 """
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
-from ..models import ResearchProject, Collaborator, CommunicationLog, Idea
+from ..models import ResearchProject, Collaborator, CommunicationLog, Idea, project_collaborators
 
 class DataValidator:
     """数据验证器"""
@@ -43,59 +44,90 @@ class DataValidator:
         检查合作者的所有依赖关系
         返回依赖关系的详细信息
         """
-        collaborator = db.query(Collaborator).filter(
-            Collaborator.id == collaborator_id,
+        return DataValidator.check_collaborators_dependencies([collaborator_id], db)[collaborator_id]
+
+    @staticmethod
+    def check_collaborators_dependencies(collaborator_ids: List[int], db: Session) -> Dict[int, Dict[str, Any]]:
+        """
+        批量检查合作者的依赖关系（固定4次查询，与合作者数量无关）
+        返回 {合作者ID: 依赖关系详情}，结构与单个检查相同
+        """
+        ids = list(dict.fromkeys(collaborator_ids))
+        names = dict(db.query(Collaborator.id, Collaborator.name).filter(
+            Collaborator.id.in_(ids),
             Collaborator.is_deleted == False
-        ).first()
+        ).all())
+        existing = list(names)
 
-        if not collaborator:
-            return {"exists": False}
+        projects: Dict[int, Dict[int, Any]] = {collaborator_id: {} for collaborator_id in existing}
+        communication_logs: Dict[int, int] = {}
+        responsible_ideas: Dict[int, List[str]] = {collaborator_id: [] for collaborator_id in existing}
+        if existing:
+            # 参与的项目（关联表可能有重复行，按项目ID去重）
+            project_rows = db.query(
+                project_collaborators.c.collaborator_id, ResearchProject.id, ResearchProject.title, ResearchProject.status
+            ).join(
+                ResearchProject, ResearchProject.id == project_collaborators.c.project_id
+            ).filter(project_collaborators.c.collaborator_id.in_(existing)).all()
+            for collaborator_id, project_id, title, project_status in project_rows:
+                projects[collaborator_id][project_id] = (title, project_status)
 
-        # 检查参与的项目
-        projects = collaborator.projects
-        active_projects = [p for p in projects if p.status in ["writing", "submitting"]]
-        published_projects = [p for p in projects if p.status == "published"]
+            # 交流日志
+            communication_logs = dict(db.query(
+                CommunicationLog.collaborator_id, func.count(CommunicationLog.id)
+            ).filter(
+                CommunicationLog.collaborator_id.in_(existing)
+            ).group_by(CommunicationLog.collaborator_id).all())
 
-        # 检查交流日志
-        communication_logs = db.query(CommunicationLog).filter(
-            CommunicationLog.collaborator_id == collaborator_id
-        ).count()
+            # 作为负责人的Ideas（关键外键依赖）
+            for collaborator_id, project_name in db.query(Idea.responsible_person_id, Idea.project_name).filter(
+                Idea.responsible_person_id.in_(existing)
+            ).all():
+                responsible_ideas[collaborator_id].append(project_name)
 
-        # 检查作为负责人的Ideas（关键外键依赖）
-        responsible_ideas = db.query(Idea).filter(
-            Idea.responsible_person_id == collaborator_id
-        ).all()
+        results = {}
+        for collaborator_id in ids:
+            if collaborator_id not in names:
+                results[collaborator_id] = {"exists": False}
+                continue
 
-        warnings = []
-        can_hard_delete = True  # 是否可以永久删除
+            project_list = list(projects[collaborator_id].values())
+            active_projects = [title for title, project_status in project_list if project_status in ["writing", "submitting"]]
+            published_projects = [title for title, project_status in project_list if project_status == "published"]
+            log_count = communication_logs.get(collaborator_id, 0)
+            ideas = responsible_ideas[collaborator_id]
 
-        if active_projects:
-            warnings.append(f"合作者仍参与 {len(active_projects)} 个活跃项目")
-            can_hard_delete = False  # 有活跃项目，不能永久删除
-        if published_projects:
-            warnings.append(f"合作者参与了 {len(published_projects)} 个已发表项目")
-        if communication_logs > 0:
-            warnings.append(f"合作者有 {communication_logs} 条交流记录")
-            can_hard_delete = False  # 有交流记录，不能永久删除（外键约束）
-        if responsible_ideas:
-            warnings.append(f"合作者参与了 {len(responsible_ideas)} 个项目想法")
-            can_hard_delete = False  # 有外键约束，不能删除（包括软删除）
+            warnings = []
+            can_hard_delete = True  # 是否可以永久删除
 
-        return {
-            "exists": True,
-            "collaborator_id": collaborator_id,
-            "collaborator_name": collaborator.name,
-            "projects_count": len(projects),
-            "active_projects_count": len(active_projects),
-            "published_projects_count": len(published_projects),
-            "project_titles": [p.title for p in projects],
-            "communication_logs_count": communication_logs,
-            "responsible_ideas_count": len(responsible_ideas),
-            "responsible_idea_names": [idea.project_name for idea in responsible_ideas],
-            "can_delete": can_hard_delete,  # 是否可以永久删除
-            "warnings": warnings,
-            "recommendation": "cannot_delete" if responsible_ideas else ("soft_delete_only" if (active_projects or communication_logs) else "safe_to_delete")
-        }
+            if active_projects:
+                warnings.append(f"合作者仍参与 {len(active_projects)} 个活跃项目")
+                can_hard_delete = False  # 有活跃项目，不能永久删除
+            if published_projects:
+                warnings.append(f"合作者参与了 {len(published_projects)} 个已发表项目")
+            if log_count > 0:
+                warnings.append(f"合作者有 {log_count} 条交流记录")
+                can_hard_delete = False  # 有交流记录，不能永久删除（外键约束）
+            if ideas:
+                warnings.append(f"合作者参与了 {len(ideas)} 个项目想法")
+                can_hard_delete = False  # 有外键约束，不能删除（包括软删除）
+
+            results[collaborator_id] = {
+                "exists": True,
+                "collaborator_id": collaborator_id,
+                "collaborator_name": names[collaborator_id],
+                "projects_count": len(project_list),
+                "active_projects_count": len(active_projects),
+                "published_projects_count": len(published_projects),
+                "project_titles": [title for title, _ in project_list],
+                "communication_logs_count": log_count,
+                "responsible_ideas_count": len(ideas),
+                "responsible_idea_names": ideas,
+                "can_delete": can_hard_delete,  # 是否可以永久删除
+                "warnings": warnings,
+                "recommendation": "cannot_delete" if ideas else ("soft_delete_only" if (active_projects or log_count) else "safe_to_delete")
+            }
+        return results
     
     @staticmethod
     def validate_project_data(project_data: Dict[str, Any], db: Session) -> Dict[str, Any]:
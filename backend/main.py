@@ -2,9 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.routes import research, collaborators, backup, config
-from app.routes import ideas, journals, tags, research_methods, prompts, journal_issues, journal_online_first_tracking
+from app.routes import ideas, journals, tags, research_methods, prompts, journal_issues, journal_online_first_tracking, admin, search, jobs
 from app.models.database import init_db
-from app.middleware import RateLimitMiddleware, SecurityHeadersMiddleware, RequestValidationMiddleware
+from app.services.write_queue import write_queue
+from app.services.job_queue import job_queue
+from app.middleware import RateLimitMiddleware, SecurityHeadersMiddleware, RequestValidationMiddleware, QueryStatsMiddleware
 from app.middleware.error_handler import setup_exception_handlers
 from app.core.config import settings
 import logging
@@ -23,6 +25,7 @@ async def lifespan(app: FastAPI):
     logger.info(f"🌐 CORS 允许的源: {', '.join(settings.CORS_ORIGINS)}")
 
     init_db()  # 初始化数据库表
+    job_queue.start()  # 后台任务队列（上次未完成的任务标记为中断）
 
     logger.info(f"✅ 应用启动成功！监听地址: {settings.HOST}:{settings.PORT}")
     
@@ -30,6 +33,8 @@ async def lifespan(app: FastAPI):
     
     # 关闭时执行（如果需要）
     logger.info("👋 正在关闭应用...")
+    job_queue.shutdown()  # 通知执行中的后台任务取消
+    write_queue.shutdown()  # 提交队列中剩余的写操作
 
 app = FastAPI(
     title="Research Dashboard API",
@@ -56,10 +61,13 @@ app.add_middleware(
         "Cache-Control",
         "X-File-Name"
     ],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Repeated-Statements", "Server-Timing", "X-Total-Count", "X-Next-Cursor"],
 )
 
 # 安全中间件 - 注意：最后添加的中间件最先执行
-# 顺序：RateLimitMiddleware -> RequestValidationMiddleware -> SecurityHeadersMiddleware -> CORSMiddleware
+# 顺序：RateLimitMiddleware -> RequestValidationMiddleware -> SecurityHeadersMiddleware -> QueryStatsMiddleware -> CORSMiddleware
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)  # 请求级SQL统计（X-DB-* 响应头）
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(RequestValidationMiddleware, max_content_length=2 * 1024 * 1024)  # 2MB
 app.add_middleware(RateLimitMiddleware, calls=120, period=60)  # 每分钟120次请求
@@ -79,6 +87,9 @@ app.include_router(research_methods.router, prefix="/api/research-methods", tags
 app.include_router(prompts.router, prefix="/api/prompts", tags=["prompts"])
 app.include_router(journal_issues.router, prefix="/api", tags=["journal-issues"])
 app.include_router(journal_online_first_tracking.router, prefix="/api", tags=["journal-online-first-tracking"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.get("/")
 async def root():
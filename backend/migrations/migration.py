@@ -17,12 +17,28 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(__file__))
 
 # 导入迁移工具
-from migration_utils import setup_migration_logging, find_database_path, backup_database, get_table_columns, table_exists
+from migration_utils import (
+    setup_migration_logging, find_database_path, backup_database,
+    get_table_columns, table_exists, safe_add_column, safe_create_index
+)
 
 logger = setup_migration_logging()
 
 # 迁移版本号
-MIGRATION_VERSION = "v5.3_add_online_first_tracking"
+MIGRATION_VERSION = "v5.4_add_journal_reference_ids"
+
+# 需要外键化的表和字段（文本字段 -> 外键字段）
+REFERENCE_TABLES = ("ideas", "research_projects")
+REFERENCE_COLUMNS = {
+    "reference_journal": "reference_journal_id",
+    "target_journal": "target_journal_id",
+}
+
+
+def normalize_journal_name(name):
+    """期刊名称匹配键：折叠空白并casefold（与 app/utils/journal_helper.py 保持一致）"""
+    return " ".join((name or "").split()).casefold()
+
 
 def check_if_migration_completed(db_path):
     """检查迁移是否已完成"""
@@ -85,70 +101,95 @@ def run_migration():
 
         logger.info("=" * 70)
         logger.info(f"🚀 开始执行迁移: {MIGRATION_VERSION}")
-        logger.info('🎯 目标: 创建journal_online_first_tracking表')
+        logger.info('🎯 目标: 为ideas/research_projects添加期刊外键并回填')
         logger.info("=" * 70)
 
         # ===========================================
-        # 🔧 v5.3迁移任务：创建网络首发追踪表
+        # 🔧 v5.4迁移任务：期刊引用外键化
         # 变更：
-        # 1. 创建journal_online_first_tracking表
+        # 1. ideas、research_projects 添加 reference_journal_id、target_journal_id
+        # 2. 创建外键索引
+        # 3. 按期刊名称回填外键（to_title_case只改变大小写和空白，按casefold键匹配）
         # ===========================================
 
         # ============================
-        # Step 1: 创建journal_online_first_tracking表
+        # Step 1: 添加外键列
         # ============================
-        logger.info("\n📋 Step 1: 创建journal_online_first_tracking表")
+        logger.info("\n📋 Step 1: 添加期刊外键列")
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS journal_online_first_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                journal_id INTEGER NOT NULL,
-                tracked_date DATE NOT NULL,
-                tracked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                FOREIGN KEY (journal_id) REFERENCES journals(id) ON DELETE CASCADE
-            )
-        """)
-        logger.info("   ✅ 表结构创建完成")
+        for table in REFERENCE_TABLES:
+            for column in REFERENCE_COLUMNS.values():
+                safe_add_column(
+                    cursor, table, column,
+                    "INTEGER REFERENCES journals(id) ON DELETE SET NULL", logger
+                )
 
         # ============================
         # Step 2: 创建索引
         # ============================
         logger.info("\n📋 Step 2: 创建索引")
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_online_first_tracking_journal_id
-            ON journal_online_first_tracking(journal_id)
-        """)
-        logger.info("   ✅ journal_id索引创建完成")
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_online_first_tracking_tracked_date
-            ON journal_online_first_tracking(tracked_date DESC)
-        """)
-        logger.info("   ✅ tracked_date索引创建完成")
+        for table in REFERENCE_TABLES:
+            for column in REFERENCE_COLUMNS.values():
+                safe_create_index(cursor, f"idx_{table}_{column}", table, column, logger)
 
         # ============================
-        # Step 3: 验证表创建
+        # Step 3: 回填外键
         # ============================
-        logger.info("\n📋 Step 3: 验证表创建")
+        logger.info("\n📋 Step 3: 按期刊名称回填外键")
+
+        # 期刊名称匹配键 -> ID（大小写重复的期刊优先取精确名称，其次取ID最小者）
+        cursor.execute("SELECT id, name FROM journals ORDER BY id")
+        journals = cursor.fetchall()
+        journal_by_name = {name: journal_id for journal_id, name in journals}
+        journal_by_key = {}
+        for journal_id, name in journals:
+            journal_by_key.setdefault(normalize_journal_name(name), journal_id)
+
+        for table in REFERENCE_TABLES:
+            for text_column, id_column in REFERENCE_COLUMNS.items():
+                cursor.execute(f"""
+                    SELECT DISTINCT {text_column} FROM {table}
+                    WHERE {text_column} IS NOT NULL AND TRIM({text_column}) != ''
+                """)
+                names = [row[0] for row in cursor.fetchall()]
+
+                resolved = unresolved = 0
+                for name in names:
+                    journal_id = journal_by_name.get(name.strip()) or journal_by_key.get(normalize_journal_name(name))
+                    if journal_id is None:
+                        unresolved += 1
+                        continue
+                    cursor.execute(
+                        f"UPDATE {table} SET {id_column} = ? WHERE {text_column} = ?",
+                        (journal_id, name)
+                    )
+                    resolved += 1
+
+                logger.info(f"   ✅ {table}.{text_column}: 解析 {resolved} 个名称，未匹配 {unresolved} 个")
 
-        cursor.execute("""
-            SELECT name FROM sqlite_master
-            WHERE type='table' AND name='journal_online_first_tracking'
-        """)
-        if cursor.fetchone():
-            logger.info("   ✅ journal_online_first_tracking表已创建")
-        else:
-            raise Exception("表创建失败")
+        # ============================
+        # Step 4: 验证
+        # ============================
+        logger.info("\n📋 Step 4: 验证回填结果")
+
+        for table in REFERENCE_TABLES:
+            for text_column, id_column in REFERENCE_COLUMNS.items():
+                cursor.execute(f"""
+                    SELECT COUNT(*) FROM {table}
+                    WHERE {text_column} IS NOT NULL AND TRIM({text_column}) != '' AND {id_column} IS NULL
+                """)
+                missing = cursor.fetchone()[0]
+                if missing:
+                    logger.info(f"   ⚠️ {table}.{text_column}: {missing} 条记录的期刊不在期刊库中，外键保持为空")
 
         # 提交事务
         conn.commit()
         mark_migration_completed(db_path)
 
         logger.info("\n" + "=" * 70)
-        logger.info("🎉 v5.3 网络首发追踪表创建完成！")
-        logger.info("✅ journal_online_first_tracking表已创建")
+        logger.info("🎉 v5.4 期刊引用外键化完成！")
+        logger.info("✅ reference_journal_id / target_journal_id 已添加并回填")
         logger.info("=" * 70)
 
         conn.close()
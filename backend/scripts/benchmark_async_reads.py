@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+异步读路由并发对比脚本
+在同一个事件循环中并发发起请求，对比"同步会话阻塞事件循环"与 get_async_db 两种实现
+
+用法:
+    python scripts/benchmark_async_reads.py
+    python scripts/benchmark_async_reads.py --concurrency 32 --rounds 5
+
+指标说明:
+- loop blocked: 事件循环被阻塞的总时间占比；此期间其他请求（包括轻量请求）都无法被处理
+- max loop lag: 心跳任务观测到的单次最大事件循环阻塞时间
+
+使用临时数据库文件，不会影响 data/ 目录下的正式数据库。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 数据库引擎在导入时创建，必须先指定临时数据库
+_tmp_dir = tempfile.mkdtemp(prefix="bench_async_")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_tmp_dir) / 'bench.db'}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+
+from app.models import JournalSchema  # noqa: E402
+from app.models.database import SessionLocal, init_db, get_db, Journal, Idea, ResearchProject  # noqa: E402
+from app.routes import journals  # noqa: E402
+from app.routes.journals import batch_calculate_journal_stats  # noqa: E402
+
+
+def seed(journal_count, idea_count):
+    """准备期刊和引用数据"""
+    init_db()
+    db = SessionLocal()
+    try:
+        db.add_all([Journal(name=f"Benchmark Journal {i:04d}") for i in range(journal_count)])
+        db.add_all([
+            Idea(
+                project_name=f"Seed idea {i}",
+                project_description="seed",
+                research_method="Survey",
+                reference_journal=f"Benchmark Journal {i % journal_count:04d}",
+                target_journal=f"Benchmark Journal {(i * 7) % journal_count:04d}",
+            )
+            for i in range(idea_count)
+        ])
+        db.add_all([
+            ResearchProject(
+                title=f"Seed project {i}",
+                idea_description="seed",
+                research_method="Survey",
+                target_journal=f"Benchmark Journal {i % journal_count:04d}",
+            )
+            for i in range(idea_count // 2)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_app():
+    """挂载异步期刊列表路由，并添加一个旧实现（同步会话）作为对照"""
+    app = FastAPI()
+    app.include_router(journals.router, prefix="/api/journals")
+
+    @app.get("/baseline/journals")
+    async def baseline_journals(limit: int = 1000, db: Session = Depends(get_db)):
+        # 与改造前的 get_journals 相同：在 async def 中直接执行同步查询
+        items = db.query(Journal).options(joinedload(Journal.tags)).order_by(Journal.name).limit(limit).all()
+        stats = batch_calculate_journal_stats(db, [j.name for j in items], include_issues=True)
+        for journal in items:
+            journal.reference_count = stats[journal.name]["reference_count"]
+            journal.target_count = stats[journal.name]["target_count"]
+        return [JournalSchema.model_validate(j).model_dump() for j in items]
+
+    return app
+
+
+async def measure(client, path, concurrency, rounds):
+    """并发请求同一路径，同时用心跳任务测量事件循环阻塞"""
+    max_lag = 0.0
+    total_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag, total_lag
+        interval = 0.005
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - start - interval)
+            max_lag = max(max_lag, lag)
+            total_lag += lag
+
+    async def one_request():
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    beat = asyncio.create_task(heartbeat())
+    latencies = []
+    wall_start = time.perf_counter()
+    for _ in range(rounds):
+        latencies += await asyncio.gather(*(one_request() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    stop.set()
+    await beat
+
+    return {
+        "requests": len(latencies),
+        "wall": wall,
+        "mean": sum(latencies) / len(latencies),
+        "blocked": total_lag / wall,
+        "max_lag": max_lag,
+    }
+
+
+async def run(args):
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热连接池
+        await client.get("/api/journals/?limit=1")
+        await client.get("/baseline/journals?limit=1")
+
+        results = {
+            "sync session": await measure(client, f"/baseline/journals?limit={args.limit}", args.concurrency, args.rounds),
+            "get_async_db": await measure(client, f"/api/journals/?limit={args.limit}", args.concurrency, args.rounds),
+        }
+
+    print(f"{'implementation':<16} {'requests':>9} {'wall':>9} {'mean':>10} {'loop blocked':>13} {'max loop lag':>13}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['requests']:>9} {r['wall']:>8.2f}s {r['mean'] * 1000:>8.1f}ms "
+              f"{r['blocked'] * 100:>12.0f}% {r['max_lag'] * 1000:>11.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步会话与异步会话的读路由并发对比")
+    parser.add_argument("--concurrency", type=int, default=16, help="每轮并发请求数")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=500, help="每次请求的期刊数量")
+    parser.add_argument("--journals", type=int, default=1000)
+    parser.add_argument("--ideas", type=int, default=20000)
+    args = parser.parse_args()
+
+    seed(args.journals, args.ideas)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
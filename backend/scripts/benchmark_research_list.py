@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+研究项目列表：完整列表与摘要列表的对比脚本
+完整列表（GET /api/research/）预加载合作者和全部交流记录正文；
+摘要列表（GET /api/research/summary）只返回合作者ID/姓名、交流记录数量和最新日期
+
+用法:
+    python scripts/benchmark_research_list.py
+    python scripts/benchmark_research_list.py --projects 1000 --logs 50 --rounds 5
+
+指标说明:
+- payload: 响应体大小
+- mean / p95: 单次请求延迟
+- queries: 单次请求执行的SQL数量（来自响应头 X-DB-Query-Count）
+
+使用临时数据库文件，不会影响 data/ 目录下的正式数据库。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 数据库引擎在导入时创建，必须先指定临时数据库
+_tmp_dir = tempfile.mkdtemp(prefix="bench_research_")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_tmp_dir) / 'bench.db'}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("SLOW_QUERY_ENABLED", "false")
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.middleware import QueryStatsMiddleware  # noqa: E402
+from app.models.database import (  # noqa: E402
+    SessionLocal, init_db, Collaborator, CommunicationLog, ResearchProject, project_collaborators
+)
+from app.routes import research  # noqa: E402
+
+LOG_CONTENT = "讨论了模型设定、样本选择和稳健性检验的安排，下一步补充数据并修改第三节。" * 4
+
+
+def seed(project_count, logs_per_project, collaborator_count):
+    """准备项目、合作者关联和交流记录"""
+    init_db()
+    db = SessionLocal()
+    try:
+        db.execute(insert(Collaborator), [
+            {"name": f"合作者{i}", "background": "benchmark"} for i in range(collaborator_count)
+        ])
+        now = datetime.utcnow()
+        db.execute(insert(ResearchProject), [
+            {
+                "title": f"Benchmark project {i}",
+                "idea_description": "seed",
+                "research_method": "DID",
+                "status": "writing",
+                "my_role": "first_author",
+                "start_date": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(project_count)
+        ])
+        db.execute(insert(project_collaborators), [
+            {"project_id": p + 1, "collaborator_id": (p + k) % collaborator_count + 1}
+            for p in range(project_count) for k in range(3)
+        ])
+        for p in range(project_count):
+            db.execute(insert(CommunicationLog), [
+                {
+                    "project_id": p + 1,
+                    "collaborator_id": (p + n) % collaborator_count + 1,
+                    "communication_type": "meeting",
+                    "title": f"第{n + 1}次讨论",
+                    "content": LOG_CONTENT,
+                    "outcomes": "确定下一步计划",
+                    "communication_date": now - timedelta(days=n),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for n in range(logs_per_project)
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+    app.include_router(research.router, prefix="/api/research")
+    return app
+
+
+async def measure(client, path, rounds):
+    latencies = []
+    payload = 0
+    queries = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        payload = len(response.content)
+        queries = int(response.headers.get("X-DB-Query-Count", 0))
+    latencies.sort()
+    return {
+        "payload": payload,
+        "mean": sum(latencies) / len(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "queries": queries,
+    }
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        # 预热连接池
+        await client.get("/api/research/summary?limit=1")
+        results = {
+            "full list": await measure(client, f"/api/research/?limit={args.projects}", args.rounds),
+            "summary": await measure(client, f"/api/research/summary?limit={args.projects}", args.rounds),
+        }
+
+    print(f"{args.projects} projects x {args.logs} logs")
+    print(f"{'endpoint':<10} {'payload':>12} {'mean':>10} {'p95':>10} {'queries':>8}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['payload'] / 1024:>9.0f} KB {r['mean'] * 1000:>8.1f}ms "
+              f"{r['p95'] * 1000:>8.1f}ms {r['queries']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="研究项目完整列表与摘要列表的载荷和延迟对比")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--logs", type=int, default=50, help="每个项目的交流记录数")
+    parser.add_argument("--collaborators", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.projects, args.logs, args.collaborators)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
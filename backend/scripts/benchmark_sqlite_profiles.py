@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SQLite PRAGMA profile 性能对比脚本
+在读写混合负载下，对比各 profile 的列表接口延迟
+
+用法:
+    python scripts/benchmark_sqlite_profiles.py
+    python scripts/benchmark_sqlite_profiles.py --profiles legacy performance --readers 8 --writers 2
+
+每个 profile 在独立子进程中运行（数据库引擎在导入时创建），使用临时数据库文件，
+不会影响 data/ 目录下的正式数据库。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values, pct):
+    """计算百分位数（毫秒列表）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_worker(args):
+    """子进程：初始化临时数据库，并发执行读写请求，输出JSON结果"""
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.models import database
+    from app.models.database import SessionLocal, init_db, Journal, Idea
+    from app.routes import journals, ideas
+
+    init_db()
+
+    # TestClient在各线程中并发请求时，每个请求运行在新的事件循环上：
+    # 连接池中的aiosqlite连接不能跨事件循环复用，异步引擎改为每次请求新建连接（NullPool）
+    benchmark_async_engine = create_async_engine(
+        database.ASYNC_DATABASE_URL, connect_args=database.CONNECT_ARGS, poolclass=NullPool
+    )
+    for listener in (database.set_sqlite_pragma, database.set_sqlite_query_only):
+        event.listen(benchmark_async_engine.sync_engine, "connect", listener)
+    database.AsyncSessionLocal.configure(bind=benchmark_async_engine)
+
+    # 准备数据：期刊 + 引用这些期刊的Ideas
+    db = SessionLocal()
+    try:
+        db.add_all([Journal(name=f"Benchmark Journal {i:04d}") for i in range(args.journals)])
+        db.add_all([
+            Idea(
+                project_name=f"Seed idea {i}",
+                project_description="seed",
+                research_method="Survey",
+                reference_journal=f"Benchmark Journal {i % args.journals:04d}",
+                target_journal=f"Benchmark Journal {(i * 7) % args.journals:04d}",
+            )
+            for i in range(args.ideas)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    # 只挂载需要的路由，避开速率限制等中间件
+    app = FastAPI()
+    app.include_router(journals.router, prefix="/api/journals")
+    app.include_router(ideas.router, prefix="/api/ideas")
+    client = TestClient(app)
+    # 预热：异步引擎首次连接时在绑定到当前事件循环的锁中初始化方言，
+    # 多个线程的事件循环同时首次连接会互相等待而卡住，先在单线程中完成一次读请求
+    client.get("/api/journals/", params={"limit": 1})
+
+    read_latencies = []
+    write_latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.get("/api/journals/", params={"limit": 200})
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if response.status_code == 200:
+                    read_latencies.append(elapsed)
+                else:
+                    errors.append(response.text[:200])
+
+    def writer(worker_id):
+        counter = 0
+        while time.perf_counter() < deadline:
+            counter += 1
+            start = time.perf_counter()
+            response = client.post("/api/ideas/", json={
+                "project_name": f"Bench idea {worker_id}-{counter}",
+                "project_description": "benchmark write",
+                "research_method": "Survey",
+                "reference_journal": f"Benchmark Journal {counter % args.journals:04d}",
+                "maturity": "immature",
+            })
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if response.status_code == 200:
+                    write_latencies.append(elapsed)
+                else:
+                    errors.append(response.text[:200])
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "reads": len(read_latencies),
+        "writes": len(write_latencies),
+        "errors": len(errors),
+        "sample_error": errors[0] if errors else None,
+        "read_p50": statistics.median(read_latencies) if read_latencies else 0.0,
+        "read_p95": percentile(read_latencies, 95),
+        "write_p50": statistics.median(write_latencies) if write_latencies else 0.0,
+        "write_p95": percentile(write_latencies, 95),
+    }))
+
+
+def run_profile(profile, args):
+    """在独立子进程中运行单个profile"""
+    with tempfile.TemporaryDirectory(prefix=f"bench_{profile}_") as tmp_dir:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{Path(tmp_dir) / 'bench.db'}"
+        env["SQLITE_PRAGMA_PROFILE"] = profile
+        env["LOG_LEVEL"] = "WARNING"
+
+        command = [
+            sys.executable, __file__, "--worker",
+            "--duration", str(args.duration),
+            "--readers", str(args.readers),
+            "--writers", str(args.writers),
+            "--journals", str(args.journals),
+            "--ideas", str(args.ideas),
+        ]
+        result = subprocess.run(command, env=env, cwd=BACKEND_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"profile {profile} 运行失败:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite PRAGMA profile 读写混合负载对比")
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "balanced", "performance"])
+    parser.add_argument("--duration", type=float, default=10.0, help="每个profile的压测时长（秒）")
+    parser.add_argument("--readers", type=int, default=4, help="并发读线程数（GET /api/journals/）")
+    parser.add_argument("--writers", type=int, default=2, help="并发写线程数（POST /api/ideas/）")
+    parser.add_argument("--journals", type=int, default=500)
+    parser.add_argument("--ideas", type=int, default=5000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'profile':<12} {'reads':>7} {'writes':>7} {'errors':>7} "
+          f"{'read p50':>10} {'read p95':>10} {'write p50':>10} {'write p95':>10}")
+    for profile in args.profiles:
+        r = run_profile(profile, args)
+        print(f"{profile:<12} {r['reads']:>7} {r['writes']:>7} {r['errors']:>7} "
+              f"{r['read_p50']:>8.1f}ms {r['read_p95']:>8.1f}ms "
+              f"{r['write_p50']:>8.1f}ms {r['write_p95']:>8.1f}ms")
+        if r["sample_error"]:
+            print(f"  示例错误: {r['sample_error']}")
+
+
+if __name__ == "__main__":
+    main()
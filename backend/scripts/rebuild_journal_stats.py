@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+期刊统计全量重建脚本
+journal_stats 由触发器增量维护；手工改库或怀疑计数漂移时运行本脚本重新统计
+
+用法:
+    python scripts/rebuild_journal_stats.py
+    python scripts/rebuild_journal_stats.py --check    # 只报告不一致的期刊数量，不修改
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加父目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.models.database import engine, create_tables  # noqa: E402
+from app.models.journal_stats import COUNT_DRIFT_SQL, rebuild_journal_stats  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全量重建 journal_stats 期刊统计表")
+    parser.add_argument("--check", action="store_true", help="只检查不一致的期刊数量")
+    args = parser.parse_args()
+
+    # 确保统计表和触发器存在
+    create_tables()
+
+    with engine.begin() as conn:
+        if args.check:
+            drifted = conn.execute(text(COUNT_DRIFT_SQL)).scalar()
+            print(f"统计不一致的期刊: {drifted}")
+            sys.exit(1 if drifted else 0)
+
+        drifted = rebuild_journal_stats(conn)
+        journal_count = conn.execute(text("SELECT COUNT(*) FROM journal_stats")).scalar()
+
+    print(f"✅ 已重建 {journal_count} 个期刊的统计（重建前不一致: {drifted}）")
+
+
+if __name__ == "__main__":
+    main()